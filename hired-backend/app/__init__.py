@@ -13,10 +13,27 @@ def create_app():
     from app.routes.auth_routes import auth_bp
     from app.routes.job_routes import job_bp
     from app.routes.user_jobs_routes import user_jobs_bp
+    from app.routes.internal_routes import internal_bp
 
 
     app.register_blueprint(auth_bp, url_prefix='/api/v1/auth')
     app.register_blueprint(job_bp, url_prefix='/api/v1/jobs')
     app.register_blueprint(user_jobs_bp, url_prefix="/api/v1/user-jobs")
+    app.register_blueprint(internal_bp, url_prefix="/api/v1/internal")
+
+    from app.utils import job_replica, invalidation, suggest, expiry, profiling, concurrency, rate_limit, resume_index, versions, outbox, views
+    # shed load before anything else runs for the request
+    concurrency.init_app(app)
+    profiling.init_app(app)
+    rate_limit.init_app(app)
+    job_replica.init_app(app)
+    invalidation.init_app(app)
+    suggest.init_app(app)
+    expiry.init_app(app)
+    views.init_app(app)
+    # consumers register before the outbox workers start
+    resume_index.init_app(app)
+    versions.init_app(app)
+    outbox.init_app(app)
 
     return app
@@ -1,6 +1,7 @@
 from functools import wraps
 from flask import request, jsonify
 from app.utils.supabase import supabase  # Assuming you already have a Supabase client setup
+from app.utils.resilience import call, execute, UpstreamUnavailable, unavailable_response
 
 def token_required(f):
     @wraps(f)
@@ -15,7 +16,7 @@ def token_required(f):
             token = auth_header.split(" ")[1]
 
             # Validate token with Supabase Auth
-            auth_resp = supabase.auth.get_user(token)
+            auth_resp = call("auth.get_user", lambda: supabase.auth.get_user(token), idempotent=True)
 
             if not auth_resp or not auth_resp.user:
                 return jsonify({"error": "Invalid or expired token"}), 403
@@ -23,13 +24,14 @@ def token_required(f):
             auth_uid = auth_resp.user.id  # UID from Supabase Auth
 
             # Fetch user from custom users table by auth_uid
-            user_resp = (
+            user_resp = execute(
+                "users.get",
                 supabase
                 .table("users")
                 .select("*")
                 .eq("auth_uid", auth_uid)
-                .single()
-                .execute()
+                .single(),
+                idempotent=True,
             )
 
             if not user_resp.data:
@@ -39,6 +41,9 @@ def token_required(f):
             user["email"] = auth_resp.user.email
             user["auth_uid"] = auth_uid
 
+        except UpstreamUnavailable as e:
+            return unavailable_response(e)
+
         except Exception as e:
             return jsonify({"error": f"Auth failed: {str(e)}"}), 403
 
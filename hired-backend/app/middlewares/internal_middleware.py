@@ -0,0 +1,27 @@
+import hmac
+import os
+from functools import wraps
+from flask import request, jsonify
+
+INTERNAL_API_TOKEN = os.getenv("INTERNAL_API_TOKEN")
+
+
+def is_internal_request():
+    """
+    True when the request carries the configured X-Internal-Token. This is one
+    shared secret, not a user role: whoever holds it gets every internal
+    endpoint (metrics, profiles, slow requests).
+    """
+    token = request.headers.get("X-Internal-Token")
+    return bool(INTERNAL_API_TOKEN and token and hmac.compare_digest(token, INTERNAL_API_TOKEN))
+
+
+def internal_only(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        # Hidden entirely unless a token is configured
+        if not is_internal_request():
+            return jsonify({"error": "Not found"}), 404
+        return f(*args, **kwargs)
+
+    return decorated
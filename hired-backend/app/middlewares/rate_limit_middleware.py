@@ -0,0 +1,40 @@
+import math
+from functools import wraps
+from flask import request, jsonify
+from app.middlewares.internal_middleware import is_internal_request
+from app.utils.rate_limit import limiter, client_ip, account_key, BUDGETS, RATE_LIMIT_ENABLED
+
+
+def rate_limited(budget):
+    """
+    Enforce the BUDGETS[budget] token buckets before the route runs, so a
+    refused request never reaches Supabase. The account scope reads "email"
+    from the JSON body.
+    """
+    scopes = BUDGETS[budget]
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if not RATE_LIMIT_ENABLED or is_internal_request():
+                return f(*args, **kwargs)
+
+            keys = {"ip": client_ip(request)}
+            if "account" in scopes:
+                data = request.get_json(silent=True) or {}
+                keys["account"] = account_key(data.get("email"))
+
+            for scope in scopes:
+                if not keys.get(scope):
+                    continue
+                allowed, retry_after = limiter.check(budget, scope, keys[scope])
+                if not allowed:
+                    response = jsonify({"error": "Too many requests, please retry later"})
+                    response.headers["Retry-After"] = str(max(1, math.ceil(retry_after)))
+                    return response, 429
+
+            return f(*args, **kwargs)
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,42 @@
+from functools import wraps
+from flask import request, jsonify
+from pydantic import ValidationError
+from app.utils.schemas import error_messages
+
+
+def validate_body(schema):
+    """
+    Validate the JSON body against `schema` and pass the result to the route
+    as `body` (a model instance, whitespace-stripped). Put it above
+    @token_required so invalid requests never reach Supabase:
+
+        @validate_body(ApplyJobRequest)
+        @token_required
+        def apply_job(user, body): ...
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            data = request.get_json(silent=True)
+            if data is None:
+                data = {}
+            if not isinstance(data, dict):
+                return jsonify({"error": "Request body must be a JSON object"}), 400
+
+            try:
+                body = schema.model_validate(data)
+            except ValidationError as e:
+                details = error_messages(e)
+                first = details[0]
+                # "job_id is required", matching the messages routes used before
+                separator = " " if first["message"] == "is required" else ": "
+                return jsonify({
+                    "error": f"{first['field']}{separator}{first['message']}",
+                    "details": details
+                }), 400
+
+            return f(*args, body=body, **kwargs)
+
+        return decorated
+
+    return decorator
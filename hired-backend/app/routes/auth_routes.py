@@ -1,6 +1,8 @@
 from flask import Blueprint, request, jsonify
 from app.supabase_client import supabase
 from app.utils.supabase import get_supabase_client
+from app.utils.resilience import call, execute, UpstreamUnavailable, unavailable_response
+from app.middlewares.rate_limit_middleware import rate_limited
 
 
 auth_bp = Blueprint("auth_bp", __name__)
@@ -13,6 +15,7 @@ def auth_health():
 # SIGNUP ROUTE
 # ------------------------------------------------------
 @auth_bp.route("/signup", methods=["POST"])
+@rate_limited("signup")
 def signup():
     try:
         data = request.get_json()
@@ -27,10 +30,10 @@ def signup():
             return jsonify({"error": "All fields are required"}), 400
 
         # 1. Create user in Supabase Auth
-        user = supabase.auth.sign_up({
+        user = call("auth.sign_up", lambda: supabase.auth.sign_up({
             "email": email,
             "password": password
-        })
+        }))
 
         if not user or not user.user:
             return jsonify({"error": "Supabase signup failed"}), 400
@@ -38,18 +41,21 @@ def signup():
         uid = user.user.id  # Supabase UID
 
         # 2. Insert custom data into public.users
-        response = supabase.table("users").insert({
+        response = execute("users.insert", supabase.table("users").insert({
             "auth_uid": uid,
             "first_name": first_name,
             "last_name": last_name,
             "role": role
-        }).execute()
+        }))
 
         return jsonify({
             "message": "User registered successfully",
             "auth_uid": uid
         }), 201
 
+    except UpstreamUnavailable as e:
+        return unavailable_response(e)
+
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -58,6 +64,7 @@ def signup():
 # LOGIN ROUTE
 # ------------------------------------------------------
 @auth_bp.route("/login", methods=["POST"])
+@rate_limited("login")
 def login():
     try:
         data = request.get_json()
@@ -69,10 +76,10 @@ def login():
             return jsonify({"error": "Email and password required"}), 400
 
         # 1. Login with Supabase Auth
-        user = supabase.auth.sign_in_with_password({
+        user = call("auth.sign_in", lambda: supabase.auth.sign_in_with_password({
             "email": email,
             "password": password
-        })
+        }))
 
         if not user or not user.user:
             return jsonify({"error": "Invalid login credentials"}), 401
@@ -80,7 +87,7 @@ def login():
         uid = user.user.id
 
         # 2. Get user role + info from public.users
-        user_data = supabase.table("users").select("*").eq("auth_uid", uid).execute()
+        user_data = execute("users.get", supabase.table("users").select("*").eq("auth_uid", uid), idempotent=True)
 
         if not user_data.data:
             return jsonify({"error": "User not found in public.users"}), 404
@@ -99,6 +106,9 @@ def login():
             }
         }), 200
 
+    except UpstreamUnavailable as e:
+        return unavailable_response(e)
+
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -117,7 +127,7 @@ def protected_test():
         token = auth_header.split(" ")[1]
 
         # Verify token with Supabase
-        user = supabase.auth.get_user(token)
+        user = call("auth.get_user", lambda: supabase.auth.get_user(token), idempotent=True)
 
         if not user:
             return jsonify({"error": "Invalid token"}), 403
@@ -128,6 +138,9 @@ def protected_test():
             "email": user.user.email
         }), 200
 
+    except UpstreamUnavailable as e:
+        return unavailable_response(e)
+
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -145,9 +158,12 @@ def protected_test():
 @auth_bp.route('/profile/<auth_uid>', methods=['GET'])
 def profile(auth_uid):
     try:
-        response = supabase.table('users').select('*').eq('auth_uid', auth_uid).single().execute()
+        response = execute("users.get", supabase.table('users').select('*').eq('auth_uid', auth_uid).single(), idempotent=True)
         if response.data is None:
             return jsonify({"error": "User not found"}), 404
         return jsonify(response.data), 200
+    except UpstreamUnavailable as e:
+        return unavailable_response(e)
+
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -0,0 +1,65 @@
+from flask import Blueprint, Response, jsonify, request
+from app.middlewares.internal_middleware import internal_only
+from app.utils.invalidation import bus
+from app.utils.resilience import breakers
+from app.utils.resume_index import resume_pipeline
+from app.utils import profiling, concurrency
+from app.utils.rate_limit import limiter
+from app.utils.outbox import outbox
+from app.utils.views import view_counter
+
+internal_bp = Blueprint("internal_bp", __name__)
+
+# ---------------------------------------------
+# METRICS
+# GET /metrics
+# ---------------------------------------------
+@internal_bp.route("/metrics", methods=["GET"])
+@internal_only
+def metrics():
+    return jsonify({
+        "invalidation": bus.metrics(),
+        "breakers": {name: b.state for name, b in breakers.items()},
+        "resume_index": resume_pipeline.stats(),
+        "concurrency": concurrency.stats(),
+        "rate_limit": limiter.stats(),
+        "outbox": outbox.stats(),
+        "views": view_counter.stats(),
+        "profiling": profiling.io_ratio(),
+    }), 200
+
+
+# ---------------------------------------------
+# PROFILES (on-demand, X-Profile header)
+# GET /profiles
+# GET /profiles/<profile_id>   collapsed stacks, text/plain
+# ---------------------------------------------
+@internal_bp.route("/profiles", methods=["GET"])
+@internal_only
+def list_profiles():
+    return jsonify({"profiles": profiling.list_profiles()}), 200
+
+
+@internal_bp.route("/profiles/<profile_id>", methods=["GET"])
+@internal_only
+def get_profile(profile_id):
+    profile = profiling.get_profile(profile_id)
+    if not profile:
+        return jsonify({"error": "Profile not found"}), 404
+    return Response(profile["collapsed"], mimetype="text/plain")
+
+
+# ---------------------------------------------
+# SLOW REQUESTS
+# GET /slow-requests                    per-phase timings, JSON
+# GET /slow-requests?format=collapsed   endpoint;phase <us>, for flamegraph.pl
+# ---------------------------------------------
+@internal_bp.route("/slow-requests", methods=["GET"])
+@internal_only
+def slow_requests():
+    if request.args.get("format") == "collapsed":
+        return Response(profiling.slow_requests_collapsed(), mimetype="text/plain")
+    return jsonify({
+        "threshold_ms": profiling.SLOW_REQUEST_MS,
+        "requests": profiling.slow_requests()
+    }), 200
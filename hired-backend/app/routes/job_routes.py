@@ -1,10 +1,30 @@
+import os
+import re
 from flask import Blueprint, jsonify, request
 from app.utils.supabase import supabase
 from app.middlewares.auth_middleware import token_required
+from app.middlewares.rate_limit_middleware import rate_limited
+from app.middlewares.validation_middleware import validate_body
+from app.utils.schemas import CreateJobRequest
+from app.utils.mutations import update_owned_job, delete_owned_job, NOT_FOUND, FORBIDDEN
+from app.utils.resilience import execute, UpstreamUnavailable, unavailable_response
+from app.utils.job_replica import job_replica
+from app.utils.cache import job_cache
+from app.utils.invalidation import bus
+from app.utils.outbox import outbox
+from app.utils.suggest import suggest_index, KINDS, SUGGEST_LIMIT
+from app.utils import expiry
+from app.utils.views import TRENDING_TOP_K, view_counter
 
 
 job_bp = Blueprint("job_bp", __name__)
 
+JOB_BATCH_MAX_IDS = int(os.getenv("JOB_BATCH_MAX_IDS", 200))
+# ids per in_() query; keeps the PostgREST URL well under proxy limits
+JOB_BATCH_CHUNK_SIZE = int(os.getenv("JOB_BATCH_CHUNK_SIZE", 50))
+# jobs.id is a uuid; PostgREST rejects a whole in_() over one malformed value
+JOB_ID_PATTERN = re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$")
+
 # ---------------------------------------------
 # Health Check
 # ---------------------------------------------
@@ -31,53 +51,81 @@ def _get_pagination_params():
 
    return page, page_size
 
+
+# ---------------------------------------------
+# Multi-id lookup helper
+# cache first, then the replica, then one in_() query per chunk of misses
+# ids that can't be a job id are never looked up, so they are just not found
+# ---------------------------------------------
+def _lookup_jobs(ids):
+   ids = [job_id for job_id in ids if JOB_ID_PATTERN.match(job_id)]
+   found = {}
+   for job_id in ids:
+       job = job_cache.get(job_id)
+       if job:
+           found[job_id] = job
+
+   misses = [job_id for job_id in ids if job_id not in found]
+   if misses and job_replica.is_fresh():
+       found.update(job_replica.get_jobs(misses))
+       misses = [job_id for job_id in ids if job_id not in found]
+
+   for start in range(0, len(misses), JOB_BATCH_CHUNK_SIZE):
+       chunk = misses[start:start + JOB_BATCH_CHUNK_SIZE]
+       response = execute(
+           "jobs.get_many",
+           supabase.table("jobs").select("*").in_("id", chunk),
+           idempotent=True,
+           hedge=True,
+       )
+       for job in response.data or []:
+           job_id = str(job["id"])
+           found[job_id] = job
+           job_cache.set(job_id, job)
+           expiry.remember(job)
+
+   return found
+
+
+def _listed(job, include_expired):
+   """Whether a ranked job belongs on a list page; expiry may not have reached the ranking yet."""
+   if include_expired:
+       return True
+   return job.get("status") != expiry.EXPIRED and not expiry.is_expired(str(job["id"]))
+
 # ---------------------------------------------
 # 1. CREATE JOB (Recruiter only)
 # ---------------------------------------------
 @job_bp.route("/create", methods=["POST"])
+@validate_body(CreateJobRequest)
 @token_required
-def create_job(user):
+def create_job(user, body):
    if user.get("role") != "recruiter":
        return jsonify({"error": "Only recruiters can post jobs"}), 403
 
 
    try:
-       data = request.get_json() or {}
-
-
-       required_fields = [
-           "title", "company_name", "location", "job_type",
-           "salary_range", "experience_level", "skills_required"
-       ]
-       for field in required_fields:
-           if not data.get(field):
-               return jsonify({"error": f"{field} is required"}), 400
+       job_data = {"recruiter_id": user["auth_uid"], **body.model_dump()}
 
 
-       job_data = {
-           "recruiter_id": user["auth_uid"],
-           "title": data["title"],
-           "company_name": data["company_name"],
-           "location": data["location"],
-           "job_type": data["job_type"],
-           "salary_range": data["salary_range"],
-           "experience_level": data["experience_level"],
-           "description": data.get("description"),
-           "skills_required": data["skills_required"],
-           "application_deadline": data.get("application_deadline")
-       }
-
-
-       response = supabase.table("jobs").insert(job_data).execute()
+       response = execute("jobs.insert", supabase.table("jobs").insert(job_data))
 
 
        if response.data:
+           bus.notify("jobs", response.data[0]["id"])
+           job_replica.apply(response.data[0])
+           suggest_index.add_job(response.data[0])
+           expiry.remember(response.data[0])
+           outbox.wake()
            return jsonify({"message": "Job posted successfully", "job": response.data[0]}), 201
 
 
        return jsonify({"error": response.error or "Failed to create job"}), 500
 
 
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
    except Exception as e:
        return jsonify({"error": f"Server error: {str(e)}"}), 500
 
@@ -115,8 +163,13 @@ def create_job(user):
 
 # ---------------------------------------------
 # 2. GET ALL JOBS (Alternative : Paginated + Single-Field Search)
+# GET /?sort=trending      recently most viewed, decayed (see utils/views.py);
+#                          only the top TRENDING_TOP_K are ranked, so "total"
+#                          never exceeds "ranked_limit"
+# GET /?sort=most_viewed   all-time view count, paged in the database
 # ---------------------------------------------
 @job_bp.route("/", methods=["GET"])
+@rate_limited("jobs.list")
 def get_all_jobs():
     try:
         page, page_size = _get_pagination_params()
@@ -124,9 +177,72 @@ def get_all_jobs():
         to_index = offset + page_size - 1
 
         search_query = request.args.get('q')
+        # expired postings are hidden unless explicitly asked for
+        include_expired = request.args.get("include_expired", "false").lower() == "true"
+
+        sort = request.args.get("sort")
+        if sort in ("trending", "most_viewed") and search_query:
+            return jsonify({"error": f"q cannot be combined with sort={sort}"}), 400
+
+        # sort=trending is served from the in-memory trending top-K
+        if sort == "trending":
+            ranked = [job_id for job_id in view_counter.trending()
+                      if include_expired or not expiry.is_expired(job_id)]
+            page_ids = ranked[offset:offset + page_size]
+            found = _lookup_jobs(page_ids)
+            for job_id in page_ids:
+                if job_id not in found:
+                    view_counter.forget(job_id)  # deleted since it was viewed
+
+            return jsonify({
+                "page": page,
+                "page_size": page_size,
+                "total": len(ranked),
+                "ranked_limit": TRENDING_TOP_K,
+                "sort": "trending",
+                "jobs": [found[job_id] for job_id in page_ids
+                         if job_id in found and _listed(found[job_id], include_expired)]
+            }), 200
+
+        if sort == "most_viewed":
+            query = supabase.table("job_view_counts").select("job_id, views, jobs!inner(status)", count="exact")
+            if not include_expired:
+                query = query.eq("jobs.status", expiry.OPEN)
+            response = execute(
+                "jobs.most_viewed",
+                query
+                .order("views", desc=True)
+                .order("job_id")
+                .range(offset, to_index),
+                idempotent=True,
+                cache_key=("jobs.most_viewed", page, page_size, include_expired),
+            )
+            page_ids = [str(row["job_id"]) for row in response.data or []]
+            found = _lookup_jobs(page_ids)
+
+            return jsonify({
+                "page": page,
+                "page_size": page_size,
+                "total": response.count or 0,
+                "sort": "most_viewed",
+                "jobs": [found[job_id] for job_id in page_ids
+                         if job_id in found and _listed(found[job_id], include_expired)]
+            }), 200
+
+        # Serve from the local replica while it is within the allowed lag
+        if job_replica.is_fresh():
+            jobs_data, total = job_replica.list_jobs(offset, page_size, search_query, include_expired)
+            return jsonify({
+                "page": page,
+                "page_size": page_size,
+                "total": total,
+                "jobs": jobs_data
+            }), 200
         
         # 1. Start with the base query
         query = supabase.table("jobs").select("*", count="exact")
+        if not include_expired:
+            query = query.eq("status", expiry.OPEN)
 
         # 2. Apply search filter only to the 'title' field
         if search_query:
@@ -140,15 +256,20 @@ def get_all_jobs():
             # query = query.eq("title.ilike", search_pattern)
 
         # 3. Execute the combined query (Data + Count)
-        response = (
+        response = execute(
+            "jobs.list",
             query
             .order("created_at", desc=True)
-            .range(offset, to_index)
-            .execute()
+            .range(offset, to_index),
+            idempotent=True,
+            hedge=True,
+            cache_key=("jobs.list", page, page_size, search_query, include_expired),
         )
         
         total = response.count or 0
         jobs_data = response.data or []
+        for job in jobs_data:
+            expiry.remember(job)
         
         return jsonify({
             "page": page,
@@ -157,6 +278,9 @@ def get_all_jobs():
             "jobs": jobs_data
         }), 200
 
+    except UpstreamUnavailable as e:
+        return unavailable_response(e)
+
     except Exception as e:
         print(f"Server Error during get_all_jobs: {e}") 
         return jsonify({"error": f"Failed to fetch jobs due to a server error: {str(e)}"}), 500
@@ -167,26 +291,118 @@ def get_all_jobs():
 
 
    
+# ---------------------------------------------
+# 2b. TYPEAHEAD SUGGESTIONS
+# GET /suggest?q=pyt&types=title,skill&limit=8
+# served from the in-memory index, no Supabase call
+# ---------------------------------------------
+@job_bp.route("/suggest", methods=["GET"])
+def suggest_jobs():
+    prefix = request.args.get("q", "")
+    kinds = [k for k in request.args.get("types", ",".join(KINDS)).split(",") if k in KINDS]
+
+    try:
+        limit = min(max(int(request.args.get("limit", SUGGEST_LIMIT)), 1), 25)
+    except ValueError:
+        limit = SUGGEST_LIMIT
+
+    return jsonify({
+        "q": prefix,
+        "ready": suggest_index.ready,
+        "suggestions": suggest_index.suggest(prefix, kinds or KINDS, limit)
+    }), 200
+
+
+
+
    # ---------------------------------------------
 # 3. GET A SINGLE JOB
 # ---------------------------------------------
 @job_bp.route("/<job_id>", methods=["GET"])
 def get_job_by_id(job_id):
    try:
-       response = supabase.table("jobs").select("*").eq("id", job_id).single().execute()
+       job = job_cache.get(job_id)
+       if job:
+           view_counter.record(job_id)
+           return jsonify({"job": job}), 200
+
+
+       if job_replica.is_fresh():
+           job = job_replica.get_job(job_id)
+           if job:
+               view_counter.record(job_id)
+               return jsonify({"job": job}), 200
+           # not replicated yet (or really missing): let upstream decide
+
+
+       response = execute(
+           "jobs.get",
+           supabase.table("jobs").select("*").eq("id", job_id).single(),
+           idempotent=True,
+           hedge=True,
+           cache_key=("jobs.get", job_id),
+       )
        if not response.data:
            return jsonify({"error": "Job not found"}), 404
 
 
+       job_cache.set(job_id, response.data)
+       expiry.remember(response.data)
+       view_counter.record(job_id)
        return jsonify({"job": response.data}), 200
 
 
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
    except Exception as e:
        return jsonify({"error": f"Failed to fetch job: {str(e)}"}), 500
 
 
 
 
+# ---------------------------------------------
+# 3b. GET MANY JOBS BY ID
+# GET  /batch?ids=a,b,c
+# POST /batch  {"ids": [...]}   for lists too long for a query string
+# jobs come back in request order, unknown ids are listed in "missing"
+# ---------------------------------------------
+def _get_batch_ids():
+   if request.method == "POST":
+       ids = (request.get_json(silent=True) or {}).get("ids")
+       if not isinstance(ids, list):
+           return None
+   else:
+       ids = request.args.get("ids", "").split(",")
+
+   # drop blanks and duplicates, keep the caller's order; uuids compare lowercase
+   return list(dict.fromkeys(str(i).strip().lower() for i in ids if str(i).strip()))
+
+
+@job_bp.route("/batch", methods=["GET", "POST"])
+def get_jobs_batch():
+   ids = _get_batch_ids()
+   if not ids:
+       return jsonify({"error": "ids is required"}), 400
+   if len(ids) > JOB_BATCH_MAX_IDS:
+       return jsonify({"error": f"At most {JOB_BATCH_MAX_IDS} ids per request"}), 400
+
+   try:
+       found = _lookup_jobs(ids)
+
+       return jsonify({
+           "jobs": [found[job_id] for job_id in ids if job_id in found],
+           "missing": [job_id for job_id in ids if job_id not in found]
+       }), 200
+
+
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
+   except Exception as e:
+       return jsonify({"error": f"Failed to fetch jobs: {str(e)}"}), 500
+
+
 # ---------------------------------------------
 # 4. GET JOBS POSTED BY RECRUITER (Paginated)
 # ---------------------------------------------
@@ -203,21 +419,23 @@ def get_my_jobs(user):
        to_index = offset + page_size - 1
 
 
-       jobs_resp = (
+       jobs_resp = execute(
+           "jobs.list_mine",
            supabase.table("jobs")
            .select("*")
            .eq("recruiter_id", user["auth_uid"])
            .order("created_at", desc=True)
-           .range(offset, to_index)
-           .execute()
+           .range(offset, to_index),
+           idempotent=True,
        )
 
 
-       total_resp = (
+       total_resp = execute(
+           "jobs.count_mine",
            supabase.table("jobs")
            .select("id", count="exact")
-           .eq("recruiter_id", user["auth_uid"])
-           .execute()
+           .eq("recruiter_id", user["auth_uid"]),
+           idempotent=True,
        )
 
 
@@ -232,6 +450,9 @@ def get_my_jobs(user):
        }), 200
 
 
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
    except Exception as e:
        return jsonify({"error": f"Failed to fetch recruiter jobs: {str(e)}"}), 500
 
@@ -249,31 +470,36 @@ def update_job(user, job_id):
 
 
    try:
-       job_check = supabase.table("jobs").select("recruiter_id").eq("id", job_id).single().execute()
-
-
-       if not job_check.data:
-           return jsonify({"error": "Job not found"}), 404
+       data = request.get_json() or {}
+       update_data = expiry.reopen_on_extension({k: v for k, v in data.items() if v is not None})
 
 
-       if job_check.data["recruiter_id"] != user["auth_uid"]:
-           return jsonify({"error": "Unauthorized"}), 403
+       outcome, job = update_owned_job(job_id, user["auth_uid"], update_data)
 
 
-       data = request.get_json() or {}
-       update_data = {k: v for k, v in data.items() if v is not None}
+       if outcome == NOT_FOUND:
+           return jsonify({"error": "Job not found"}), 404
 
 
-       response = supabase.table("jobs").update(update_data).eq("id", job_id).execute()
+       if outcome == FORBIDDEN:
+           return jsonify({"error": "Unauthorized"}), 403
 
 
-       if response.data:
-           return jsonify({"message": "Job updated successfully", "job": response.data[0]}), 200
+       if job:
+           bus.notify("jobs", job_id)
+           job_replica.apply(job)
+           suggest_index.add_job(job)
+           expiry.remember(job)
+           outbox.wake()
+           return jsonify({"message": "Job updated successfully", "job": job}), 200
 
 
        return jsonify({"error": "Failed to update job"}), 500
 
 
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
    except Exception as e:
        return jsonify({"error": f"Update failed: {str(e)}"}), 500
 
@@ -290,21 +516,27 @@ def delete_job(user, job_id):
        return jsonify({"error": "Only recruiters can delete jobs"}), 403
 
 
-   job_check = supabase.table("jobs").select("recruiter_id").eq("id", job_id).single().execute()
-
-
-   if not job_check.data:
-       return jsonify({"error": "Job not found"}), 404
+   try:
+       outcome, _ = delete_owned_job(job_id, user["auth_uid"])
 
 
-   if job_check.data["recruiter_id"] != user["auth_uid"]:
-       return jsonify({"error": "Unauthorized"}), 403
+       if outcome == NOT_FOUND:
+           return jsonify({"error": "Job not found"}), 404
 
 
-   supabase.table("jobs").delete().eq("id", job_id).execute()
+       if outcome == FORBIDDEN:
+           return jsonify({"error": "Unauthorized"}), 403
 
 
-   return jsonify({"message": "Job deleted successfully"}), 200
+       bus.notify("jobs", job_id)
+       job_replica.forget(job_id)
+       suggest_index.remove_job(job_id)
+       outbox.wake()
+       return jsonify({"message": "Job deleted successfully"}), 200
 
 
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
 
+   except Exception as e:
+       return jsonify({"error": f"Delete failed: {str(e)}"}), 500
@@ -1,6 +1,18 @@
 from flask import Blueprint, request, jsonify
 from app.supabase_client import supabase
 from app.middlewares.auth_middleware import token_required
+from app.middlewares.validation_middleware import validate_body
+from app.utils.schemas import SaveJobRequest, ApplyJobRequest, UpdateApplicationRequest
+from app.utils.mutations import (
+    update_owned, delete_owned, update_application_status,
+    OK, NOT_FOUND, FORBIDDEN,
+)
+from app.utils.resilience import execute, UpstreamUnavailable, unavailable_response
+from app.utils.resume_storage import receive_resume
+from app.utils.resume_index import search_resumes
+from app.utils.outbox import outbox
+from app.utils import expiry, versions
+from werkzeug.exceptions import RequestEntityTooLarge
 
 user_jobs_bp = Blueprint("user_jobs_bp", __name__)
 
@@ -34,34 +46,40 @@ def _get_pagination_params():
 # POST /saved-jobs
 # ---------------------------------------------
 @user_jobs_bp.route("/saved-jobs", methods=["POST"])
+@validate_body(SaveJobRequest)
 @token_required
-def save_job(user):
+def save_job(user, body):
    if user.get("role") != "candidate":
        return jsonify({"error": "Only candidate can save jobs"}), 403
 
 
-   data = request.get_json() or {}
-   job_id = data.get("job_id")
-   if not job_id:
-       return jsonify({"error": "job_id is required"}), 400
+   job_id = body.job_id
+   if expiry.is_expired(job_id):
+       return jsonify({"error": "This job has expired"}), 410
 
 
    try:
-       existing = supabase.table("saved_jobs").select("*").eq("job_id", job_id).eq("user_id", user["auth_uid"]).execute()
+       existing = execute("saved_jobs.get", supabase.table("saved_jobs").select("*").eq("job_id", job_id).eq("user_id", user["auth_uid"]), idempotent=True)
        if existing.data:
            return jsonify({"message": "Job already saved", "saved_job": existing.data[0]}), 200
 
 
        saved_job = {"user_id": user["auth_uid"], "job_id": job_id}
-       resp = supabase.table("saved_jobs").insert(saved_job).execute()
+       resp = execute("saved_jobs.insert", supabase.table("saved_jobs").insert(saved_job))
        if resp.data:
+           versions.bump(versions.SAVED_JOBS, user["auth_uid"])
            return jsonify({"message": "Job saved successfully", "saved_job": resp.data[0]}), 201
 
 
        return jsonify({"error": "Failed to save job"}), 500
 
 
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
    except Exception as e:
+       if expiry.is_closed_error(e):
+           return jsonify({"error": "This job has expired"}), 410
        return jsonify({"error": f"Failed to save job: {str(e)}"}), 500
 
 
@@ -73,6 +91,7 @@ def save_job(user):
 # ---------------------------------------------
 @user_jobs_bp.route("/saved-jobs", methods=["GET"])
 @token_required
+@versions.conditional(versions.SAVED_JOBS)
 def get_saved_jobs(user):
    if user.get("role") != "candidate":
        return jsonify({"error": "Only candidate can view saved jobs"}), 403
@@ -85,17 +104,18 @@ def get_saved_jobs(user):
 
    try:
        # select joined job fields (only few fields) to avoid FK issues
-       saved_resp = (
+       saved_resp = execute(
+           "saved_jobs.list",
            supabase.table("saved_jobs")
            .select("id, job_id, saved_at, jobs(recruiter_id, company_name, title)")
            .eq("user_id", user["auth_uid"])
            .order("saved_at", desc=True)
-           .range(offset, to_index)
-           .execute()
+           .range(offset, to_index),
+           idempotent=True,
        )
 
 
-       total_resp = supabase.table("saved_jobs").select("id", count="exact").eq("user_id", user["auth_uid"]).execute()
+       total_resp = execute("saved_jobs.count", supabase.table("saved_jobs").select("id", count="exact").eq("user_id", user["auth_uid"]), idempotent=True)
        total = getattr(total_resp, "count", None) or 0
 
 
@@ -107,6 +127,9 @@ def get_saved_jobs(user):
        }), 200
 
 
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
    except Exception as e:
        return jsonify({"error": f"Failed to fetch saved jobs: {str(e)}"}), 500
 
@@ -126,14 +149,18 @@ def remove_saved_job(user, saved_job_id):
 
    try:
        #saved_job 's id is passed and not job_id
-       resp = supabase.table("saved_jobs").delete().eq("id", saved_job_id).eq("user_id", user["auth_uid"]).execute()
+       resp = execute("saved_jobs.delete", supabase.table("saved_jobs").delete().eq("id", saved_job_id).eq("user_id", user["auth_uid"]))
        if not resp.data or len(resp.data) == 0:
            return jsonify({"error": "Saved job not found"}), 404
 
 
+       versions.bump(versions.SAVED_JOBS, user["auth_uid"])
        return jsonify({"message": "Saved job removed"}), 200
 
 
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
    except Exception as e:
        return jsonify({"error": f"Failed to remove saved job: {str(e)}"}), 500
 
@@ -162,23 +189,21 @@ def remove_saved_job(user, saved_job_id):
 # body: { job_id, resume_url (optional), cover_letter (optional) }
 # ---------------------------------------------
 @user_jobs_bp.route("/applications", methods=["POST"])
+@validate_body(ApplyJobRequest)
 @token_required
-def apply_job(user):
+def apply_job(user, body):
    if user.get("role") != "candidate":
        return jsonify({"error": "Only candidate can apply for jobs"}), 403
 
 
-   data = request.get_json() or {}
-   job_id = data.get("job_id")
-   if not job_id:
-       return jsonify({"error": "job_id is required"}), 400
-   resume_url= data.get("resume_url")
-   if not resume_url:
-       return jsonify({"error": "resume_url is required"}), 400
+   job_id = body.job_id
+   resume_url = body.resume_url
+   if expiry.is_expired(job_id):
+       return jsonify({"error": "This job is no longer accepting applications"}), 410
 
 
    try:
-       existing = supabase.table("applications").select("*").eq("job_id", job_id).eq("candidate_id", user["auth_uid"]).execute()
+       existing = execute("applications.get", supabase.table("applications").select("*").eq("job_id", job_id).eq("candidate_id", user["auth_uid"]), idempotent=True)
        if existing.data:
            return jsonify({"message": "Already applied for this job", "application": existing.data[0]}), 200
 
@@ -187,20 +212,28 @@ def apply_job(user):
            "candidate_id": user["auth_uid"],
            "job_id": job_id,
            "resume_url": resume_url,
-           "cover_letter": data.get("cover_letter"),
+           "cover_letter": body.cover_letter,
            "status": "applied"
        }
 
 
-       resp = supabase.table("applications").insert(application).execute()
+       resp = execute("applications.insert", supabase.table("applications").insert(application))
        if resp.data:
+           versions.bump(versions.APPLICATIONS, user["auth_uid"])
+           # resume indexing and the recruiter's stamp run off the outbox event the insert wrote
+           outbox.wake()
            return jsonify({"message": "Application submitted successfully", "application": resp.data[0]}), 201
 
 
        return jsonify({"error": "Failed to submit application"}), 500
 
 
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
    except Exception as e:
+       if expiry.is_closed_error(e):
+           return jsonify({"error": "This job is no longer accepting applications"}), 410
        return jsonify({"error": f"Failed to submit application: {str(e)}"}), 500
 
 
@@ -212,6 +245,7 @@ def apply_job(user):
 # ---------------------------------------------
 @user_jobs_bp.route("/applications", methods=["GET"])
 @token_required
+@versions.conditional(versions.APPLICATIONS)
 def get_user_applications(user):
    if user.get("role") != "candidate":
        return jsonify({"error": "Only candidate can view their applications"}), 403
@@ -223,15 +257,16 @@ def get_user_applications(user):
 
 
    try:
-       apps_resp = (
+       apps_resp = execute(
+           "applications.list",
            supabase.table("applications")
            .select("id, job_id, resume_url, cover_letter, status, applied_at, jobs(recruiter_id, company_name, title)")
            .eq("candidate_id", user["auth_uid"])
            .order("applied_at", desc=True)
-           .range(offset, to_index)
-           .execute()
+           .range(offset, to_index),
+           idempotent=True,
        )
-       total_resp = supabase.table("applications").select("id", count="exact").eq("candidate_id", user["auth_uid"]).execute()
+       total_resp = execute("applications.count", supabase.table("applications").select("id", count="exact").eq("candidate_id", user["auth_uid"]), idempotent=True)
        total = getattr(total_resp, "count", None) or 0
 
 
@@ -243,6 +278,9 @@ def get_user_applications(user):
        }), 200
 
 
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
    except Exception as e:
        return jsonify({"error": f"Failed to fetch applications: {str(e)}"}), 500
 
@@ -332,6 +370,7 @@ def get_user_applications(user):
 # ---------------------------------------------
 @user_jobs_bp.route("/applications/recruiter", methods=["GET"])
 @token_required
+@versions.conditional(versions.RECRUITER_APPLICATIONS)
 def get_applications_for_recruiter(user):
     if user.get("role") != "recruiter":
         return jsonify({"error": "Only recruiters can view applications"}), 403
@@ -349,7 +388,7 @@ def get_applications_for_recruiter(user):
         # Scenario A: Filtering by a specific job ID passed in the URL
         if filter_job_id:
             # Check if the job actually belongs to the recruiter before proceeding
-            job_check = supabase.table("jobs").select("id").eq("id", filter_job_id).eq("recruiter_id", user["auth_uid"]).execute()
+            job_check = execute("jobs.probe", supabase.table("jobs").select("id").eq("id", filter_job_id).eq("recruiter_id", user["auth_uid"]), idempotent=True)
             if not job_check.data:
                 # If the job doesn't exist or doesn't belong to this recruiter, return empty list
                 return jsonify({"page": page, "page_size": page_size, "total": 0, "applications": []}), 200
@@ -359,7 +398,7 @@ def get_applications_for_recruiter(user):
         # Scenario B: No job_id passed, fetch ALL jobs for this recruiter
         else:
             # fetch job ids for this recruiter
-            jobs_resp = supabase.table("jobs").select("id").eq("recruiter_id", user["auth_uid"]).execute()
+            jobs_resp = execute("jobs.list_ids", supabase.table("jobs").select("id").eq("recruiter_id", user["auth_uid"]), idempotent=True)
             job_ids = [j["id"] for j in (jobs_resp.data or [])]
 
         if not job_ids:
@@ -373,15 +412,16 @@ def get_applications_for_recruiter(user):
         )
 
         # Execute the paginated response
-        apps_resp = (
+        apps_resp = execute(
+            "applications.list_recruiter",
             apps_query
             .order("applied_at", desc=True)
-            .range(offset, to_index)
-            .execute()
+            .range(offset, to_index),
+            idempotent=True,
         )
 
         # get total count for these jobs (Use the same .in_() filter)
-        total_resp = supabase.table("applications").select("id", count="exact").in_("job_id", job_ids).execute()
+        total_resp = execute("applications.count_recruiter", supabase.table("applications").select("id", count="exact").in_("job_id", job_ids), idempotent=True)
         total = getattr(total_resp, "count", None) or 0
 
         applications = apps_resp.data or []
@@ -401,64 +441,98 @@ def get_applications_for_recruiter(user):
             "applications": applications
         }), 200
 
+    except UpstreamUnavailable as e:
+        return unavailable_response(e)
+
     except Exception as e:
         return jsonify({"error": f"Failed to fetch recruiter applications: {str(e)}"}), 500
 
 
 
 
+# ---------------------------------------------
+# 6b. SEARCH APPLICANT RESUMES (Recruiter)
+# GET /applications/recruiter/search?q=python+django&job_id=<optional>&page=1
+# only applications to the recruiter's own jobs are searched
+# ---------------------------------------------
+@user_jobs_bp.route("/applications/recruiter/search", methods=["GET"])
+@token_required
+def search_applicant_resumes(user):
+    if user.get("role") != "recruiter":
+        return jsonify({"error": "Only recruiters can search applications"}), 403
+
+    search_query = (request.args.get("q") or "").strip()
+    if not search_query:
+        return jsonify({"error": "q is required"}), 400
+
+    page, page_size = _get_pagination_params()
+    offset = (page - 1) * page_size
+
+    try:
+        resp = search_resumes(user["auth_uid"], search_query, request.args.get("job_id"), offset, page_size)
+
+        return jsonify({
+            "page": page,
+            "page_size": page_size,
+            "total": getattr(resp, "count", None) or 0,
+            "results": resp.data or []
+        }), 200
+
+    except UpstreamUnavailable as e:
+        return unavailable_response(e)
+
+    except Exception as e:
+        return jsonify({"error": f"Failed to search applications: {str(e)}"}), 500
+
+
+
+
 # ---------------------------------------------
 # 7. UPDATE APPLICATION (PATCH /applications/<id>)
 # - recruiter: update status (selected, rejected, under-review)
 # - candidate: update resume_url and/or cover_letter
 # ---------------------------------------------
 @user_jobs_bp.route("/applications/<application_id>", methods=["PATCH"])
+@validate_body(UpdateApplicationRequest)
 @token_required
-def update_application(user, application_id):
-   data = request.get_json() or {}
-
-
+def update_application(user, application_id, body):
    # --- recruiter updates status ---
    if user.get("role") == "recruiter":
-       new_status = data.get("status")
+       new_status = body.status
        if not new_status:
            return jsonify({"error": "status is required for recruiter updates"}), 400
 
 
        try:
-           app_check = supabase.table("applications").select("job_id").eq("id", application_id).single().execute()
-           if not app_check.data:
+           outcome, application = update_application_status(application_id, user["auth_uid"], new_status)
+           if outcome == NOT_FOUND:
                return jsonify({"error": "Application not found"}), 404
-
-
-           job_id = app_check.data.get("job_id")
-           job_check = supabase.table("jobs").select("recruiter_id").eq("id", job_id).single().execute()
-           if not job_check.data or job_check.data.get("recruiter_id") != user["auth_uid"]:
+           if outcome == FORBIDDEN:
                return jsonify({"error": "Unauthorized"}), 403
 
 
-           upd_resp = supabase.table("applications").update({"status": new_status}).eq("id", application_id).execute()
-           return jsonify({"message": "Application status updated", "application": upd_resp.data[0] if upd_resp.data else {}}), 200
+           versions.bump(versions.RECRUITER_APPLICATIONS, user["auth_uid"])
+           versions.bump(versions.APPLICATIONS, (application or {}).get("candidate_id"))
+           outbox.wake()
+           return jsonify({"message": "Application status updated", "application": application or {}}), 200
 
 
+       except UpstreamUnavailable as e:
+           return unavailable_response(e)
+
        except Exception as e:
            return jsonify({"error": f"Failed to update status: {str(e)}"}), 500
 
 
    # --- candidate updates resume/cover ---
    elif user.get("role") == "candidate":
-       resume_url = data.get("resume_url")
-       cover_letter = data.get("cover_letter")
+       resume_url = body.resume_url
+       cover_letter = body.cover_letter
        if not resume_url and cover_letter is None:
            return jsonify({"error": "resume_url or cover_letter required"}), 400
 
 
        try:
-           app_check = supabase.table("applications").select("candidate_id").eq("id", application_id).single().execute()
-           if not app_check.data or app_check.data.get("candidate_id") != user["auth_uid"]:
-               return jsonify({"error": "Unauthorized"}), 403
-
-
            upd = {}
            if resume_url:
                upd["resume_url"] = resume_url
@@ -466,10 +540,24 @@ def update_application(user, application_id):
                upd["cover_letter"] = cover_letter
 
 
-           upd_resp = supabase.table("applications").update(upd).eq("id", application_id).execute()
-           return jsonify({"message": "Application updated", "application": upd_resp.data[0] if upd_resp.data else {}}), 200
+           # not found and not theirs look the same, reported as 403
+           outcome, application = update_owned("applications", application_id, "candidate_id", user["auth_uid"], upd)
+           if outcome != OK:
+               return jsonify({"error": "Unauthorized"}), 403
 
 
+           versions.bump(versions.APPLICATIONS, user["auth_uid"])
+           if resume_url:
+               outbox.wake()
+           else:
+               # a cover letter edit writes no outbox event
+               versions.bump_recruiter_of(application.get("job_id"))
+           return jsonify({"message": "Application updated", "application": application}), 200
+
+
+       except UpstreamUnavailable as e:
+           return unavailable_response(e)
+
        except Exception as e:
            return jsonify({"error": f"Failed to update application: {str(e)}"}), 500
 
@@ -492,14 +580,63 @@ def withdraw_application(user, application_id):
 
 
    try:
-       app_check = supabase.table("applications").select("candidate_id").eq("id", application_id).single().execute()
-       if not app_check.data or app_check.data.get("candidate_id") != user["auth_uid"]:
+       outcome, _ = delete_owned("applications", application_id, "candidate_id", user["auth_uid"])
+       if outcome != OK:
            return jsonify({"error": "Application not found or unauthorized"}), 404
 
 
-       supabase.table("applications").delete().eq("id", application_id).execute()
+       versions.bump(versions.APPLICATIONS, user["auth_uid"])
+       outbox.wake()
        return jsonify({"message": "Application withdrawn"}), 200
 
 
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
    except Exception as e:
        return jsonify({"error": f"Failed to withdraw application: {str(e)}"}), 500
+
+
+
+
+# ---------------------------------------------
+# Resume Routes
+# ---------------------------------------------
+
+
+
+
+# ---------------------------------------------
+# 9. UPLOAD RESUME (Candidate)
+# POST /resumes   multipart/form-data, field "resume"
+# returns { resume_url } ready to pass to POST /applications;
+# uploading the same file again reuses the stored copy
+# ---------------------------------------------
+@user_jobs_bp.route("/resumes", methods=["POST"])
+@token_required
+def upload_resume(user):
+   if user.get("role") != "candidate":
+       return jsonify({"error": "Only candidate can upload resumes"}), 403
+
+
+   if not (request.mimetype or "").startswith("multipart/form-data"):
+       return jsonify({"error": "multipart/form-data body with a resume file is required"}), 400
+
+
+   try:
+       stored = receive_resume(request.environ, user["auth_uid"])
+       status = 200 if stored["deduplicated"] else 201
+       return jsonify({"message": "Resume uploaded successfully", **stored}), status
+
+
+   except ValueError as e:
+       return jsonify({"error": str(e)}), 400
+
+   except RequestEntityTooLarge as e:
+       return jsonify({"error": e.description}), 413
+
+   except UpstreamUnavailable as e:
+       return unavailable_response(e)
+
+   except Exception as e:
+       return jsonify({"error": f"Failed to upload resume: {str(e)}"}), 500
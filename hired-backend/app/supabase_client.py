@@ -1,4 +1,4 @@
-from supabase import create_client
+from supabase import create_client, ClientOptions
 import os
 from dotenv import load_dotenv
 
@@ -7,4 +7,11 @@ load_dotenv()
 url = os.getenv("SUPABASE_URL")
 key = os.getenv("SUPABASE_SERVICE_KEY")
 
-supabase = create_client(url, key)
+# Hard ceiling on the HTTP client so calls abandoned by the resilience layer's
+# deadlines don't keep a call thread busy much past the longest deadline.
+timeout = float(os.getenv("SUPABASE_HTTP_TIMEOUT", os.getenv("SUPABASE_WRITE_DEADLINE", 8)))
+
+supabase = create_client(url, key, options=ClientOptions(
+    postgrest_client_timeout=timeout,
+    storage_client_timeout=int(timeout),
+))
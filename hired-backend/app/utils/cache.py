@@ -0,0 +1,64 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ---------------------------------------------
+# In-process TTL cache
+# ---------------------------------------------
+# Bounded LRU with a per-entry TTL. Each worker has its own copy; mutation
+# routes keep them coherent across workers through the invalidation bus
+# (app/utils/invalidation.py).
+#
+# That only holds when the bus reaches every worker, i.e. with
+# INVALIDATION_BACKEND=redis. With the in-memory backend a write is only seen
+# by the worker that made it, so the job cache is off unless
+# JOB_CACHE_ENABLED=true says otherwise (e.g. a single worker).
+
+JOB_CACHE_ENABLED = os.getenv(
+    "JOB_CACHE_ENABLED",
+    "false" if os.getenv("INVALIDATION_BACKEND", "memory") == "memory" else "true",
+).lower() == "true"
+JOB_CACHE_TTL = float(os.getenv("JOB_CACHE_TTL", 30.0))
+JOB_CACHE_SIZE = int(os.getenv("JOB_CACHE_SIZE", 5000))
+
+
+class TTLCache:
+    def __init__(self, ttl, max_size):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# job_id -> job row, for get_job_by_id; max_size 0 stores nothing
+job_cache = TTLCache(JOB_CACHE_TTL, JOB_CACHE_SIZE if JOB_CACHE_ENABLED else 0)
@@ -0,0 +1,249 @@
+import math
+import os
+import threading
+import time
+
+from flask import g, jsonify, request
+
+# ---------------------------------------------
+# Adaptive concurrency limiting and load shedding
+# ---------------------------------------------
+# Everything here is sized from the worker's thread count (WEB_THREADS,
+# exported by serve.py): a worker can never run more requests than it has
+# threads, so limits above that would never trigger.
+#
+# Two checks run before the handler, and a request failing either gets
+# 503 + Retry-After right away, which frees its thread for other work:
+#
+# 1. Priority gate. Each class may only occupy part of the worker's threads:
+#    LOW leaves CONCURRENCY_RESERVE_NORMAL + CONCURRENCY_RESERVE_HIGH of them
+#    free, NORMAL leaves CONCURRENCY_RESERVE_HIGH free, HIGH may use all.
+#    A flood of expensive listings can therefore never take the last threads
+#    away from job lookups and logins.
+#
+# 2. Per-endpoint AIMD limit on in-flight requests, starting at the class's
+#    share of the threads:
+#    - a request finishing under LATENCY_TARGET_MS for its priority class
+#      nudges the limit up by 1/limit (additive increase, ~+1 per window)
+#    - a request over target, or a 503/504 from upstream, multiplies it by
+#      BACKOFF (multiplicative decrease), at most once per cooldown
+#    Client-paced routes (uploads) take as long as the client's connection
+#    does, so their latency says nothing about us; only errors shrink them.
+#
+# "critical" routes and the internal blueprint bypass both checks.
+
+CONCURRENCY_LIMIT_ENABLED = os.getenv("CONCURRENCY_LIMIT_ENABLED", "true").lower() == "true"
+WORKER_THREADS = max(1, int(os.getenv("WEB_THREADS", 10)))
+MIN_LIMIT = int(os.getenv("CONCURRENCY_MIN_LIMIT", 1))
+BACKOFF = float(os.getenv("CONCURRENCY_BACKOFF", 0.8))
+COOLDOWN = float(os.getenv("CONCURRENCY_COOLDOWN", 1.0))
+RETRY_AFTER = int(os.getenv("CONCURRENCY_RETRY_AFTER", 1))
+RESERVE_HIGH = float(os.getenv("CONCURRENCY_RESERVE_HIGH", 0.2))
+RESERVE_NORMAL = float(os.getenv("CONCURRENCY_RESERVE_NORMAL", 0.2))
+
+CRITICAL = "critical"
+HIGH = "high"
+NORMAL = "normal"
+LOW = "low"
+
+# class -> (initial limit as a share of the worker's threads, latency target in ms)
+PRIORITY_CLASSES = {
+    HIGH: (1.0, float(os.getenv("LATENCY_TARGET_HIGH_MS", 300))),
+    NORMAL: (0.5, float(os.getenv("LATENCY_TARGET_NORMAL_MS", 800))),
+    LOW: (0.25, float(os.getenv("LATENCY_TARGET_LOW_MS", 2000))),
+}
+
+# endpoint -> priority class; anything not listed is NORMAL
+ROUTE_PRIORITIES = {
+    "home_page": CRITICAL,
+    "auth_bp.auth_health": CRITICAL,
+    "job_bp.health": CRITICAL,
+    "user_jobs_bp.auth_health": CRITICAL,
+    "static": CRITICAL,
+    "job_bp.get_job_by_id": HIGH,
+    "job_bp.get_jobs_batch": HIGH,
+    "job_bp.suggest_jobs": HIGH,
+    "auth_bp.login": HIGH,
+    "job_bp.get_all_jobs": NORMAL,
+    "user_jobs_bp.get_applications_for_recruiter": LOW,
+    "user_jobs_bp.search_applicant_resumes": LOW,
+    "user_jobs_bp.upload_resume": LOW,
+}
+
+# endpoints whose duration is set by the client's upload speed
+CLIENT_PACED = {"user_jobs_bp.upload_resume"}
+
+
+def class_capacity(threads=WORKER_THREADS):
+    """class -> how many of the worker's threads requests of that class may occupy."""
+    high = round(threads * RESERVE_HIGH)
+    normal = round(threads * RESERVE_NORMAL)
+    return {
+        HIGH: threads,
+        NORMAL: max(1, threads - high),
+        LOW: max(1, threads - high - normal),
+    }
+
+
+def initial_limit(priority, threads=WORKER_THREADS):
+    share, _ = PRIORITY_CLASSES[priority]
+    return max(MIN_LIMIT, min(class_capacity(threads)[priority], round(threads * share)))
+
+
+class PriorityGate:
+    """Worker-wide count of in-flight requests, with threads held back for higher classes."""
+
+    def __init__(self, threads=WORKER_THREADS):
+        self.capacity = class_capacity(threads)
+        self.in_flight = 0
+        self.shed = {priority: 0 for priority in self.capacity}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, priority):
+        with self._lock:
+            if self.in_flight >= self.capacity[priority]:
+                self.shed[priority] += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def snapshot(self):
+        with self._lock:
+            return {"in_flight": self.in_flight, "capacity": dict(self.capacity), "shed": dict(self.shed)}
+
+
+class AIMDLimiter:
+    def __init__(self, name, initial_limit, target_ms, max_limit=WORKER_THREADS, latency_bound=True):
+        self.name = name
+        self.limit = float(initial_limit)
+        self.max_limit = max_limit
+        self.target_ms = target_ms
+        self.latency_bound = latency_bound
+        self.in_flight = 0
+        self.shed = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def try_acquire(self):
+        with self._lock:
+            if self.in_flight >= math.floor(self.limit):
+                self.shed += 1
+                return False
+            self.in_flight += 1
+            return True
+
+    def release(self, latency_ms, overloaded=False):
+        with self._lock:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if overloaded or (self.latency_bound and latency_ms > self.target_ms):
+                if now - self._last_decrease >= COOLDOWN:
+                    self.limit = max(MIN_LIMIT, self.limit * BACKOFF)
+                    self._last_decrease = now
+            elif self.in_flight + 1 >= math.floor(self.limit) - 1:
+                # only grow when we were actually near the limit
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "limit": round(self.limit, 2),
+                "in_flight": self.in_flight,
+                "target_ms": self.target_ms if self.latency_bound else None,
+                "shed": self.shed,
+            }
+
+
+_gate = PriorityGate()
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter_for(endpoint):
+    """(priority, limiter), or None for endpoints that are never limited."""
+    priority = ROUTE_PRIORITIES.get(endpoint, NORMAL)
+    # operators must be able to look at an overloaded worker
+    if priority == CRITICAL or endpoint.startswith("internal_bp."):
+        return None
+
+    limiter = _limiters.get(endpoint)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(endpoint)
+            if limiter is None:
+                _, target_ms = PRIORITY_CLASSES[priority]
+                limiter = AIMDLimiter(
+                    endpoint,
+                    initial_limit(priority),
+                    target_ms,
+                    max_limit=_gate.capacity[priority],
+                    latency_bound=endpoint not in CLIENT_PACED,
+                )
+                _limiters[endpoint] = limiter
+    return priority, limiter
+
+
+def _before_request():
+    if request.method == "OPTIONS" or not request.endpoint:
+        return None
+
+    entry = _limiter_for(request.endpoint)
+    if entry is None:
+        return None
+    priority, limiter = entry
+
+    if not _gate.try_acquire(priority):
+        return _busy()
+    if not limiter.try_acquire():
+        _gate.release()
+        return _busy()
+
+    g._concurrency = (limiter, time.perf_counter())
+    return None
+
+
+def _busy():
+    response = jsonify({"error": "Server is busy, please retry shortly"})
+    response.headers["Retry-After"] = str(RETRY_AFTER)
+    return response, 503
+
+
+def _teardown_request(exc):
+    slot = g.pop("_concurrency", None)
+    if slot is None:
+        return
+    limiter, started = slot
+    status = getattr(g, "_concurrency_status", None)
+    _gate.release()
+    limiter.release(
+        (time.perf_counter() - started) * 1000,
+        overloaded=exc is not None or status in (503, 504),
+    )
+
+
+def _after_request(response):
+    if "_concurrency" in g:
+        g._concurrency_status = response.status_code
+    return response
+
+
+def stats():
+    with _limiters_lock:
+        limiters = dict(_limiters)
+    return {
+        "threads": WORKER_THREADS,
+        "classes": _gate.snapshot(),
+        "endpoints": {name: limiter.snapshot() for name, limiter in limiters.items()},
+    }
+
+
+def init_app(app):
+    if not CONCURRENCY_LIMIT_ENABLED:
+        return
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
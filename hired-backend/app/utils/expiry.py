@@ -0,0 +1,184 @@
+import os
+import random
+import threading
+from datetime import datetime, timezone
+
+from app.supabase_client import supabase
+from app.utils.cache import TTLCache
+from app.utils.invalidation import bus
+from app.utils.resilience import execute
+from app.utils.suggest import suggest_index
+
+# ---------------------------------------------
+# Job expiry
+# ---------------------------------------------
+# A background sweeper flips jobs whose application_deadline has passed from
+# status 'open' to 'expired', EXPIRY_BATCH_SIZE rows per update, and
+# publishes a jobs event for each so caches and other workers' typeahead
+# drop them; this worker's typeahead is updated directly.
+# The update is filtered on status = 'open', so several workers sweeping at
+# once is harmless.
+#
+# apply_job / save_job call is_expired() first, which only consults memory:
+# deadlines seen on reads and writes in this process, plus the ids the
+# sweeper expired. It answers 410 without a round trip when it knows, and
+# treats an unknown job as open. The check that holds is in the database:
+# an insert trigger on applications / saved_jobs refuses a closed job with
+# JOB_CLOSED_CODE (see supabase/migrations), which the routes turn into 410
+# via is_closed_error().
+#
+# A date-only deadline means "open until the end of that day (UTC)", both
+# here and in the sweep: the database filter only narrows the candidates and
+# _parse_deadline decides. Moving the deadline of an expired job into the
+# future reopens it (reopen_on_extension, used by update_job), and every
+# jobs event drops what this process remembered about the job.
+
+EXPIRY_SWEEP_ENABLED = os.getenv("EXPIRY_SWEEP_ENABLED", "true").lower() == "true"
+EXPIRY_SWEEP_INTERVAL = float(os.getenv("EXPIRY_SWEEP_INTERVAL", 300.0))
+EXPIRY_BATCH_SIZE = int(os.getenv("EXPIRY_BATCH_SIZE", 200))
+
+OPEN = "open"
+EXPIRED = "expired"
+# SQLSTATE raised by the refuse_closed_job trigger
+JOB_CLOSED_CODE = "HJ410"
+
+# job_id -> deadline (datetime, or None for "no deadline")
+_deadlines = TTLCache(ttl=3600.0, max_size=50000)
+_expired_ids = TTLCache(ttl=3600.0, max_size=50000)
+_stop = threading.Event()
+_thread = None
+
+
+def _parse_deadline(value):
+    if not value:
+        return None
+    try:
+        if len(value) == 10:
+            # date only: open until the end of that day (UTC)
+            return datetime.fromisoformat(value).replace(hour=23, minute=59, second=59, tzinfo=timezone.utc)
+        deadline = datetime.fromisoformat(value)
+        return deadline if deadline.tzinfo else deadline.replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_past(deadline, now=None):
+    return deadline is not None and deadline < (now or datetime.now(timezone.utc))
+
+
+def remember(job):
+    """Record a job row's deadline/status seen by a route."""
+    if not job or "id" not in job:
+        return
+    job_id = str(job["id"])
+    if job.get("status") == EXPIRED:
+        _expired_ids.set(job_id, True)
+        return
+    if job.get("status") == OPEN:
+        _expired_ids.delete(job_id)
+    if "application_deadline" in job:
+        _deadlines.set(job_id, _parse_deadline(job.get("application_deadline")))
+
+
+def forget(job_id):
+    _expired_ids.delete(str(job_id))
+    _deadlines.delete(str(job_id))
+
+
+def reopen_on_extension(values):
+    """
+    update_job values, plus status 'open' when they move the deadline into
+    the future: an expired job whose deadline is extended takes applications
+    again.
+    """
+    if "status" in values or not values.get("application_deadline"):
+        return values
+    deadline = _parse_deadline(values["application_deadline"])
+    if deadline is None or _is_past(deadline):
+        return values
+    return {**values, "status": OPEN}
+
+
+def is_expired(job_id):
+    job_id = str(job_id)
+    if _expired_ids.get(job_id):
+        return True
+    return _is_past(_deadlines.get(job_id))
+
+
+def is_closed_error(e):
+    """Whether an insert was refused because its job is closed."""
+    return getattr(e, "code", None) == JOB_CLOSED_CODE
+
+
+def sweep_once():
+    """Expire every open job past its deadline. Returns the number expired."""
+    now = datetime.now(timezone.utc)
+    expired, last_id = 0, None
+
+    while True:
+        # a superset: date-only deadlines of today also compare below now
+        query = (
+            supabase.table("jobs")
+            .select("id, application_deadline")
+            .eq("status", OPEN)
+            .lt("application_deadline", now.isoformat())
+        )
+        if last_id is not None:
+            query = query.gt("id", last_id)
+        due = execute("expiry.due", query.order("id").limit(EXPIRY_BATCH_SIZE), idempotent=True)
+        rows = due.data or []
+        if not rows:
+            break
+        last_id = rows[-1]["id"]
+
+        ids = [row["id"] for row in rows if _is_past(_parse_deadline(row.get("application_deadline")), now)]
+        if not ids:
+            if len(rows) < EXPIRY_BATCH_SIZE:
+                break
+            continue
+
+        updated = execute(
+            "expiry.mark",
+            supabase.table("jobs")
+            .update({"status": EXPIRED})
+            .in_("id", ids)
+            .eq("status", OPEN),
+        )
+        for row in updated.data or []:
+            # publish first: the jobs handler forgets what we knew about the row
+            bus.notify("jobs", row["id"])
+            suggest_index.remove_job(row["id"])
+            _expired_ids.set(str(row["id"]), True)
+            expired += 1
+
+        if len(rows) < EXPIRY_BATCH_SIZE:
+            break
+
+    return expired
+
+
+def _run():
+    # spread workers out so they don't all sweep at the same instant
+    _stop.wait(random.uniform(0, min(EXPIRY_SWEEP_INTERVAL, 30.0)))
+    while not _stop.is_set():
+        try:
+            count = sweep_once()
+            if count:
+                print(f"Expired {count} job(s) past their application deadline")
+        except Exception as e:
+            print(f"Job expiry sweep failed: {e}")
+        _stop.wait(EXPIRY_SWEEP_INTERVAL)
+
+
+def _on_job_changed(job_id, event):
+    # the row may have been reopened or deleted; the next read re-learns it
+    forget(job_id)
+
+
+def init_app(app):
+    global _thread
+    bus.subscribe("jobs", _on_job_changed)
+    if EXPIRY_SWEEP_ENABLED and not (_thread and _thread.is_alive()):
+        _thread = threading.Thread(target=_run, name="job-expiry-sweeper", daemon=True)
+        _thread.start()
@@ -0,0 +1,230 @@
+import itertools
+import json
+import os
+import threading
+import time
+import uuid
+
+from app.utils.cache import TTLCache, job_cache
+from app.utils.resilience import stale_cache
+
+# ---------------------------------------------
+# Cross-worker cache invalidation bus
+# ---------------------------------------------
+# Mutation routes notify ("jobs", job_id) after a successful write; every
+# worker (on every node, with the redis backend) runs the handlers that
+# subscribed to that topic and drops its cached copies. notify() never
+# raises: the write has committed, so a Redis failure only costs the other
+# workers' freshness (bounded by their TTLs), not the response.
+#
+# Events carry a version from one counter per backend, so versions increase
+# per key. Handlers only see an event once per version, so duplicates (e.g.
+# our own event echoed back by redis) and out-of-order deliveries are
+# ignored. The last version seen is kept for INVALIDATION_SEEN_TTL; an event
+# older than that is simply applied again, which is harmless.
+#
+# The redis listener reconnects after a dropped connection. Events published
+# meanwhile are lost, so on reconnect the bus runs its resync handlers, which
+# drop everything they cache.
+#
+#   INVALIDATION_BACKEND=memory   single process only: other workers never hear
+#                                 of a write (default; see cache.py)
+#   INVALIDATION_BACKEND=redis    any Redis-compatible server, INVALIDATION_REDIS_URL
+
+INVALIDATION_BACKEND = os.getenv("INVALIDATION_BACKEND", "memory")
+INVALIDATION_REDIS_URL = os.getenv("INVALIDATION_REDIS_URL", "redis://localhost:6379/0")
+INVALIDATION_CHANNEL = os.getenv("INVALIDATION_CHANNEL", "hirify:invalidation")
+INVALIDATION_SEEN_TTL = float(os.getenv("INVALIDATION_SEEN_TTL", 3600.0))
+INVALIDATION_SEEN_MAX = int(os.getenv("INVALIDATION_SEEN_MAX", 100000))
+INVALIDATION_RECONNECT_MAX = float(os.getenv("INVALIDATION_RECONNECT_MAX", 30.0))
+# bounds INCR / PUBLISH, which run on request threads
+INVALIDATION_REDIS_TIMEOUT = float(os.getenv("INVALIDATION_REDIS_TIMEOUT", 0.5))
+
+
+class InMemoryBackend:
+    """Delivers synchronously inside this process."""
+
+    def __init__(self):
+        self._versions = itertools.count(1)
+        self._lock = threading.Lock()
+        self._deliver = None
+
+    def start(self, deliver, resync=None):
+        self._deliver = deliver
+
+    def next_version(self, topic, key):
+        with self._lock:
+            return next(self._versions)
+
+    def publish(self, event):
+        if self._deliver:
+            self._deliver(event)
+
+
+class RedisBackend:
+    """Pub/sub over a Redis-compatible server; versions come from INCR."""
+
+    def __init__(self, url=INVALIDATION_REDIS_URL, channel=INVALIDATION_CHANNEL):
+        import redis  # optional dependency, only needed for this backend
+
+        self.channel = channel
+        self._client = redis.Redis.from_url(
+            url, socket_timeout=INVALIDATION_REDIS_TIMEOUT, socket_connect_timeout=INVALIDATION_REDIS_TIMEOUT,
+        )
+        # the subscription idles between events, so no read timeout; health
+        # checks ping it so a dead connection is noticed
+        self._subscriber = redis.Redis.from_url(
+            url, health_check_interval=30, socket_connect_timeout=INVALIDATION_REDIS_TIMEOUT,
+        )
+        self._thread = None
+        self.reconnects = 0
+
+    def start(self, deliver, resync=None):
+        self._thread = threading.Thread(target=self._listen, args=(deliver, resync), name="invalidation-listener", daemon=True)
+        self._thread.start()
+
+    def _listen(self, deliver, resync):
+        delay, connected = 0.5, False
+        while True:
+            try:
+                pubsub = self._subscriber.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                if connected and resync:
+                    # whatever was published while we were away is lost
+                    self.reconnects += 1
+                    resync()
+                connected, delay = True, 0.5
+
+                for message in pubsub.listen():
+                    try:
+                        deliver(json.loads(message["data"]))
+                    except Exception as e:
+                        print(f"Invalidation delivery failed: {e}")
+            except Exception as e:
+                print(f"Invalidation listener disconnected, retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+                delay = min(delay * 2, INVALIDATION_RECONNECT_MAX)
+
+    def next_version(self, topic, key):
+        return self._client.incr(f"{self.channel}:version")
+
+    def publish(self, event):
+        self._client.publish(self.channel, json.dumps(event))
+
+
+class InvalidationBus:
+    def __init__(self, backend=None):
+        self.node_id = uuid.uuid4().hex
+        self.backend = backend or InMemoryBackend()
+        self._handlers = {}
+        self._resync_handlers = []
+        self._seen = TTLCache(INVALIDATION_SEEN_TTL, INVALIDATION_SEEN_MAX)
+        self._lock = threading.Lock()
+        self._stats = {
+            "published": 0,
+            "delivered": 0,
+            "duplicates": 0,
+            "lag_last_ms": 0.0,
+            "lag_max_ms": 0.0,
+            "lag_avg_ms": 0.0,
+            "resyncs": 0,
+        }
+        self.backend.start(self._deliver, self._resync)
+
+    def use(self, backend):
+        self.backend = backend
+        self.backend.start(self._deliver, self._resync)
+
+    def subscribe(self, topic, handler):
+        """handler(key, event) runs once per (topic, key, version) in this process."""
+        handlers = self._handlers.setdefault(topic, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+    def on_resync(self, handler):
+        """handler() runs when events may have been missed; drop everything cached."""
+        if handler not in self._resync_handlers:
+            self._resync_handlers.append(handler)
+
+    def _resync(self):
+        with self._lock:
+            self._stats["resyncs"] += 1
+        for handler in self._resync_handlers:
+            try:
+                handler()
+            except Exception as e:
+                print(f"Invalidation resync handler failed: {e}")
+
+    def publish(self, topic, key):
+        key = str(key)
+        event = {
+            "topic": topic,
+            "key": key,
+            "version": self.backend.next_version(topic, key),
+            "origin": self.node_id,
+            "ts": time.time(),
+        }
+        with self._lock:
+            self._stats["published"] += 1
+
+        # apply locally right away; remote workers get it through the backend
+        if not isinstance(self.backend, InMemoryBackend):
+            self._deliver(event)
+        self.backend.publish(event)
+        return event
+
+    def notify(self, topic, key):
+        """publish() after a committed write: logs instead of raising."""
+        try:
+            return self.publish(topic, key)
+        except Exception as e:
+            print(f"Invalidation of {topic}:{key} not published: {e}")
+            # at least this worker drops its copies
+            self._run_handlers({"topic": topic, "key": str(key), "version": None, "origin": self.node_id, "ts": time.time()})
+            return None
+
+    def _deliver(self, event):
+        seen_key = (event["topic"], event["key"])
+        lag_ms = max(0.0, (time.time() - event["ts"]) * 1000)
+
+        with self._lock:
+            if (self._seen.get(seen_key) or 0) >= event["version"]:
+                self._stats["duplicates"] += 1
+                return
+            self._seen.set(seen_key, event["version"])
+
+            stats = self._stats
+            stats["delivered"] += 1
+            stats["lag_last_ms"] = lag_ms
+            stats["lag_max_ms"] = max(stats["lag_max_ms"], lag_ms)
+            stats["lag_avg_ms"] += 0.1 * (lag_ms - stats["lag_avg_ms"])
+
+        self._run_handlers(event)
+
+    def _run_handlers(self, event):
+        for handler in self._handlers.get(event["topic"], []):
+            try:
+                handler(event["key"], event)
+            except Exception as e:
+                print(f"Invalidation handler failed for {event['topic']}:{event['key']}: {e}")
+
+    def metrics(self):
+        with self._lock:
+            return dict(self._stats)
+
+
+bus = InvalidationBus()
+
+
+def _invalidate_job(job_id, event):
+    # The local replica is not touched here: it converges through its own
+    # updated_at watermark and is already bounded by JOB_REPLICA_MAX_LAG.
+    job_cache.delete(job_id)
+    stale_cache.delete(("jobs.get", job_id))
+
+
+def init_app(app):
+    if INVALIDATION_BACKEND == "redis" and not isinstance(bus.backend, RedisBackend):
+        bus.use(RedisBackend())
+    bus.subscribe("jobs", _invalidate_job)
+    bus.on_resync(job_cache.clear)
@@ -0,0 +1,240 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from app.supabase_client import supabase
+from app.utils.resilience import execute
+
+# ---------------------------------------------
+# Local read replica of the jobs table
+# ---------------------------------------------
+# Opt-in (JOB_REPLICA_ENABLED=true). Keeps an embedded SQLite copy of `jobs`
+# that a background thread syncs incrementally:
+#   - upserts by (updated_at, id) keyset watermark
+#   - deletes from the job_tombstones table (see supabase/migrations)
+# The public read endpoints serve from it while the last successful sync is
+# within JOB_REPLICA_MAX_LAG seconds and fall back to Supabase otherwise.
+#
+# updated_at and deleted_at are set from now(), the transaction's start time,
+# so a transaction that commits late lands behind rows already synced. Each
+# pass therefore starts JOB_REPLICA_SAFETY_LAG seconds before the highest
+# timestamp seen and re-reads that window; rows seen before are upserted
+# again, which is a no-op. The lag has to cover the longest write
+# transaction on jobs (statement_timeout bounds it).
+
+REPLICA_ENABLED = os.getenv("JOB_REPLICA_ENABLED", "false").lower() == "true"
+REPLICA_PATH = os.getenv("JOB_REPLICA_PATH", ":memory:")
+REPLICA_MAX_LAG = float(os.getenv("JOB_REPLICA_MAX_LAG", 5.0))
+REPLICA_SYNC_INTERVAL = float(os.getenv("JOB_REPLICA_SYNC_INTERVAL", 1.0))
+REPLICA_BATCH_SIZE = int(os.getenv("JOB_REPLICA_BATCH_SIZE", 500))
+REPLICA_SAFETY_LAG = float(os.getenv("JOB_REPLICA_SAFETY_LAG", 60.0))
+
+EPOCH = "1970-01-01T00:00:00+00:00"
+
+
+def _parse(ts):
+    return datetime.fromisoformat(ts.replace("Z", "+00:00"))
+
+
+def _rewind(ts, seconds):
+    return max(_parse(ts) - timedelta(seconds=seconds), _parse(EPOCH)).isoformat()
+
+
+class JobReplica:
+    def __init__(self, path=REPLICA_PATH, max_lag=REPLICA_MAX_LAG):
+        self.path = path
+        self.max_lag = max_lag
+        self.enabled = False
+        self.last_synced = 0.0
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+        self._db = None
+
+    # -------------------------
+    # Storage
+    # -------------------------
+    def _connect(self):
+        db = sqlite3.connect(self.path, check_same_thread=False)
+        db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                title TEXT,
+                status TEXT,
+                created_at TEXT,
+                updated_at TEXT,
+                doc TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS jobs_status_created_at_idx ON jobs (status, created_at DESC);
+            CREATE TABLE IF NOT EXISTS watermarks (
+                name TEXT PRIMARY KEY,
+                value TEXT NOT NULL
+            );
+        """)
+        return db
+
+    def _watermark(self, name, default):
+        row = self._db.execute("SELECT value FROM watermarks WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_watermark(self, name, value):
+        self._db.execute(
+            "INSERT INTO watermarks (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = excluded.value",
+            (name, json.dumps(value)),
+        )
+
+    def _upsert(self, rows):
+        self._db.executemany(
+            "INSERT INTO jobs (id, title, status, created_at, updated_at, doc) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET title = excluded.title, status = excluded.status, "
+            "created_at = excluded.created_at, updated_at = excluded.updated_at, doc = excluded.doc "
+            # a re-read of the overlap window must not undo a newer apply()
+            "WHERE jobs.updated_at IS NULL OR excluded.updated_at IS NULL OR excluded.updated_at >= jobs.updated_at",
+            [
+                (str(r["id"]), r.get("title"), r.get("status", "open"), r.get("created_at"), r.get("updated_at"), json.dumps(r))
+                for r in rows
+            ],
+        )
+
+    # -------------------------
+    # Sync
+    # -------------------------
+    def _page(self, op, table, columns, ts_column, id_column, ts, last_id):
+        query = supabase.table(table).select(columns)
+        if last_id:
+            query = query.or_(f'{ts_column}.gt."{ts}",and({ts_column}.eq."{ts}",{id_column}.gt.{last_id})')
+        else:
+            query = query.gte(ts_column, ts)
+
+        resp = execute(
+            op,
+            query.order(ts_column).order(id_column).limit(REPLICA_BATCH_SIZE),
+            idempotent=True,
+        )
+        return resp.data or []
+
+    def _pull(self, name, op, table, columns, ts_column, id_column, apply_rows):
+        """
+        One keyset pass over (ts_column, id_column), starting REPLICA_SAFETY_LAG
+        before the watermark. The watermark only ever moves forward.
+        """
+        with self._lock:
+            high = self._watermark(name, EPOCH)
+        ts, last_id = _rewind(high, REPLICA_SAFETY_LAG), ""
+        while True:
+            rows = self._page(op, table, columns, ts_column, id_column, ts, last_id)
+            if rows:
+                ts, last_id = rows[-1][ts_column], str(rows[-1][id_column])
+                with self._lock, self._db:
+                    apply_rows(rows)
+                    if _parse(ts) > _parse(high):
+                        high = ts
+                        self._set_watermark(name, high)
+
+            if len(rows) < REPLICA_BATCH_SIZE:
+                return
+
+    def _pull_changes(self):
+        self._pull("jobs", "replica.jobs", "jobs", "*", "updated_at", "id", self._upsert)
+
+    def _pull_tombstones(self):
+        self._pull(
+            "tombstones", "replica.tombstones", "job_tombstones", "job_id, deleted_at", "deleted_at", "job_id",
+            lambda rows: self._db.executemany("DELETE FROM jobs WHERE id = ?", [(str(r["job_id"]),) for r in rows]),
+        )
+
+    def sync_once(self):
+        started = time.time()
+        self._pull_changes()
+        self._pull_tombstones()
+        self.last_synced = started
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.sync_once()
+            except Exception as e:
+                print(f"Job replica sync failed: {e}")
+            self._stop.wait(REPLICA_SYNC_INTERVAL)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._db = self._db or self._connect()
+        self.enabled = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="job-replica-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    # -------------------------
+    # Writes from this process (read-your-writes until the next sync)
+    # -------------------------
+    def apply(self, job):
+        if not self.enabled or not job:
+            return
+        with self._lock, self._db:
+            self._upsert([job])
+
+    def forget(self, job_id):
+        if not self.enabled:
+            return
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM jobs WHERE id = ?", (str(job_id),))
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def is_fresh(self):
+        return self.enabled and time.time() - self.last_synced <= self.max_lag
+
+    def get_job(self, job_id):
+        with self._lock:
+            row = self._db.execute("SELECT doc FROM jobs WHERE id = ?", (str(job_id),)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_jobs(self, job_ids):
+        """id -> job for the ids present in the replica."""
+        ids = [str(job_id) for job_id in job_ids]
+        found = {}
+        with self._lock:
+            # stay well under SQLite's bound-parameter limit
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT id, doc FROM jobs WHERE id IN ({','.join('?' * len(chunk))})", chunk
+                ).fetchall()
+                found.update((row[0], json.loads(row[1])) for row in rows)
+        return found
+
+    def list_jobs(self, offset, limit, search_query=None, include_expired=False):
+        clauses, params = [], []
+        if not include_expired:
+            clauses.append("status = 'open'")
+        if search_query:
+            # same semantics as PostgREST ilike: % and _ stay wildcards
+            clauses.append("title LIKE ?")
+            params.append(f"%{search_query}%")
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            total = self._db.execute(f"SELECT COUNT(*) FROM jobs {where}", params).fetchone()[0]
+            rows = self._db.execute(
+                f"SELECT doc FROM jobs {where} ORDER BY created_at DESC LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return [json.loads(r[0]) for r in rows], total
+
+
+job_replica = JobReplica()
+
+
+def init_app(app):
+    if REPLICA_ENABLED:
+        job_replica.start()
@@ -0,0 +1,90 @@
+from app.supabase_client import supabase
+from app.utils.resilience import execute
+
+# ---------------------------------------------
+# Ownership-checked mutations
+# ---------------------------------------------
+# Every mutation is one round trip, hit or miss.
+#
+# A candidate's own rows (update_owned / delete_owned) push ownership into
+# the write itself, an extra .eq() on the owner column:
+#   rows      -> OK
+#   no rows   -> NOT_FOUND (a row owned by someone else looks the same)
+#
+# Jobs and recruiter status changes, which must answer 404 and 403
+# separately, go through RPCs (supabase/migrations). They check ownership
+# inside the database and report the outcome with the row.
+
+OK = "ok"
+NOT_FOUND = "not_found"
+FORBIDDEN = "forbidden"
+
+
+def update_owned(table, row_id, owner_column, owner_id, values):
+    """Update a row only if owner_column matches. Returns (outcome, row)."""
+    resp = execute(
+        f"{table}.update",
+        supabase.table(table)
+        .update(values)
+        .eq("id", row_id)
+        .eq(owner_column, owner_id),
+    )
+    if resp.data:
+        return OK, resp.data[0]
+    return NOT_FOUND, None
+
+
+def delete_owned(table, row_id, owner_column, owner_id):
+    """Delete a row only if owner_column matches. Returns (outcome, row)."""
+    resp = execute(
+        f"{table}.delete",
+        supabase.table(table)
+        .delete()
+        .eq("id", row_id)
+        .eq(owner_column, owner_id),
+    )
+    if resp.data:
+        return OK, resp.data[0]
+    return NOT_FOUND, None
+
+
+def _rpc_outcome(resp, key):
+    result = resp.data or {}
+    if isinstance(result, list):
+        result = result[0] if result else {}
+
+    return result.get("outcome", NOT_FOUND), result.get(key)
+
+
+def update_owned_job(job_id, recruiter_id, values):
+    """update_owned() for jobs via the update_job_owned RPC. Returns (outcome, row)."""
+    resp = execute("jobs.update", supabase.rpc("update_job_owned", {
+        "p_job_id": job_id,
+        "p_recruiter_id": recruiter_id,
+        "p_values": values,
+    }))
+    return _rpc_outcome(resp, "job")
+
+
+def delete_owned_job(job_id, recruiter_id):
+    """delete_owned() for jobs via the delete_job_owned RPC. Returns (outcome, row)."""
+    resp = execute("jobs.delete", supabase.rpc("delete_job_owned", {
+        "p_job_id": job_id,
+        "p_recruiter_id": recruiter_id,
+    }))
+    return _rpc_outcome(resp, "job")
+
+
+def update_application_status(application_id, recruiter_id, status):
+    """
+    Recruiter status change. The application -> job -> recruiter chain is
+    resolved inside the update_application_status RPC
+    (supabase/migrations/..._owned_mutations.sql), which reports the outcome
+    alongside the updated row. Returns (outcome, row).
+    """
+    resp = execute("applications.update_status", supabase.rpc("update_application_status", {
+        "p_application_id": application_id,
+        "p_recruiter_id": recruiter_id,
+        "p_status": status,
+    }))
+    return _rpc_outcome(resp, "application")
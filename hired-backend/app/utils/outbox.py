@@ -0,0 +1,305 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future, wait
+from datetime import datetime, timedelta, timezone
+
+from app.supabase_client import supabase
+from app.utils.resilience import execute
+
+# ---------------------------------------------
+# Outbox worker
+# ---------------------------------------------
+# Database triggers append an event to outbox_events in the same transaction
+# as every job / application write (see supabase/migrations). Routes only
+# call wake() after the write; the side effects run here, off the request.
+#
+# Workers claim a batch with a lease (claim_outbox_events), run every
+# consumer registered for each event's topic, then mark the batch delivered
+# in one update. A failed event is released with exponential backoff and
+# retried until OUTBOX_MAX_ATTEMPTS, after which it is parked (failed_at)
+# for the replay tool. Delivery is at-least-once: a consumer can see the
+# same event twice and must be idempotent.
+#
+# A slow consumer (resume indexing) returns a Future instead of doing the
+# work inline: the batch's events are handed off one after another, and an
+# event is acked or released once its futures settle. While a batch is in
+# progress the worker renews the lease on its unfinished events every third
+# of OUTBOX_LEASE_SECONDS, so they are not reclaimed (and their attempts
+# raised) just because the batch as a whole takes longer than one lease.
+#
+# replay() re-runs consumers over already delivered history without
+# touching delivery state, to rebuild derived data (python outbox_replay.py).
+
+OUTBOX_ENABLED = os.getenv("OUTBOX_ENABLED", "true").lower() == "true"
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", 2))
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 50))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", 2.0))
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", 120))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 10))
+OUTBOX_BACKOFF_BASE = float(os.getenv("OUTBOX_BACKOFF_BASE", 2.0))
+OUTBOX_BACKOFF_MAX = float(os.getenv("OUTBOX_BACKOFF_MAX", 600.0))
+OUTBOX_RETENTION_DAYS = float(os.getenv("OUTBOX_RETENTION_DAYS", 7))
+OUTBOX_PURGE_INTERVAL = 3600.0
+
+
+def _now():
+    return datetime.now(timezone.utc)
+
+
+def backoff_seconds(attempts):
+    """Full jitter: uniform in [0, min(max, base * 2^(attempts-1))]."""
+    return random.uniform(0, min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * 2 ** max(0, attempts - 1)))
+
+
+class Outbox:
+    def __init__(self, workers=OUTBOX_WORKERS, batch_size=OUTBOX_BATCH_SIZE):
+        self.workers = workers
+        self.batch_size = batch_size
+        self._consumers = {}
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._threads = []
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self._stats = {
+            "claimed": 0,
+            "delivered": 0,
+            "retried": 0,
+            "parked": 0,
+            "batches": 0,
+            "renewals": 0,
+            "lag_last_ms": 0.0,
+        }
+
+    # -------------------------
+    # Wiring
+    # -------------------------
+    def register(self, topic, consumer):
+        """
+        consumer(event) runs for every event on `topic`; raise to retry. It may
+        return a Future, and the event is done when that settles.
+        """
+        consumers = self._consumers.setdefault(topic, [])
+        if consumer not in consumers:
+            consumers.append(consumer)
+
+    def wake(self):
+        """Called by routes after a write so delivery starts without waiting for the poll."""
+        self._wake.set()
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            for i in range(self.workers):
+                thread = threading.Thread(target=self._run, name=f"outbox-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    # -------------------------
+    # Delivery
+    # -------------------------
+    def _deliver(self, event):
+        """Run the consumers; returns the futures of those still working."""
+        pending = []
+        for consumer in self._consumers.get(event["topic"], []):
+            result = consumer(event)
+            if isinstance(result, Future):
+                pending.append(result)
+        return pending
+
+    def drain_once(self):
+        """Claim and deliver one batch. Returns the number of events claimed."""
+        resp = execute("outbox.claim", supabase.rpc("claim_outbox_events", {
+            "p_batch_size": self.batch_size,
+            "p_lease_seconds": OUTBOX_LEASE_SECONDS,
+        }))
+        events = sorted(resp.data or [], key=lambda e: e["id"])
+        if not events:
+            return 0
+
+        lease = _Lease(self, [event["id"] for event in events])
+        delivered, waiting = [], []
+        for event in events:
+            lease.keep()
+            try:
+                pending = self._deliver(event)
+            except Exception as e:
+                lease.drop(event["id"])
+                self._release(event, e)
+                continue
+            if pending:
+                waiting.append((event, pending))
+            else:
+                lease.drop(event["id"])
+                delivered.append(event["id"])
+
+        for event, pending in waiting:
+            try:
+                for future in pending:
+                    while not wait([future], timeout=lease.due_in()).done:
+                        lease.keep()
+                    future.result()
+                delivered.append(event["id"])
+            except Exception as e:
+                self._release(event, e)
+            lease.drop(event["id"])
+
+        if delivered:
+            execute(
+                "outbox.ack",
+                supabase.table("outbox_events")
+                .update({"delivered_at": _now().isoformat(), "locked_until": None, "last_error": None})
+                .in_("id", delivered),
+            )
+
+        created = datetime.fromisoformat(events[-1]["created_at"])
+        with self._lock:
+            self._stats["claimed"] += len(events)
+            self._stats["delivered"] += len(delivered)
+            self._stats["batches"] += 1
+            self._stats["lag_last_ms"] = round(max(0.0, (_now() - created).total_seconds() * 1000), 2)
+        return len(events)
+
+    def _renew(self, ids):
+        execute(
+            "outbox.renew",
+            supabase.table("outbox_events")
+            .update({"locked_until": (_now() + timedelta(seconds=OUTBOX_LEASE_SECONDS)).isoformat()})
+            .in_("id", ids)
+            .is_("delivered_at", "null"),
+        )
+        self._count("renewals")
+
+    def _release(self, event, error):
+        attempts = event.get("attempts") or 1
+        update = {"locked_until": None, "last_error": str(error)[:1000]}
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            update["failed_at"] = _now().isoformat()
+            self._count("parked")
+            print(f"Outbox event {event['id']} parked after {attempts} attempts: {error}")
+        else:
+            update["available_at"] = (_now() + timedelta(seconds=backoff_seconds(attempts))).isoformat()
+            self._count("retried")
+
+        execute("outbox.release", supabase.table("outbox_events").update(update).eq("id", event["id"]))
+
+    def purge_delivered(self):
+        cutoff = (_now() - timedelta(days=OUTBOX_RETENTION_DAYS)).isoformat()
+        execute("outbox.purge", supabase.table("outbox_events").delete().lt("delivered_at", cutoff))
+
+    def _run(self):
+        # spread workers out so they don't all poll at the same instant
+        self._stop.wait(random.uniform(0, OUTBOX_POLL_INTERVAL))
+        while not self._stop.is_set():
+            try:
+                if self.drain_once() >= self.batch_size:
+                    continue  # backlog: keep draining without sleeping
+
+                if time.monotonic() - self._last_purge > OUTBOX_PURGE_INTERVAL:
+                    self._last_purge = time.monotonic()
+                    self.purge_delivered()
+            except Exception as e:
+                print(f"Outbox drain failed: {e}")
+
+            self._wake.wait(OUTBOX_POLL_INTERVAL + random.uniform(0, OUTBOX_POLL_INTERVAL / 2))
+            self._wake.clear()
+
+    # -------------------------
+    # Replay / repair
+    # -------------------------
+    def replay(self, topic=None, since_id=None, until_id=None, since=None, page_size=500):
+        """
+        Run the consumers again over stored events in id order, delivered or
+        not, without changing their delivery state. Returns (replayed, failed).
+        """
+        replayed = failed = 0
+        last_id = (since_id or 1) - 1
+        while True:
+            query = supabase.table("outbox_events").select("*").gt("id", last_id)
+            if topic:
+                query = query.eq("topic", topic)
+            if until_id:
+                query = query.lte("id", until_id)
+            if since:
+                query = query.gte("created_at", since)
+
+            resp = execute("outbox.replay", query.order("id").limit(page_size), idempotent=True)
+            events = resp.data or []
+            for event in events:
+                try:
+                    for future in self._deliver(event):
+                        future.result()
+                    replayed += 1
+                except Exception as e:
+                    failed += 1
+                    print(f"Replay of outbox event {event['id']} failed: {e}")
+            if len(events) < page_size:
+                return replayed, failed
+            last_id = events[-1]["id"]
+
+    def requeue_failed(self, topic=None):
+        """Give parked events a fresh set of attempts. Returns how many."""
+        query = (
+            supabase.table("outbox_events")
+            .update({"failed_at": None, "attempts": 0, "available_at": _now().isoformat()})
+            .not_.is_("failed_at", "null")
+        )
+        if topic:
+            query = query.eq("topic", topic)
+        resp = execute("outbox.requeue", query)
+        return len(resp.data or [])
+
+    # -------------------------
+    # Metrics
+    # -------------------------
+    def _count(self, name, delta=1):
+        with self._lock:
+            self._stats[name] += delta
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats["workers"] = len(self._threads)
+        stats["topics"] = {topic: len(consumers) for topic, consumers in self._consumers.items()}
+        return stats
+
+
+class _Lease:
+    """The claimed events a worker is still working on, renewed every third of the lease."""
+
+    def __init__(self, outbox, ids):
+        self.outbox = outbox
+        self.ids = set(ids)
+        self.interval = OUTBOX_LEASE_SECONDS / 3
+        self.renewed_at = time.monotonic()
+
+    def drop(self, event_id):
+        self.ids.discard(event_id)
+
+    def due_in(self):
+        return max(0.0, self.renewed_at + self.interval - time.monotonic())
+
+    def keep(self):
+        if not self.ids or self.due_in() > 0:
+            return
+        try:
+            self.outbox._renew(sorted(self.ids))
+        except Exception as e:
+            # the lease may lapse; another worker then redelivers, which is allowed
+            print(f"Outbox lease renewal failed: {e}")
+        self.renewed_at = time.monotonic()
+
+
+outbox = Outbox()
+
+
+def init_app(app):
+    if OUTBOX_ENABLED:
+        outbox.start()
@@ -0,0 +1,272 @@
+import cProfile
+import itertools
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+
+from flask import g, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+from app.middlewares.internal_middleware import is_internal_request
+
+# ---------------------------------------------
+# Request profiling
+# ---------------------------------------------
+# Off unless PROFILING_ENABLED=true; then two independent pieces:
+#
+# 1. On-demand profile of one request. An internal caller (X-Internal-Token)
+#    adds "X-Profile: sample" (wall-clock stack sampler, sees time blocked on
+#    Supabase) or "X-Profile: cprofile" (deterministic, CPU-heavy code). The
+#    response carries X-Profile-Id; the collapsed stacks are served from
+#    /api/v1/internal/profiles/<id>.
+#
+# 2. Slow-request sampling. Requests slower than SLOW_REQUEST_MS are kept,
+#    with probability SLOW_REQUEST_SAMPLE_RATE (default 0, i.e. off), along
+#    with a per-phase breakdown: auth, profile_fetch, queries, serialization,
+#    handler (the rest).
+#
+# Phase timings come from the resilience layer (every Supabase call reports
+# its op name), so routes need no instrumentation. Serialization is only
+# timed with PROFILE_SERIALIZATION=true, which wraps the app's JSON provider;
+# otherwise it counts as handler time.
+#
+# Access control: there is no admin role. X-Profile and the internal routes
+# serving the results trust anyone holding the shared INTERNAL_API_TOKEN
+# (app/middlewares/internal_middleware.py), so treat that token like an
+# operator credential.
+#
+# Every request's phases are also summed into the I/O ratio serve.py sizes
+# its thread count from: time waiting on Supabase (auth, profile_fetch,
+# queries) over total request time, reported by io_ratio().
+
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+PROFILE_SERIALIZATION = os.getenv("PROFILE_SERIALIZATION", "false").lower() == "true"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", 1000))
+SLOW_REQUEST_SAMPLE_RATE = float(os.getenv("SLOW_REQUEST_SAMPLE_RATE", 0.0))
+SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", 0.005))
+MAX_PROFILES = int(os.getenv("PROFILE_MAX_STORED", 20))
+MAX_SLOW_REQUESTS = int(os.getenv("SLOW_REQUEST_MAX_STORED", 200))
+
+_profiles = OrderedDict()
+_slow_requests = deque(maxlen=MAX_SLOW_REQUESTS)
+_lock = threading.Lock()
+_ids = itertools.count(1)
+_io_totals = {"requests": 0, "wait_s": 0.0, "total_s": 0.0}
+
+WAIT_PHASES = ("auth", "profile_fetch", "queries")
+
+
+# -------------------------
+# Phase accounting
+# -------------------------
+def _phase_for(op):
+    if op.startswith("auth."):
+        return "auth"
+    if op == "users.get":
+        return "profile_fetch"
+    return "queries"
+
+
+def record_call(op, seconds):
+    """Called by the resilience layer for every Supabase call."""
+    if has_request_context() and hasattr(g, "_phases"):
+        phase = _phase_for(op)
+        g._phases[phase] = g._phases.get(phase, 0.0) + seconds
+
+
+class TimedJSONProvider(DefaultJSONProvider):
+    def response(self, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return super().response(*args, **kwargs)
+        finally:
+            if has_request_context() and hasattr(g, "_phases"):
+                g._phases["serialization"] = g._phases.get("serialization", 0.0) + time.perf_counter() - started
+
+
+# -------------------------
+# Stack sampler
+# -------------------------
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class StackSampler:
+    """Samples one thread's stack on a timer and folds it into collapsed form."""
+
+    def __init__(self, thread_id, interval=SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+def _collapse_cprofile(profiler):
+    """caller;callee edges weighted by time in microseconds (two-frame stacks)."""
+    stats = pstats.Stats(profiler)
+    lines = []
+    for func, (_, _, tottime, _, callers) in stats.stats.items():
+        callee = f"{func[2]} ({os.path.basename(func[0])}:{func[1]})"
+        if not callers:
+            lines.append((f"{callee}", tottime))
+            continue
+        for caller, caller_stats in callers.items():
+            share = caller_stats[2]  # tottime attributed to this caller
+            label = f"{caller[2]} ({os.path.basename(caller[0])}:{caller[1]})"
+            lines.append((f"{label};{callee}", share))
+    lines.sort(key=lambda l: -l[1])
+    return "\n".join(f"{stack} {int(seconds * 1e6)}" for stack, seconds in lines if seconds > 0)
+
+
+# -------------------------
+# Request hooks
+# -------------------------
+def _before_request():
+    g._started = time.perf_counter()
+    g._phases = {}
+    g._profiler = None
+
+    mode = request.headers.get("X-Profile")
+    if mode and is_internal_request():
+        if mode == "cprofile":
+            g._profiler = ("cprofile", cProfile.Profile())
+            g._profiler[1].enable()
+        else:
+            g._profiler = ("sample", StackSampler(threading.get_ident()))
+            g._profiler[1].start()
+
+
+def _store_profile(mode, collapsed, total_ms, phases):
+    profile_id = str(next(_ids))
+    with _lock:
+        _profiles[profile_id] = {
+            "id": profile_id,
+            "mode": mode,
+            "method": request.method,
+            "path": request.path,
+            "total_ms": round(total_ms, 2),
+            "phases_ms": phases,
+            "collapsed": collapsed,
+        }
+        while len(_profiles) > MAX_PROFILES:
+            _profiles.popitem(last=False)
+    return profile_id
+
+
+def _after_request(response):
+    if not hasattr(g, "_started"):
+        return response
+
+    total_ms = (time.perf_counter() - g._started) * 1000
+    phases = {name: round(seconds * 1000, 2) for name, seconds in g._phases.items()}
+    phases["handler"] = round(max(0.0, total_ms - sum(phases.values())), 2)
+
+    if request.blueprint != "internal_bp":
+        wait_s = sum(g._phases.get(phase, 0.0) for phase in WAIT_PHASES)
+        with _lock:
+            _io_totals["requests"] += 1
+            _io_totals["wait_s"] += wait_s
+            _io_totals["total_s"] += total_ms / 1000
+
+    if g._profiler:
+        mode, profiler = g._profiler
+        if mode == "cprofile":
+            profiler.disable()
+            collapsed = _collapse_cprofile(profiler)
+        else:
+            collapsed = profiler.stop()
+        g._profiler = None
+        response.headers["X-Profile-Id"] = _store_profile(mode, collapsed, total_ms, phases)
+
+    if total_ms >= SLOW_REQUEST_MS and random.random() < SLOW_REQUEST_SAMPLE_RATE:
+        with _lock:
+            _slow_requests.append({
+                "method": request.method,
+                "path": request.path,
+                "endpoint": request.endpoint,
+                "status": response.status_code,
+                "total_ms": round(total_ms, 2),
+                "phases_ms": phases,
+                "at": time.time(),
+            })
+
+    return response
+
+
+# -------------------------
+# Read side (internal routes)
+# -------------------------
+def list_profiles():
+    with _lock:
+        return [{k: v for k, v in p.items() if k != "collapsed"} for p in _profiles.values()]
+
+
+def get_profile(profile_id):
+    with _lock:
+        return _profiles.get(profile_id)
+
+
+def slow_requests():
+    with _lock:
+        return list(_slow_requests)
+
+
+def io_ratio():
+    """Measured share of request time spent waiting on Supabase (WEB_IO_RATIO)."""
+    with _lock:
+        totals = dict(_io_totals)
+    ratio = totals["wait_s"] / totals["total_s"] if totals["total_s"] else None
+    return {"requests": totals["requests"], "io_ratio": round(ratio, 3) if ratio is not None else None}
+
+
+def slow_requests_collapsed():
+    """endpoint;phase <microseconds>, summed over the sampled slow requests."""
+    folded = Counter()
+    for entry in slow_requests():
+        root = f"{entry['method']} {entry['endpoint'] or entry['path']}"
+        for phase, ms in entry["phases_ms"].items():
+            folded[f"{root};{phase}"] += int(ms * 1000)
+    return "\n".join(f"{stack} {us}" for stack, us in folded.most_common())
+
+
+def _teardown_request(exc):
+    # the handler raised before after_request could stop the profiler
+    profiler = getattr(g, "_profiler", None)
+    if profiler:
+        mode, profiler = profiler
+        profiler.disable() if mode == "cprofile" else profiler.stop()
+        g._profiler = None
+
+
+def init_app(app):
+    if not PROFILING_ENABLED:
+        return
+    if PROFILE_SERIALIZATION:
+        app.json = TimedJSONProvider(app)
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,189 @@
+import hashlib
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# ---------------------------------------------
+# Token-bucket rate limiting
+# ---------------------------------------------
+# Every (budget, scope, key) has a bucket holding up to `capacity` tokens that
+# refills at capacity / period tokens per second. A request takes one token
+# or is refused with the number of seconds until one is available.
+#
+# Scopes: "ip" is the client address, "account" is the email in the request
+# body (hashed, so no addresses end up in the store). Login is limited on
+# both, so a bot rotating addresses still hits the per-account budget.
+#
+#   RATE_LIMIT_BACKEND=memory   per worker, LRU bounded by RATE_LIMIT_MAX_KEYS (default)
+#   RATE_LIMIT_BACKEND=redis    shared by all workers, RATE_LIMIT_REDIS_URL
+#
+# If redis is unreachable the worker falls back to its own memory store
+# rather than failing every request.
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", os.getenv("INVALIDATION_REDIS_URL", "redis://localhost:6379/0"))
+RATE_LIMIT_PREFIX = os.getenv("RATE_LIMIT_PREFIX", "hirify:ratelimit")
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", 100000))
+# Number of proxies we control in front of the app (0: none, use the peer
+# address). Each appends the address it received the request from to
+# X-Forwarded-For, so the client is the entry that many from the right;
+# anything further left is whatever the client chose to send.
+RATE_LIMIT_TRUSTED_PROXIES = int(os.getenv(
+    "RATE_LIMIT_TRUSTED_PROXIES",
+    1 if os.getenv("RATE_LIMIT_TRUST_PROXY", "false").lower() == "true" else 0,
+))
+
+
+def _budget(name, default):
+    """RATE_LIMIT_<NAME>="capacity/period_seconds", e.g. "10/60"."""
+    raw = os.getenv(f"RATE_LIMIT_{name.upper().replace('.', '_')}", default)
+    capacity, period = raw.split("/")
+    return int(capacity), float(period)
+
+
+# budget -> scope -> (capacity, period in seconds)
+BUDGETS = {
+    "login": {
+        "ip": _budget("login.ip", "20/60"),
+        "account": _budget("login.account", "5/300"),
+    },
+    "signup": {
+        "ip": _budget("signup.ip", "5/3600"),
+        "account": _budget("signup.account", "3/3600"),
+    },
+    "jobs.list": {
+        "ip": _budget("jobs.list.ip", "120/60"),
+    },
+}
+
+
+class MemoryBucketStore:
+    """Buckets for this worker only; least recently used keys are evicted."""
+
+    def __init__(self, max_keys=RATE_LIMIT_MAX_KEYS):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, period):
+        rate = capacity / period
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, 0.0 if allowed else (1 - tokens) / rate
+
+    def size(self):
+        with self._lock:
+            return len(self._buckets)
+
+
+# KEYS[1] bucket; ARGV capacity, rate (tokens/s), now (s), ttl (s)
+_TAKE_SCRIPT = """
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], ARGV[4])
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBucketStore:
+    """Buckets shared by every worker; one atomic script call per request."""
+
+    def __init__(self, url=RATE_LIMIT_REDIS_URL, prefix=RATE_LIMIT_PREFIX):
+        import redis  # optional dependency, only needed for this backend
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=0.2, socket_connect_timeout=0.2)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+
+    def take(self, key, capacity, period):
+        rate = capacity / period
+        # a full bucket is the same as no bucket, so the key can expire then
+        ttl = max(1, math.ceil(period))
+        allowed, tokens = self._take(keys=[f"{self.prefix}:{key}"], args=[capacity, rate, time.time(), ttl])
+        tokens = float(tokens)
+        return bool(allowed), 0.0 if allowed else (1 - tokens) / rate
+
+    def size(self):
+        return None
+
+
+class RateLimiter:
+    def __init__(self, store=None):
+        self.store = store or MemoryBucketStore()
+        self._fallback = self.store
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def use(self, store):
+        self.store = store
+
+    def check(self, budget, scope, key):
+        """(allowed, retry_after_seconds) for one request against one bucket."""
+        capacity, period = BUDGETS[budget][scope]
+        bucket_key = f"{budget}:{scope}:{key}"
+        try:
+            allowed, retry_after = self.store.take(bucket_key, capacity, period)
+        except Exception as e:
+            print(f"Rate limit store failed, using local buckets: {e}")
+            allowed, retry_after = self._fallback.take(bucket_key, capacity, period)
+
+        with self._lock:
+            counts = self._stats.setdefault(budget, {"allowed": 0, "limited": 0})
+            counts["allowed" if allowed else "limited"] += 1
+        return allowed, retry_after
+
+    def stats(self):
+        with self._lock:
+            by_budget = {name: dict(counts) for name, counts in self._stats.items()}
+        return {
+            "backend": type(self.store).__name__,
+            "keys": self.store.size(),
+            "budgets": by_budget,
+        }
+
+
+limiter = RateLimiter()
+
+
+def client_ip(request, trusted_proxies=None):
+    hops = RATE_LIMIT_TRUSTED_PROXIES if trusted_proxies is None else trusted_proxies
+    if hops > 0:
+        forwarded = [ip.strip() for ip in request.headers.get("X-Forwarded-For", "").split(",") if ip.strip()]
+        if len(forwarded) >= hops:
+            return forwarded[-hops]
+        # fewer entries than proxies: the chain isn't ours, don't trust any of it
+    return request.remote_addr or "unknown"
+
+
+def account_key(email):
+    if not email or not isinstance(email, str):
+        return None
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()[:32]
+
+
+def init_app(app):
+    if RATE_LIMIT_ENABLED and RATE_LIMIT_BACKEND == "redis" and not isinstance(limiter.store, RedisBucketStore):
+        limiter.use(RedisBucketStore())
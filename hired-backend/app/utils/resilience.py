@@ -0,0 +1,319 @@
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import httpx
+from flask import jsonify
+
+from app.utils.profiling import record_call
+
+# ---------------------------------------------
+# Resilience layer around Supabase calls
+# ---------------------------------------------
+# Every PostgREST / auth / storage call goes through call():
+#   - per-operation deadline (the caller stops waiting, the worker is freed)
+#   - bounded retries with full jitter, only for idempotent reads
+#   - optional hedged request for tail latency on hot reads
+#   - one circuit breaker per upstream (postgrest, auth, storage) that fails fast
+#     and serves the last good response for the same cache_key when open
+#
+# A write that fails after it may have reached Supabase (deadline, dropped
+# connection, gateway 502/504) raises UpstreamOutcomeUnknown rather than a
+# plain UpstreamUnavailable: the abandoned call can still commit, so the
+# client must not be told to retry blindly.
+#
+# A call abandoned at its deadline keeps its executor thread until the HTTP
+# client's own timeout (SUPABASE_HTTP_TIMEOUT, by default the write deadline)
+# ends it. At most SUPABASE_CALL_THREADS calls are in flight per worker; past
+# that, calls fail fast instead of queueing behind abandoned ones.
+
+READ_DEADLINE = float(os.getenv("SUPABASE_READ_DEADLINE", 3.0))
+WRITE_DEADLINE = float(os.getenv("SUPABASE_WRITE_DEADLINE", 8.0))
+AUTH_DEADLINE = float(os.getenv("SUPABASE_AUTH_DEADLINE", 5.0))
+READ_RETRIES = int(os.getenv("SUPABASE_READ_RETRIES", 2))
+RETRY_BASE_DELAY = float(os.getenv("SUPABASE_RETRY_BASE_DELAY", 0.05))
+RETRY_MAX_DELAY = float(os.getenv("SUPABASE_RETRY_MAX_DELAY", 1.0))
+HEDGE_DELAY = float(os.getenv("SUPABASE_HEDGE_DELAY", 0.25))
+HEDGING_ENABLED = os.getenv("SUPABASE_HEDGING", "false").lower() == "true"
+BREAKER_FAILURES = int(os.getenv("SUPABASE_BREAKER_FAILURES", 5))
+BREAKER_RESET = float(os.getenv("SUPABASE_BREAKER_RESET", 30.0))
+STALE_CACHE_SIZE = int(os.getenv("SUPABASE_STALE_CACHE_SIZE", 1024))
+
+CALL_THREADS = int(os.getenv("SUPABASE_CALL_THREADS", 32))
+
+# Failures that say something about upstream health, together with 5xx
+# responses (see _is_server_error). Anything else (PostgREST 4xx, .single()
+# on zero rows, ...) is the caller's problem and neither retried nor counted
+# against the breaker.
+TRANSIENT_ERRORS = (TimeoutError, httpx.TransportError)
+
+# Transport failures that happen before the request is sent.
+NOT_SENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+# PostgREST connection errors and SQLSTATE classes that mean the database,
+# not the request, is in trouble.
+SERVER_ERROR_CODES = ("PGRST0", "08", "53", "57", "58", "XX")
+
+_executor = ThreadPoolExecutor(max_workers=CALL_THREADS, thread_name_prefix="supabase-call")
+_inflight = threading.BoundedSemaphore(CALL_THREADS)
+
+
+class UpstreamUnavailable(Exception):
+    """Raised when Supabase is unhealthy and no stale response is available."""
+
+
+class UpstreamOutcomeUnknown(UpstreamUnavailable):
+    """A write failed after it may have been applied; retrying could duplicate it."""
+
+
+class CallPoolSaturated(UpstreamUnavailable):
+    """Every call thread is busy (mostly with abandoned calls); nothing was sent."""
+
+
+class CircuitBreaker:
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name, failure_threshold=BREAKER_FAILURES, reset_timeout=BREAKER_RESET):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                # let a single probe through
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def release_probe(self):
+        """The half-open probe never reached upstream; let the next call probe instead."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class StaleCache:
+    """Bounded LRU of last good responses, used only while a breaker is open."""
+
+    def __init__(self, max_size=STALE_CACHE_SIZE):
+        self.max_size = max_size
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._data:
+                return None
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+breakers = {
+    "postgrest": CircuitBreaker("postgrest"),
+    "auth": CircuitBreaker("auth"),
+    "storage": CircuitBreaker("storage"),
+}
+stale_cache = StaleCache()
+
+
+def _upstream(op):
+    prefix = op.split(".", 1)[0]
+    return prefix if prefix in ("auth", "storage") else "postgrest"
+
+
+def _default_deadline(op, idempotent):
+    if op.startswith("auth."):
+        return AUTH_DEADLINE
+    return READ_DEADLINE if idempotent else WRITE_DEADLINE
+
+
+def _status(e):
+    """The HTTP status of a failed call, when the error carries one."""
+    status = getattr(e, "status", None)
+    if status is None and e.args and isinstance(e.args[0], dict):
+        # storage3 errors carry the response as a dict
+        status = e.args[0].get("statusCode")
+    if status is None:
+        # postgrest puts the HTTP status (an int) in code when the body isn't
+        # JSON; a string code is a SQLSTATE or PGRST code, even all digits
+        code = getattr(e, "code", None)
+        status = code if isinstance(code, int) else None
+    try:
+        return int(status)
+    except (TypeError, ValueError):
+        return None
+
+
+def _is_server_error(e):
+    status = _status(e)
+    if status is not None:
+        return status >= 500
+    code = getattr(e, "code", None)
+    return isinstance(code, str) and code.startswith(SERVER_ERROR_CODES)
+
+
+def _outcome_unknown(e):
+    """Whether a failed write may still have been applied upstream."""
+    if isinstance(e, NOT_SENT_ERRORS):
+        return False
+    if isinstance(e, TRANSIENT_ERRORS):
+        return True
+    return _status(e) in (502, 504)
+
+
+def _submit(fn):
+    if not _inflight.acquire(blocking=False):
+        raise CallPoolSaturated("all Supabase call threads are busy")
+    try:
+        future = _executor.submit(fn)
+    except Exception:
+        _inflight.release()
+        raise
+    future.add_done_callback(lambda _: _inflight.release())
+    return future
+
+
+def _run_with_deadline(fn, deadline, hedge):
+    futures = [_submit(fn)]
+    started = time.monotonic()
+
+    if hedge:
+        done, _ = wait(futures, timeout=min(HEDGE_DELAY, deadline))
+        if not done:
+            try:
+                futures.append(_submit(fn))
+            except CallPoolSaturated:
+                pass
+
+    remaining = deadline - (time.monotonic() - started)
+    while futures and remaining > 0:
+        done, pending = wait(futures, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None or not pending:
+                for other in pending:
+                    other.cancel()
+                return future.result()
+        # one hedge failed, keep waiting on the other
+        futures = list(pending)
+        remaining = deadline - (time.monotonic() - started)
+
+    for future in futures:
+        future.cancel()
+    raise TimeoutError(f"deadline of {deadline:.2f}s exceeded")
+
+
+def call(op, fn, idempotent=False, hedge=False, cache_key=None, deadline=None):
+    """
+    Run fn() against Supabase under the resilience policy for `op`.
+    op is a dotted name such as "jobs.list" or "auth.get_user".
+    """
+    started = time.perf_counter()
+    try:
+        return _call(op, fn, idempotent, hedge, cache_key, deadline)
+    finally:
+        record_call(op, time.perf_counter() - started)
+
+
+def _call(op, fn, idempotent, hedge, cache_key, deadline):
+    breaker = breakers[_upstream(op)]
+    deadline = deadline or _default_deadline(op, idempotent)
+    attempts = 1 + (READ_RETRIES if idempotent else 0)
+    hedge = hedge and idempotent and HEDGING_ENABLED
+
+    if not breaker.allow():
+        stale = stale_cache.get(cache_key) if cache_key else None
+        if stale is not None:
+            return stale
+        raise UpstreamUnavailable(f"{breaker.name} circuit open ({op})")
+
+    last_error = None
+    for attempt in range(attempts):
+        try:
+            result = _run_with_deadline(fn, deadline, hedge)
+        except CallPoolSaturated:
+            # local backlog, says nothing about upstream health
+            breaker.release_probe()
+            raise
+        except Exception as e:
+            if not isinstance(e, TRANSIENT_ERRORS) and not _is_server_error(e):
+                # upstream answered, the request itself was rejected
+                breaker.record_success()
+                raise
+            breaker.record_failure()
+            last_error = e
+            if not idempotent and _outcome_unknown(e):
+                raise UpstreamOutcomeUnknown(f"{op} outcome unknown: {e}") from e
+            if attempt + 1 < attempts and breaker.allow():
+                time.sleep(random.uniform(0, min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * 2 ** attempt)))
+                continue
+            break
+
+        breaker.record_success()
+        if cache_key:
+            stale_cache.set(cache_key, result)
+        return result
+
+    stale = stale_cache.get(cache_key) if cache_key else None
+    if stale is not None:
+        return stale
+    raise UpstreamUnavailable(f"{op} failed: {last_error}") from last_error
+
+
+def execute(op, query, idempotent=False, hedge=False, cache_key=None, deadline=None):
+    """Shorthand for PostgREST builders: execute(op, supabase.table(...)...)."""
+    return call(op, query.execute, idempotent=idempotent, hedge=hedge, cache_key=cache_key, deadline=deadline)
+
+
+def unavailable_response(e):
+    """
+    503 for routes that hit an open breaker with nothing stale to serve.
+    A write with an unknown outcome gets 504 and no Retry-After instead.
+    """
+    if isinstance(e, UpstreamOutcomeUnknown):
+        return jsonify({
+            "error": "The request timed out and may still have been applied. "
+                     "Check its result before retrying."
+        }), 504
+
+    response = jsonify({"error": f"Service temporarily unavailable: {str(e)}"})
+    response.headers["Retry-After"] = str(int(BREAKER_RESET))
+    return response, 503
@@ -0,0 +1,272 @@
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from urllib.parse import urlparse
+
+import httpx
+
+from app.supabase_client import supabase
+from app.utils.cache import TTLCache
+from app.utils.outbox import outbox
+from app.utils.resilience import execute
+from app.utils.resume_storage import storage_backend
+from app.utils.text_extraction import extract_text
+
+# ---------------------------------------------
+# Resume text-extraction and indexing pipeline
+# ---------------------------------------------
+# Applications arrive through the outbox (an "applications" event per insert
+# or resume change). The consumer only submit()s the row to a bounded queue
+# and hands the outbox a Future; pipeline threads download the resume, send
+# the bytes to a process pool for parsing (so CPU-heavy PDF work never runs
+# on a request or outbox thread, or holds the GIL) and upsert the text into
+# resume_texts, whose generated tsvector column is the searchable index (see
+# supabase/migrations). Every row carries recruiter_id, so search is scoped
+# to the recruiter's own jobs by a plain filter. The outbox acks the event
+# when the Future resolves and retries it when it fails.
+#
+# Backpressure: when the queue is full submit() raises IndexQueueFull and
+# counts the item as rejected; the outbox releases the event with backoff
+# and it is submitted again later.
+#
+# Only URLs issued by our own resume storage are fetched: resume_url is
+# client-supplied, and fetching arbitrary URLs (or file:// paths) from the
+# server would leak internal content into the index.
+
+RESUME_INDEX_ENABLED = os.getenv("RESUME_INDEX_ENABLED", "true").lower() == "true"
+RESUME_INDEX_QUEUE_SIZE = int(os.getenv("RESUME_INDEX_QUEUE_SIZE", 1000))
+# Every web worker has its own pool; together they get about half the CPUs.
+# serve.py exports WEB_WORKERS to its workers.
+RESUME_INDEX_PROCESSES = int(os.getenv(
+    "RESUME_INDEX_PROCESSES",
+    max(1, (os.cpu_count() or 2) // (2 * int(os.getenv("WEB_WORKERS", 1)))),
+))
+# threads also wait on downloads, so a few more than processes
+RESUME_INDEX_THREADS = int(os.getenv("RESUME_INDEX_THREADS", RESUME_INDEX_PROCESSES + 1))
+RESUME_FETCH_TIMEOUT = float(os.getenv("RESUME_FETCH_TIMEOUT", 20.0))
+RESUME_FETCH_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", 10 * 1024 * 1024))
+RESUME_EXTRACT_TIMEOUT = float(os.getenv("RESUME_EXTRACT_TIMEOUT", 60.0))
+
+THROUGHPUT_WINDOW = 60.0
+
+
+def _fetch(url):
+    parsed = urlparse(url)
+    if parsed.scheme == "file":
+        path = storage_backend.local_path(url)
+        if path is None:
+            raise ValueError("resume_url is outside resume storage")
+        with open(path, "rb") as f:
+            return f.read(RESUME_FETCH_MAX_BYTES + 1)[:RESUME_FETCH_MAX_BYTES]
+
+    with httpx.stream("GET", url, timeout=RESUME_FETCH_TIMEOUT, follow_redirects=True) as resp:
+        resp.raise_for_status()
+        chunks, size = [], 0
+        for chunk in resp.iter_bytes():
+            size += len(chunk)
+            if size > RESUME_FETCH_MAX_BYTES:
+                raise ValueError("resume exceeds size limit")
+            chunks.append(chunk)
+        return b"".join(chunks)
+
+
+class IndexQueueFull(Exception):
+    """The indexing queue is at capacity; try again later."""
+
+
+class ResumePipeline:
+    def __init__(self, processes=RESUME_INDEX_PROCESSES, threads=RESUME_INDEX_THREADS, queue_size=RESUME_INDEX_QUEUE_SIZE):
+        self.processes = processes
+        self.threads = threads
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._pool = None
+        self._threads = []
+        self._lock = threading.Lock()
+        self._completed = deque()
+        self._recruiters = TTLCache(ttl=300.0, max_size=10000)
+        self._stats = {
+            "enqueued": 0,
+            "rejected": 0,
+            "skipped": 0,
+            "indexed": 0,
+            "failed": 0,
+            "in_flight": 0,
+            "extract_ms_avg": 0.0,
+        }
+
+    def start(self):
+        with self._lock:
+            if self._pool:
+                return
+            # spawn, not fork: request workers already run threads. Children
+            # re-import __main__ as __mp_main__, so run.py skips create_app()
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            for i in range(self.threads):
+                thread = threading.Thread(target=self._run, name=f"resume-index-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    # -------------------------
+    # Producer side (outbox consumer)
+    # -------------------------
+    def submit(self, application):
+        """
+        Queue an application row for indexing. Never blocks. Returns a Future
+        that resolves once it is indexed, or None when there is nothing to do;
+        raises IndexQueueFull when shedding.
+        """
+        if not RESUME_INDEX_ENABLED or not application or not application.get("resume_url"):
+            return None
+
+        if not storage_backend.owns(application["resume_url"]):
+            self._count("skipped")
+            return None
+
+        self.start()
+        item = {
+            "application_id": application["id"],
+            "job_id": application.get("job_id"),
+            "candidate_id": application.get("candidate_id"),
+            "resume_url": application["resume_url"],
+        }
+        future = Future()
+        try:
+            self._queue.put_nowait((item, future))
+        except queue.Full:
+            self._count("rejected")
+            raise IndexQueueFull(f"resume index queue is full ({self._queue.maxsize})")
+
+        self._count("enqueued")
+        return future
+
+    # -------------------------
+    # Consumer side
+    # -------------------------
+    def _recruiter_for(self, job_id):
+        recruiter_id = self._recruiters.get(job_id)
+        if recruiter_id is None:
+            resp = execute(
+                "resume_index.job",
+                supabase.table("jobs").select("recruiter_id").eq("id", job_id).limit(1),
+                idempotent=True,
+            )
+            if not resp.data:
+                return None
+            recruiter_id = resp.data[0]["recruiter_id"]
+            self._recruiters.set(job_id, recruiter_id)
+        return recruiter_id
+
+    def _process(self, item):
+        recruiter_id = self._recruiter_for(item["job_id"])
+        if recruiter_id is None:
+            return  # job deleted meanwhile
+
+        data = _fetch(item["resume_url"])
+        ext = os.path.splitext(urlparse(item["resume_url"]).path)[1]
+
+        started = time.monotonic()
+        text = self._pool.submit(extract_text, data, ext).result(timeout=RESUME_EXTRACT_TIMEOUT)
+        extract_ms = (time.monotonic() - started) * 1000
+
+        execute("resume_texts.upsert", supabase.table("resume_texts").upsert({
+            "application_id": item["application_id"],
+            "job_id": item["job_id"],
+            "candidate_id": item["candidate_id"],
+            "recruiter_id": recruiter_id,
+            "resume_url": item["resume_url"],
+            "content": text,
+            "indexed_at": datetime.now(timezone.utc).isoformat(),
+        }, on_conflict="application_id"))
+
+        with self._lock:
+            self._stats["extract_ms_avg"] += 0.1 * (extract_ms - self._stats["extract_ms_avg"])
+
+    def _index(self, item):
+        self._count("in_flight")
+        try:
+            self._process(item)
+            self._count("indexed")
+            with self._lock:
+                now = time.monotonic()
+                self._completed.append(now)
+                while now - self._completed[0] > THROUGHPUT_WINDOW:
+                    self._completed.popleft()
+        except Exception:
+            self._count("failed")
+            raise
+        finally:
+            self._count("in_flight", -1)
+
+    def _run(self):
+        while True:
+            item, future = self._queue.get()
+            try:
+                if future.set_running_or_notify_cancel():
+                    self._index(item)
+                    future.set_result(True)
+            except Exception as e:
+                print(f"Resume indexing failed for application {item['application_id']}: {e}")
+                future.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    # -------------------------
+    # Metrics
+    # -------------------------
+    def _count(self, name, delta=1):
+        with self._lock:
+            self._stats[name] += delta
+
+    def stats(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._completed and now - self._completed[0] > THROUGHPUT_WINDOW:
+                self._completed.popleft()
+            stats = dict(self._stats)
+            stats["throughput_per_min"] = len(self._completed)
+        stats["queue_depth"] = self._queue.qsize()
+        stats["queue_capacity"] = self._queue.maxsize
+        return stats
+
+
+resume_pipeline = ResumePipeline()
+
+
+def _on_application_event(event):
+    # (re)index when a resume first appears or is replaced
+    payload = event.get("payload") or {}
+    if event["op"] == "insert" or (event["op"] == "update" and "resume_url" in payload.get("changed", [])):
+        return resume_pipeline.submit(payload)
+    return None
+
+
+def search_resumes(recruiter_id, query, job_id=None, offset=0, limit=10):
+    """Full-text search over resumes for applications to this recruiter's jobs."""
+    select = (
+        supabase.table("resume_texts")
+        .select("application_id, job_id, candidate_id, resume_url, indexed_at", count="exact")
+        .eq("recruiter_id", recruiter_id)
+    )
+    if job_id:
+        select = select.eq("job_id", job_id)
+
+    return execute(
+        "resume_texts.search",
+        select
+        .order("indexed_at", desc=True)
+        .range(offset, offset + limit - 1)
+        .text_search("content_tsv", query, options={"type": "web_search", "config": "english"}),
+        idempotent=True,
+    )
+
+
+def init_app(app):
+    outbox.register("applications", _on_application_event)
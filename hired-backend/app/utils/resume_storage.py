@@ -0,0 +1,183 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from urllib.parse import unquote
+
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.formparser import parse_form_data
+
+from app.utils.resilience import call
+
+# ---------------------------------------------
+# Resume uploads
+# ---------------------------------------------
+# The multipart body is parsed straight into a HashingFile: each chunk the
+# parser reads is written to a temp file on disk and fed to sha256 in the
+# same pass, so a resume is never held in memory as a whole. The object key
+# is <candidate_id>/<sha256><ext>, which makes re-uploading the same file a
+# lookup instead of a second upload.
+#
+#   RESUME_STORAGE_BACKEND=supabase   bucket RESUME_BUCKET (default)
+#   RESUME_STORAGE_BACKEND=local      files under RESUME_LOCAL_DIR (tests / dev)
+
+RESUME_STORAGE_BACKEND = os.getenv("RESUME_STORAGE_BACKEND", "supabase")
+RESUME_BUCKET = os.getenv("RESUME_BUCKET", "resumes")
+RESUME_LOCAL_DIR = os.getenv("RESUME_LOCAL_DIR", os.path.join(tempfile.gettempdir(), "hirify-resumes"))
+RESUME_LOCAL_BASE_URL = os.getenv("RESUME_LOCAL_BASE_URL", "file://" + RESUME_LOCAL_DIR)
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", 10 * 1024 * 1024))
+RESUME_UPLOAD_DEADLINE = float(os.getenv("RESUME_UPLOAD_DEADLINE", 60.0))
+
+ALLOWED_TYPES = {
+    ".pdf": "application/pdf",
+    ".doc": "application/msword",
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+}
+
+
+class HashingFile:
+    """Disk-backed file that hashes and size-checks everything written to it."""
+
+    def __init__(self, max_bytes=RESUME_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._file = tempfile.NamedTemporaryFile(prefix="resume-", delete=False)
+
+    @property
+    def path(self):
+        return self._file.name
+
+    def write(self, chunk):
+        self.size += len(chunk)
+        if self.size > self.max_bytes:
+            raise RequestEntityTooLarge(f"Resume exceeds {self.max_bytes} bytes")
+        self._sha256.update(chunk)
+        return self._file.write(chunk)
+
+    def hexdigest(self):
+        return self._sha256.hexdigest()
+
+    def discard(self):
+        self._file.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def __getattr__(self, name):
+        # seek/read/close/flush for the form parser
+        return getattr(self._file, name)
+
+
+class LocalStorageBackend:
+    def __init__(self, root=RESUME_LOCAL_DIR, base_url=RESUME_LOCAL_BASE_URL):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+
+    def exists(self, key):
+        return os.path.exists(os.path.join(self.root, key))
+
+    def put_file(self, key, path, content_type):
+        target = os.path.join(self.root, key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(path, target)
+
+    def url(self, key):
+        return f"{self.base_url}/{key}"
+
+    def local_path(self, url):
+        """
+        The file behind a URL we issued, or None. The key is unquoted and
+        resolved first, so %2e%2e/ or a symlink can't point outside root.
+        """
+        if not url.startswith(self.base_url + "/"):
+            return None
+        root = os.path.realpath(self.root)
+        path = os.path.realpath(os.path.join(root, unquote(url[len(self.base_url) + 1:])))
+        return path if path.startswith(root + os.sep) else None
+
+    def owns(self, url):
+        return self.local_path(url) is not None
+
+
+class SupabaseStorageBackend:
+    def __init__(self, bucket=RESUME_BUCKET):
+        self.bucket = bucket
+
+    def _bucket(self):
+        from app.supabase_client import supabase
+        return supabase.storage.from_(self.bucket)
+
+    def exists(self, key):
+        return call("storage.exists", lambda: self._bucket().exists(key), idempotent=True)
+
+    def put_file(self, key, path, content_type):
+        call(
+            "storage.upload",
+            lambda: self._bucket().upload(key, path, {"content-type": content_type, "upsert": "true"}),
+            deadline=RESUME_UPLOAD_DEADLINE,
+        )
+
+    def url(self, key):
+        return self._bucket().get_public_url(key)
+
+    def local_path(self, url):
+        return None
+
+    def owns(self, url):
+        prefix = f"{os.getenv('SUPABASE_URL', '').rstrip('/')}/storage/v1/object/public/{self.bucket}/"
+        return url.startswith(prefix)
+
+
+def _make_backend():
+    if RESUME_STORAGE_BACKEND == "local":
+        return LocalStorageBackend()
+    return SupabaseStorageBackend()
+
+
+storage_backend = _make_backend()
+
+
+def receive_resume(environ, candidate_id, field="resume"):
+    """
+    Parse the multipart request in `environ`, store the uploaded resume and
+    return {"resume_url", "sha256", "size", "deduplicated"}.
+    Raises ValueError for a missing or unsupported file.
+    """
+    spooled = []
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        hashing_file = HashingFile()
+        spooled.append(hashing_file)
+        return hashing_file
+
+    try:
+        _, _, files = parse_form_data(environ, stream_factory=stream_factory, max_content_length=RESUME_MAX_BYTES + 64 * 1024)
+
+        upload = files.get(field)
+        if not upload or not upload.filename:
+            raise ValueError(f"{field} file is required")
+
+        ext = os.path.splitext(upload.filename)[1].lower()
+        if ext not in ALLOWED_TYPES:
+            raise ValueError(f"Unsupported resume type, allowed: {', '.join(ALLOWED_TYPES)}")
+
+        hashing_file = upload.stream
+        if hashing_file.size == 0:
+            raise ValueError(f"{field} file is empty")
+
+        key = f"{candidate_id}/{hashing_file.hexdigest()}{ext}"
+        deduplicated = storage_backend.exists(key)
+        if not deduplicated:
+            hashing_file.flush()
+            storage_backend.put_file(key, hashing_file.path, ALLOWED_TYPES[ext])
+
+        return {
+            "resume_url": storage_backend.url(key),
+            "sha256": hashing_file.hexdigest(),
+            "size": hashing_file.size,
+            "deduplicated": deduplicated,
+        }
+
+    finally:
+        for hashing_file in spooled:
+            hashing_file.discard()
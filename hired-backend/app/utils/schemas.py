@@ -0,0 +1,93 @@
+from datetime import date, datetime
+from typing import Annotated, List, Optional, Union
+
+from pydantic import AfterValidator, BaseModel, ConfigDict, StringConstraints
+
+# ---------------------------------------------
+# Request body schemas
+# ---------------------------------------------
+# Checked by validation_middleware.validate_body before token_required, so
+# a malformed request is answered without the two auth round trips. Pydantic
+# builds each model's validator once, when this module is imported at app
+# start; a request only runs the compiled validator.
+#
+# Models describe shape only. Rules that depend on who is calling (role,
+# ownership, expired jobs) stay in the handlers.
+
+NonEmptyStr = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=255)]
+Id = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=64)]
+Url = Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=2048)]
+LongText = Annotated[str, StringConstraints(max_length=20000)]
+
+
+def _iso_date(value):
+    # kept as the caller's string: a date-only deadline means "end of that day"
+    # (see utils/expiry.py), which a datetime conversion would lose
+    try:
+        (date if len(value) == 10 else datetime).fromisoformat(value)
+    except ValueError:
+        raise ValueError("must be an ISO 8601 date or datetime")
+    return value
+
+
+IsoDate = Annotated[str, StringConstraints(strip_whitespace=True), AfterValidator(_iso_date)]
+
+
+def _skills(value):
+    """A list or comma-separated string -> trimmed skills, duplicates (any case) dropped."""
+    skills = [s.strip() for s in value.split(",")] if isinstance(value, str) else value
+    seen, cleaned = set(), []
+    for skill in skills:
+        key = skill.lower()
+        if skill and key not in seen:
+            seen.add(key)
+            cleaned.append(skill)
+    if not cleaned:
+        raise ValueError("must list at least one skill")
+    return cleaned
+
+
+class RequestSchema(BaseModel):
+    # unknown keys are dropped, not rejected, so older clients keep working
+    model_config = ConfigDict(extra="ignore")
+
+
+class CreateJobRequest(RequestSchema):
+    title: NonEmptyStr
+    company_name: NonEmptyStr
+    location: NonEmptyStr
+    job_type: NonEmptyStr
+    salary_range: NonEmptyStr
+    experience_level: NonEmptyStr
+    skills_required: Annotated[Union[List[NonEmptyStr], NonEmptyStr], AfterValidator(_skills)]
+    description: Optional[LongText] = None
+    application_deadline: Optional[IsoDate] = None
+
+
+class ApplyJobRequest(RequestSchema):
+    job_id: Id
+    resume_url: Url
+    cover_letter: Optional[LongText] = None
+
+
+class SaveJobRequest(RequestSchema):
+    job_id: Id
+
+
+class UpdateApplicationRequest(RequestSchema):
+    # recruiters send status, candidates resume_url / cover_letter;
+    # which one is required depends on the role, checked in the handler
+    status: Optional[Annotated[str, StringConstraints(strip_whitespace=True, min_length=1, max_length=32)]] = None
+    resume_url: Optional[Url] = None
+    cover_letter: Optional[LongText] = None
+
+
+def error_messages(exc):
+    """pydantic ValidationError -> [{"field", "message"}], one per field."""
+    messages = {}
+    for err in exc.errors(include_url=False):
+        field = str(err["loc"][0]) if err["loc"] else "body"
+        if field in messages:
+            continue  # a union reports once per branch; the first is enough
+        messages[field] = "is required" if err["type"] == "missing" else err["msg"].removeprefix("Value error, ")
+    return [{"field": field, "message": message} for field, message in messages.items()]
@@ -0,0 +1,301 @@
+import bisect
+import heapq
+import os
+import threading
+import time
+
+from app.supabase_client import supabase
+from app.utils.invalidation import bus
+from app.utils.resilience import execute
+
+# ---------------------------------------------
+# Typeahead index for job titles, companies and skills
+# ---------------------------------------------
+# A sorted array of normalised terms per kind; the terms matching a prefix
+# are one contiguous range, found with two bisects. Each term's weight is the
+# number of live jobs that use it, so popular terms rank first. A segment
+# tree over each array answers "best term in this range", so the top `limit`
+# come out in O(limit log n) however many terms share the prefix.
+#
+# Built from Supabase by a background thread (id + 3 columns, paged) at
+# startup and again every SUGGEST_RELOAD_INTERVAL seconds, which bounds how
+# long a worker can miss a change. In between, the job mutation routes and
+# the expiry sweeper apply their writes through add_job / remove_job, and
+# other workers hear of them on the invalidation bus. The bus handler only
+# queues the id (refresh); the background thread re-reads queued rows in
+# batches, so the bus listener never waits on Supabase.
+#
+# Lookups read an immutable snapshot. The same background thread rebuilds it
+# after changes (coalesced over SUGGEST_REBUILD_DELAY) and swaps it in, so a
+# request never waits on a rebuild.
+
+SUGGEST_ENABLED = os.getenv("SUGGEST_ENABLED", "true").lower() == "true"
+SUGGEST_LIMIT = int(os.getenv("SUGGEST_LIMIT", 8))
+SUGGEST_RELOAD_INTERVAL = float(os.getenv("SUGGEST_RELOAD_INTERVAL", 300.0))
+SUGGEST_REBUILD_DELAY = float(os.getenv("SUGGEST_REBUILD_DELAY", 0.5))
+SUGGEST_RETRY_INTERVAL = 10.0
+SUGGEST_BATCH_SIZE = 1000
+
+KINDS = ("title", "company", "skill")
+
+
+def _normalise(term):
+    return " ".join(str(term).lower().split())
+
+
+def _skills(value):
+    if isinstance(value, (list, tuple)):
+        return [s for s in value if s]
+    if isinstance(value, str):
+        return [s.strip() for s in value.split(",") if s.strip()]
+    return []
+
+
+def _terms(job):
+    """(kind, display_term) pairs a job contributes to the index."""
+    terms = []
+    if job.get("title"):
+        terms.append(("title", job["title"].strip()))
+    if job.get("company_name"):
+        terms.append(("company", job["company_name"].strip()))
+    for skill in _skills(job.get("skills_required")):
+        terms.append(("skill", skill))
+    return terms
+
+
+def _apply(counts, jobs, job_id, terms):
+    """Retract what job_id contributed before, then add terms (None: job is gone)."""
+    for kind, display in jobs.pop(job_id, []):
+        key = (kind, _normalise(display))
+        entry = counts.get(key)
+        if entry:
+            entry[1] -= 1
+            if entry[1] <= 0:
+                del counts[key]
+
+    if terms is None:
+        return
+    jobs[job_id] = terms
+    for kind, display in terms:
+        entry = counts.setdefault((kind, _normalise(display)), [display, 0])
+        entry[1] += 1
+
+
+class RangeBest:
+    """Segment tree over a list of ranks: index of the smallest rank in [lo, hi)."""
+
+    def __init__(self, ranks):
+        self._ranks = ranks
+        self._n = n = len(ranks)
+        self._tree = [0] * n + list(range(n))
+        for i in range(n - 1, 0, -1):
+            left, right = self._tree[2 * i], self._tree[2 * i + 1]
+            self._tree[i] = left if ranks[left] <= ranks[right] else right
+
+    def best(self, lo, hi):
+        ranks, tree = self._ranks, self._tree
+        found = None
+        lo += self._n
+        hi += self._n
+        while lo < hi:
+            if lo & 1:
+                if found is None or ranks[tree[lo]] < ranks[found]:
+                    found = tree[lo]
+                lo += 1
+            if hi & 1:
+                hi -= 1
+                if found is None or ranks[tree[hi]] < ranks[found]:
+                    found = tree[hi]
+            lo >>= 1
+            hi >>= 1
+        return found
+
+
+class SuggestIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        # (kind, normalised) -> [display, weight]
+        self._counts = {}
+        # job_id -> terms it contributed, so updates/deletes can retract them
+        self._jobs = {}
+        # kind -> (normalised terms, ranks, RangeBest); rank = (-weight, len, display)
+        self._snapshot = {kind: ([], [], RangeBest([])) for kind in KINDS}
+        # changes made while load() runs, replayed onto what it loaded
+        self._replay = None
+        # ids changed on other workers, re-read by the background thread
+        self._stale = set()
+        self._changed = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.ready = False
+
+    # -------------------------
+    # Maintenance
+    # -------------------------
+    def _change(self, job_id, terms):
+        with self._lock:
+            _apply(self._counts, self._jobs, job_id, terms)
+            if self._replay is not None:
+                self._replay.append((job_id, terms))
+        self._changed.set()
+
+    def add_job(self, job):
+        if not job or "id" not in job:
+            return
+        # expired postings leave the index
+        self._change(str(job["id"]), _terms(job) if job.get("status", "open") == "open" else [])
+
+    def remove_job(self, job_id):
+        self._change(str(job_id), None)
+
+    def refresh(self, job_id):
+        """Re-read job_id from Supabase on the background thread."""
+        with self._lock:
+            self._stale.add(str(job_id))
+        self._changed.set()
+
+    def _refresh_stale(self):
+        with self._lock:
+            ids, self._stale = sorted(self._stale), set()
+        for start in range(0, len(ids), SUGGEST_BATCH_SIZE):
+            chunk = ids[start:start + SUGGEST_BATCH_SIZE]
+            try:
+                resp = execute(
+                    "suggest.refresh",
+                    supabase.table("jobs").select("id, title, company_name, skills_required, status").in_("id", chunk),
+                    idempotent=True,
+                )
+            except Exception as e:
+                # the next reload picks these up
+                print(f"Suggest refresh of {len(chunk)} job(s) failed: {e}")
+                continue
+            found = {str(job["id"]): job for job in resp.data or []}
+            for job_id in chunk:
+                if job_id in found:
+                    self.add_job(found[job_id])
+                else:
+                    self.remove_job(job_id)
+
+    def _rebuild_snapshot(self):
+        with self._lock:
+            self._changed.clear()
+            entries = [(kind, norm, display, weight) for (kind, norm), (display, weight) in self._counts.items()]
+
+        by_kind = {kind: [] for kind in KINDS}
+        for kind, norm, display, weight in entries:
+            by_kind[kind].append((norm, (-weight, len(display), display)))
+
+        snapshot = {}
+        for kind, rows in by_kind.items():
+            rows.sort()
+            ranks = [r[1] for r in rows]
+            snapshot[kind] = ([r[0] for r in rows], ranks, RangeBest(ranks))
+        self._snapshot = snapshot
+
+    def load(self):
+        """Full build from the jobs table, swapped in when complete."""
+        counts, jobs = {}, {}
+        with self._lock:
+            self._replay = []
+        try:
+            offset = 0
+            while True:
+                resp = execute(
+                    "suggest.load",
+                    supabase.table("jobs")
+                    .select("id, title, company_name, skills_required")
+                    .eq("status", "open")
+                    .order("id")
+                    .range(offset, offset + SUGGEST_BATCH_SIZE - 1),
+                    idempotent=True,
+                )
+                rows = resp.data or []
+                for job in rows:
+                    _apply(counts, jobs, str(job["id"]), _terms(job))
+                if len(rows) < SUGGEST_BATCH_SIZE:
+                    break
+                offset += SUGGEST_BATCH_SIZE
+
+            with self._lock:
+                for job_id, terms in self._replay:
+                    _apply(counts, jobs, job_id, terms)
+                self._counts, self._jobs = counts, jobs
+        finally:
+            with self._lock:
+                self._replay = None
+
+        self._rebuild_snapshot()
+        self.ready = True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.load()
+                reload_at = time.monotonic() + (SUGGEST_RELOAD_INTERVAL or float("inf"))
+            except Exception as e:
+                print(f"Suggest index load failed: {e}")
+                reload_at = time.monotonic() + SUGGEST_RETRY_INTERVAL
+
+            while not self._stop.is_set() and time.monotonic() < reload_at:
+                if self._changed.wait(timeout=min(60.0, max(0.0, reload_at - time.monotonic()))):
+                    self._stop.wait(SUGGEST_REBUILD_DELAY)
+                    self._refresh_stale()
+                    self._rebuild_snapshot()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="suggest-index", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._changed.set()
+
+    # -------------------------
+    # Lookup
+    # -------------------------
+    def suggest(self, prefix, kinds=KINDS, limit=SUGGEST_LIMIT):
+        prefix = _normalise(prefix)
+        if not prefix:
+            return []
+        snapshot = self._snapshot
+
+        # best remaining term of each (kind, range); popping one splits its range
+        heap = []
+        for kind in kinds:
+            if kind not in snapshot:
+                continue
+            keys, ranks, best = snapshot[kind]
+            lo = bisect.bisect_left(keys, prefix)
+            hi = bisect.bisect_right(keys, prefix + "\uffff", lo)
+            if lo < hi:
+                i = best.best(lo, hi)
+                heap.append((ranks[i], kind, lo, hi, i))
+        heapq.heapify(heap)
+
+        results = []
+        while heap and len(results) < limit:
+            rank, kind, lo, hi, i = heapq.heappop(heap)
+            results.append({"text": rank[2], "type": kind, "weight": -rank[0]})
+            _, ranks, best = snapshot[kind]
+            for a, b in ((lo, i), (i + 1, hi)):
+                if a < b:
+                    j = best.best(a, b)
+                    heapq.heappush(heap, (ranks[j], kind, a, b, j))
+        return results
+
+
+suggest_index = SuggestIndex()
+
+
+def _on_job_changed(job_id, event):
+    if event.get("origin") == bus.node_id:
+        return  # the route or sweeper already applied it here
+    suggest_index.refresh(job_id)
+
+
+def init_app(app):
+    if SUGGEST_ENABLED:
+        bus.subscribe("jobs", _on_job_changed)
+        suggest_index.start()
@@ -1,4 +1,4 @@
-from supabase import create_client, Client
+from supabase import create_client, Client, ClientOptions
 import os
 
 supabase: Client = None
@@ -10,5 +10,9 @@ def get_supabase_client():
         key = os.environ.get('SUPABASE_SERVICE_KEY')
         if not url or not key:
             raise ValueError("Supabase URL or Key missing in .env")
-        supabase = create_client(url, key)
+        timeout = float(os.environ.get('SUPABASE_HTTP_TIMEOUT', os.environ.get('SUPABASE_WRITE_DEADLINE', 8)))
+        supabase = create_client(url, key, options=ClientOptions(
+            postgrest_client_timeout=timeout,
+            storage_client_timeout=int(timeout),
+        ))
     return supabase
@@ -0,0 +1,46 @@
+import io
+import re
+import zipfile
+
+# ---------------------------------------------
+# Resume text extraction
+# ---------------------------------------------
+# Runs inside the resume pipeline's process pool, so keep this module free of
+# app state and cheap to import. PDF parsing uses pypdf when it is installed;
+# without it PDFs fall back to pulling literal text runs out of the raw bytes.
+
+MAX_TEXT_CHARS = 200_000
+
+_PDF_TEXT_RUN = re.compile(rb"\(([^()\\]{2,})\)")
+_DOCX_TAG = re.compile(r"<[^>]+>")
+
+
+def _extract_pdf(data):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return " ".join(run.decode("latin-1") for run in _PDF_TEXT_RUN.findall(data))
+
+    reader = PdfReader(io.BytesIO(data))
+    return "\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _extract_docx(data):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        xml = archive.read("word/document.xml").decode("utf-8", errors="ignore")
+    xml = xml.replace("</w:p>", "\n")
+    return _DOCX_TAG.sub(" ", xml)
+
+
+def extract_text(data, ext):
+    """Best-effort plain text for a resume file's bytes."""
+    ext = (ext or "").lower()
+    if ext == ".pdf":
+        text = _extract_pdf(data)
+    elif ext == ".docx":
+        text = _extract_docx(data)
+    else:
+        text = data.decode("utf-8", errors="ignore")
+
+    text = re.sub(r"\s+", " ", text).strip()
+    return text[:MAX_TEXT_CHARS]
@@ -0,0 +1,225 @@
+import os
+import uuid
+import zlib
+from functools import wraps
+
+from flask import make_response, request
+
+from app.supabase_client import supabase
+from app.utils.cache import TTLCache
+from app.utils.invalidation import INVALIDATION_BACKEND, INVALIDATION_REDIS_TIMEOUT, INVALIDATION_REDIS_URL, bus
+from app.utils.outbox import outbox
+from app.utils.resilience import execute
+
+# ---------------------------------------------
+# Per-user version stamps for conditional GETs
+# ---------------------------------------------
+# A stamp is an opaque token per (scope, user) that changes whenever that
+# user's list may have changed. The list routes send it as a weak ETag, and a
+# poll whose If-None-Match still matches gets 304 without the page + count
+# queries. The caller is still authenticated first.
+#
+# Stamps live in one store shared by every worker (Redis, with
+# INVALIDATION_BACKEND=redis). A token is minted with SET NX the first time
+# anyone needs it, so all workers hand out the same one, and bump() deletes
+# it so the next read mints a fresh one. The stamp is read before the list is
+# queried, so a write racing a read can only cost an extra 200, never a
+# wrong 304.
+#
+# With the in-memory backend each worker would keep its own stamps and miss
+# bumps made by the others (a wrong 304), so stamps are off unless
+# VERSION_STAMPS_ENABLED=true says otherwise (e.g. a single worker), and
+# then kept in this process.
+#
+# The lists embed job fields (title, company), so every ETag also carries a
+# global jobs stamp, dropped on any "jobs" bus event.
+#
+# Who bumps what:
+#   saved_jobs              save_job, remove_saved_job
+#   applications            apply_job, update_application, withdraw_application (candidate)
+#                           + recruiter status changes
+#   recruiter_applications  the outbox "applications" consumer (owner of the job),
+#                           status changes by the recruiter, cover letter edits
+
+VERSION_STAMPS_ENABLED = os.getenv(
+    "VERSION_STAMPS_ENABLED",
+    "false" if INVALIDATION_BACKEND == "memory" else "true",
+).lower() == "true"
+VERSION_STAMP_TTL = float(os.getenv("VERSION_STAMP_TTL", 24 * 3600.0))
+VERSION_STAMP_MAX = int(os.getenv("VERSION_STAMP_MAX", 100000))
+VERSION_STAMP_PREFIX = os.getenv("VERSION_STAMP_PREFIX", "hirify:stamp")
+
+SAVED_JOBS = "saved_jobs"
+APPLICATIONS = "applications"
+RECRUITER_APPLICATIONS = "recruiter_applications"
+JOBS = "jobs"
+
+def _mint():
+    return uuid.uuid4().hex[:12]
+
+
+class LocalStamps:
+    """This process only; bumps from other workers arrive over the bus."""
+
+    shared = False
+
+    def __init__(self):
+        self._stamps = TTLCache(ttl=VERSION_STAMP_TTL, max_size=VERSION_STAMP_MAX)
+
+    def get(self, key):
+        token = self._stamps.get(key)
+        if token is None:
+            # not atomic with a concurrent mint, which only means one extra 200
+            token = _mint()
+            self._stamps.set(key, token)
+        return token
+
+    def delete(self, key):
+        self._stamps.delete(key)
+
+
+class RedisStamps:
+    """One stamp per key for every worker, on any Redis-compatible server."""
+
+    shared = True
+
+    def __init__(self, url=INVALIDATION_REDIS_URL, prefix=VERSION_STAMP_PREFIX):
+        import redis  # optional dependency, only needed for this store
+
+        self.prefix = prefix
+        self._client = redis.Redis.from_url(
+            url, decode_responses=True,
+            socket_timeout=INVALIDATION_REDIS_TIMEOUT, socket_connect_timeout=INVALIDATION_REDIS_TIMEOUT,
+        )
+
+    def _name(self, key):
+        return f"{self.prefix}:{key[0]}:{key[1]}"
+
+    def get(self, key):
+        name = self._name(key)
+        token = self._client.get(name)
+        if token is None:
+            token = _mint()
+            # first minter wins; everyone else reads its token back
+            if not self._client.set(name, token, nx=True, ex=int(VERSION_STAMP_TTL)):
+                token = self._client.get(name) or token
+        return token
+
+    def delete(self, key):
+        self._client.delete(self._name(key))
+
+
+_stamps = LocalStamps()
+_recruiters = TTLCache(ttl=300.0, max_size=10000)
+
+
+def current(scope, user_id):
+    return _stamps.get((scope, str(user_id)))
+
+
+def bump(scope, user_id):
+    """Call after a committed write that changes this user's list."""
+    if not user_id:
+        return
+    _stamps.delete((scope, str(user_id)))
+    if _stamps.shared:
+        return
+    try:
+        bus.publish("versions", f"{scope}:{user_id}")
+    except Exception as e:
+        # local stamp is already gone; other workers catch up at VERSION_STAMP_TTL
+        print(f"Version bump for {scope}:{user_id} not published: {e}")
+
+
+def recruiter_for(job_id):
+    recruiter_id = _recruiters.get(job_id)
+    if recruiter_id is None:
+        resp = execute(
+            "versions.job",
+            supabase.table("jobs").select("recruiter_id").eq("id", job_id).limit(1),
+            idempotent=True,
+        )
+        if not resp.data:
+            return None
+        recruiter_id = resp.data[0]["recruiter_id"]
+        _recruiters.set(job_id, recruiter_id)
+    return recruiter_id
+
+
+def bump_recruiter_of(job_id):
+    """bump() for the recruiter who owns job_id; for routes, never raises."""
+    try:
+        bump(RECRUITER_APPLICATIONS, recruiter_for(job_id))
+    except Exception as e:
+        print(f"Recruiter version bump for job {job_id} failed: {e}")
+
+
+def etag(scope, user_id):
+    args = "&".join(f"{k}={v}" for k, v in sorted(request.args.items(multi=True)))
+    return f"{current(scope, user_id)}.{current(JOBS, '*')}.{zlib.crc32(args.encode()):08x}"
+
+
+def conditional(scope):
+    """
+    Below @token_required on a list route: 304 when If-None-Match carries the
+    current stamp for (scope, user), otherwise run the route and tag its 200.
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(user, *args, **kwargs):
+            if not VERSION_STAMPS_ENABLED:
+                return f(user, *args, **kwargs)
+
+            try:
+                tag = etag(scope, user["auth_uid"])
+            except Exception as e:
+                # stamp store unreachable: answer without an ETag
+                print(f"Version stamp for {scope} unavailable: {e}")
+                return f(user, *args, **kwargs)
+            if request.if_none_match.contains_weak(tag):
+                response = make_response("", 304)
+            else:
+                response = make_response(f(user, *args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(tag, weak=True)
+            # always revalidate; the body is per user
+            response.headers["Cache-Control"] = "private, no-cache"
+            return response
+
+        return decorated
+
+    return decorator
+
+
+def _on_version_event(key, event):
+    if _stamps.shared:
+        return
+    scope, _, user_id = key.partition(":")
+    _stamps.delete((scope, user_id))
+
+
+def _on_job_changed(job_id, event):
+    # with a shared store only the writer's own worker needs to bump it
+    if _stamps.shared and event.get("origin") != bus.node_id:
+        return
+    _stamps.delete((JOBS, "*"))
+
+
+def _on_application_event(event):
+    payload = event.get("payload") or {}
+    if payload.get("job_id"):
+        # raises on a failed lookup, so the outbox retries the event
+        bump(RECRUITER_APPLICATIONS, recruiter_for(payload["job_id"]))
+    if event["op"] != "insert":
+        # e.g. a status change made outside the API
+        bump(APPLICATIONS, payload.get("candidate_id"))
+
+
+def init_app(app):
+    global _stamps
+    if VERSION_STAMPS_ENABLED and INVALIDATION_BACKEND == "redis" and not _stamps.shared:
+        _stamps = RedisStamps()
+    bus.subscribe("versions", _on_version_event)
+    bus.subscribe("jobs", _on_job_changed)
+    outbox.register("applications", _on_application_event)
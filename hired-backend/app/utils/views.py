@@ -0,0 +1,240 @@
+import heapq
+import math
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+from app.supabase_client import supabase
+from app.utils.resilience import execute
+
+# ---------------------------------------------
+# Job view counters and trending
+# ---------------------------------------------
+# get_job_by_id calls record(), which only touches memory. A flusher thread
+# swaps out the pending counts every VIEW_FLUSH_INTERVAL and writes them with
+# one record_job_views RPC, however many views came in meanwhile.
+#
+# Trending score: every view adds exp(lambda * (t - EPOCH)), with lambda set
+# by TRENDING_HALF_LIFE. The score is kept as its log. Scores only ever grow,
+# and ordering by them is ordering by the decayed score, so nothing has to be
+# rescored as time passes. The database merges the increments from all
+# workers (see supabase/migrations).
+#
+# Each worker serves sort=trending from a heap-backed top-K. After each flush
+# it is reloaded from the database's top-K, so it reflects views from every
+# worker; in between, local views are applied to it directly. Deleted and
+# expired jobs are filtered out by the route when it reads the ranking. Only
+# the top TRENDING_TOP_K are ranked, so sort=trending lists at most that many.
+#
+# Jobs outside the top-K keep a running score between reloads so a job that
+# heats up locally can enter it; that map holds at most VIEW_PENDING_MAX jobs.
+
+VIEW_COUNTS_ENABLED = os.getenv("VIEW_COUNTS_ENABLED", "true").lower() == "true"
+VIEW_FLUSH_INTERVAL = float(os.getenv("VIEW_FLUSH_INTERVAL", 10.0))
+VIEW_PENDING_MAX = int(os.getenv("VIEW_PENDING_MAX", 50000))
+TRENDING_TOP_K = int(os.getenv("TRENDING_TOP_K", 200))
+TRENDING_HALF_LIFE = float(os.getenv("TRENDING_HALF_LIFE", 6 * 3600.0))
+
+EPOCH = datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp()
+DECAY = math.log(2) / TRENDING_HALF_LIFE
+
+
+def _log_add(a, b):
+    """log(exp(a) + exp(b)) without overflow; None is log(0)."""
+    if a is None:
+        return b
+    if b is None:
+        return a
+    hi, lo = (a, b) if a >= b else (b, a)
+    return hi + math.log1p(math.exp(lo - hi))
+
+
+def view_score(at=None):
+    """Log of one view's anchored weight."""
+    return DECAY * ((time.time() if at is None else at) - EPOCH)
+
+
+class TopK:
+    """
+    The k highest scores, for keys whose scores only increase. A min-heap
+    holds the members; an update pushes a new entry and the outdated one is
+    skipped when it reaches the top.
+    """
+
+    def __init__(self, k):
+        self.k = k
+        self._scores = {}
+        self._heap = []
+
+    def _min(self):
+        while self._heap:
+            score, key = self._heap[0]
+            if self._scores.get(key) == score:
+                return score, key
+            heapq.heappop(self._heap)  # outdated entry
+        return None
+
+    def offer(self, key, score):
+        if key in self._scores:
+            self._scores[key] = score
+            heapq.heappush(self._heap, (score, key))
+            if len(self._heap) > 4 * self.k:
+                self._heap = [(s, member) for member, s in self._scores.items()]
+                heapq.heapify(self._heap)
+            return
+
+        if len(self._scores) >= self.k:
+            smallest = self._min()
+            if smallest is None or score <= smallest[0]:
+                return
+            heapq.heappop(self._heap)
+            del self._scores[smallest[1]]
+
+        self._scores[key] = score
+        heapq.heappush(self._heap, (score, key))
+
+    def discard(self, key):
+        self._scores.pop(key, None)
+
+    def score(self, key):
+        return self._scores.get(key)
+
+    def ranked(self):
+        return [key for key, _ in sorted(self._scores.items(), key=lambda item: -item[1])]
+
+    def __len__(self):
+        return len(self._scores)
+
+
+class ViewCounter:
+    def __init__(self, top_k=TRENDING_TOP_K):
+        self._lock = threading.Lock()
+        # job_id -> [views, log score] not yet written
+        self._pending = {}
+        # scores of jobs outside the top-K viewed since the last reload
+        self._scores = {}
+        self._trending = TopK(top_k)
+        self._stop = threading.Event()
+        self._thread = None
+        self._stats = {"recorded": 0, "dropped": 0, "flushes": 0, "flushed_jobs": 0, "flush_failures": 0}
+
+    # -------------------------
+    # Hot path
+    # -------------------------
+    def record(self, job_id):
+        job_id = str(job_id)
+        increment = view_score()
+        with self._lock:
+            entry = self._pending.get(job_id)
+            if entry is None:
+                if len(self._pending) >= VIEW_PENDING_MAX:
+                    self._stats["dropped"] += 1
+                    return
+                entry = self._pending[job_id] = [0, None]
+            entry[0] += 1
+            entry[1] = _log_add(entry[1], increment)
+
+            previous = self._trending.score(job_id)
+            if previous is None:
+                previous = self._scores.get(job_id)
+            score = _log_add(previous, increment)
+            # reload() resets it; the cap holds if reloads keep failing
+            if job_id in self._scores or len(self._scores) < VIEW_PENDING_MAX:
+                self._scores[job_id] = score
+            self._trending.offer(job_id, score)
+            self._stats["recorded"] += 1
+
+    def forget(self, job_id):
+        with self._lock:
+            self._trending.discard(str(job_id))
+            self._scores.pop(str(job_id), None)
+
+    def trending(self):
+        """Job ids, most trending first (at most TRENDING_TOP_K)."""
+        with self._lock:
+            return self._trending.ranked()
+
+    # -------------------------
+    # Flush / reload
+    # -------------------------
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        try:
+            execute("job_views.record", supabase.rpc("record_job_views", {
+                "p_views": {job_id: {"views": n, "score": score} for job_id, (n, score) in pending.items()},
+            }))
+        except Exception:
+            # put the counts back for the next attempt
+            with self._lock:
+                for job_id, (n, score) in pending.items():
+                    entry = self._pending.setdefault(job_id, [0, None])
+                    entry[0] += n
+                    entry[1] = _log_add(entry[1], score)
+                self._stats["flush_failures"] += 1
+            raise
+
+        with self._lock:
+            self._stats["flushes"] += 1
+            self._stats["flushed_jobs"] += len(pending)
+        return len(pending)
+
+    def reload(self):
+        resp = execute(
+            "job_views.trending",
+            supabase.table("job_view_counts")
+            .select("job_id, trending_log")
+            .order("trending_log", desc=True)
+            .limit(self._trending.k),
+            idempotent=True,
+        )
+        trending = TopK(self._trending.k)
+        for row in resp.data or []:
+            trending.offer(str(row["job_id"]), row["trending_log"])
+
+        with self._lock:
+            # views recorded since the flush are not in the database yet
+            for job_id, (_, score) in self._pending.items():
+                trending.offer(job_id, _log_add(trending.score(job_id), score))
+            self._trending = trending
+            self._scores = {job_id: score for job_id, (_, score) in self._pending.items()}
+
+    def _run(self):
+        self._stop.wait(random.uniform(0, VIEW_FLUSH_INTERVAL))
+        while not self._stop.is_set():
+            try:
+                self.flush()
+                self.reload()
+            except Exception as e:
+                print(f"View counter flush failed: {e}")
+            self._stop.wait(VIEW_FLUSH_INTERVAL)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="job-view-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats["pending_jobs"] = len(self._pending)
+            stats["trending_size"] = len(self._trending)
+            stats["scored_jobs"] = len(self._scores)
+        return stats
+
+
+view_counter = ViewCounter()
+
+
+def init_app(app):
+    if VIEW_COUNTS_ENABLED:
+        view_counter.start()
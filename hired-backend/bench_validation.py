@@ -0,0 +1,133 @@
+"""
+Benchmark: upstream calls saved by validating request bodies before auth.
+
+    python bench_validation.py                  # 2000 requests per mix
+    python bench_validation.py --requests 10000
+
+Sends a mix of valid and malformed bodies to create_job, apply_job, save_job
+and update_application through the Flask test client. Supabase is replaced
+by counters, so nothing leaves the process. Every request used to pay for
+token_required's two calls (auth.get_user + users.get) before its body was
+looked at; the "before" column is that cost, "after" is what was measured.
+Also prints the per-request cost of the compiled validators.
+"""
+import argparse
+import os
+import random
+import timeit
+from collections import Counter
+from types import SimpleNamespace
+
+AUTH_CALLS_PER_REQUEST = 2
+
+VALID = {
+    "create_job": ("POST", "/api/v1/jobs/create", {
+        "title": "Backend Engineer", "company_name": "Hirify", "location": "Remote",
+        "job_type": "full-time", "salary_range": "20-30 LPA", "experience_level": "mid",
+        "skills_required": ["python", "flask"], "application_deadline": "2030-01-31",
+    }),
+    "apply_job": ("POST", "/api/v1/user-jobs/applications", {
+        "job_id": "job-1", "resume_url": "https://cdn.example.com/r.pdf", "cover_letter": "Hi",
+    }),
+    "save_job": ("POST", "/api/v1/user-jobs/saved-jobs", {"job_id": "job-1"}),
+    "update_application": ("PATCH", "/api/v1/user-jobs/applications/app-1", {"cover_letter": "Updated"}),
+}
+
+INVALID = {
+    "create_job": [{}, {"title": "  "}, {**VALID["create_job"][2], "skills_required": []},
+                   {**VALID["create_job"][2], "application_deadline": "next week"}],
+    "apply_job": [{}, {"job_id": "job-1"}, {"job_id": 42, "resume_url": "x"}],
+    "save_job": [{}, {"job_id": ""}, ["job-1"]],
+    "update_application": [{"status": ""}, {"cover_letter": 7}, "not-an-object"],
+}
+
+
+def build_app(counter):
+    for flag in ("JOB_REPLICA_ENABLED", "SUGGEST_ENABLED", "EXPIRY_SWEEP_ENABLED", "OUTBOX_ENABLED",
+                 "RATE_LIMIT_ENABLED", "CONCURRENCY_LIMIT_ENABLED", "PROFILING_ENABLED"):
+        os.environ[flag] = "false"
+
+    from app import create_app
+    import app.middlewares.auth_middleware as auth
+    import app.routes.job_routes as job_routes
+    import app.routes.user_jobs_routes as user_jobs_routes
+    import app.utils.versions as versions
+
+    user = {"auth_uid": "user-1", "role": "candidate"}
+
+    def auth_call(op, fn, **kwargs):
+        counter["auth"] += 1
+        return SimpleNamespace(user=SimpleNamespace(id="user-1", email="u@example.com"))
+
+    def auth_execute(op, query, **kwargs):
+        counter["auth"] += 1
+        return SimpleNamespace(data=dict(user))
+
+    def handler_execute(op, query, **kwargs):
+        counter["handler"] += 1
+        return SimpleNamespace(data=[{"id": "row-1"}], count=1)
+
+    class Query:
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: self
+
+    auth.call, auth.execute = auth_call, auth_execute
+    auth.supabase = SimpleNamespace(auth=None, table=lambda name: Query())
+    def versions_execute(op, query, **kwargs):
+        counter["handler"] += 1
+        return SimpleNamespace(data=[{"recruiter_id": "recruiter-1"}])
+
+    for module in (job_routes, user_jobs_routes):
+        module.execute = handler_execute
+        module.supabase = SimpleNamespace(table=lambda name: Query())
+    user_jobs_routes.update_owned = lambda *args, **kwargs: (user_jobs_routes.OK, {"id": "app-1", "job_id": "job-1"})
+    # bump_recruiter_of() looks up the job's owner
+    versions.execute = versions_execute
+    versions.supabase = SimpleNamespace(table=lambda name: Query())
+
+    return create_app(), user
+
+
+def run_mix(client, user, counter, requests, invalid_ratio, rng):
+    counter.clear()
+    statuses = Counter()
+    for _ in range(requests):
+        route = rng.choice(list(VALID))
+        method, path, body = VALID[route]
+        if rng.random() < invalid_ratio:
+            body = rng.choice(INVALID[route])
+        # create_job is recruiter-only, the rest candidate-only
+        user["role"] = "recruiter" if route == "create_job" else "candidate"
+        resp = client.open(path, method=method, json=body, headers={"Authorization": "Bearer t"})
+        statuses[resp.status_code // 100 * 100] += 1
+    return statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    counter = Counter()
+    app, user = build_app(counter)
+    client = app.test_client()
+    rng = random.Random(args.seed)
+
+    print(f"{'invalid':>8} {'4xx':>6} {'auth before':>12} {'auth after':>11} {'saved':>7}")
+    for ratio in (0.0, 0.1, 0.25, 0.5, 0.9):
+        statuses = run_mix(client, user, counter, args.requests, ratio, rng)
+        before = args.requests * AUTH_CALLS_PER_REQUEST
+        after = counter["auth"]
+        print(f"{ratio:>8.0%} {statuses[400]:>6} {before:>12} {after:>11} {1 - after / before:>7.1%}")
+
+    from app.utils.schemas import CreateJobRequest, ApplyJobRequest
+    for schema, route in ((CreateJobRequest, "create_job"), (ApplyJobRequest, "apply_job")):
+        body = VALID[route][2]
+        n = 20000
+        seconds = timeit.timeit(lambda: schema.model_validate(body), number=n)
+        print(f"{schema.__name__}.model_validate: {seconds / n * 1e6:.1f} us per request")
+
+
+if __name__ == "__main__":
+    main()
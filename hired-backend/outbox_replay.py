@@ -0,0 +1,56 @@
+"""
+Outbox replay and repair.
+
+    python outbox_replay.py --topic applications                  # re-run consumers over all stored events
+    python outbox_replay.py --topic applications --since 2026-10-01T00:00:00Z
+    python outbox_replay.py --since-id 1200 --until-id 1500
+    python outbox_replay.py --requeue-failed [--topic applications]
+
+Replay runs the registered consumers directly over stored events (delivered
+or not) in id order, to rebuild derived state such as the resume index. It
+does not change delivery state. Consumers are idempotent, so replaying
+events the workers are also delivering is safe.
+
+--requeue-failed gives parked events (those that used up OUTBOX_MAX_ATTEMPTS)
+a fresh set of attempts; the running workers pick them up.
+
+History only goes back OUTBOX_RETENTION_DAYS.
+"""
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay or requeue outbox events")
+    parser.add_argument("--topic", help="only this topic (applications, jobs)")
+    parser.add_argument("--since", help="only events created at or after this ISO timestamp")
+    parser.add_argument("--since-id", type=int, help="first event id to replay")
+    parser.add_argument("--until-id", type=int, help="last event id to replay")
+    parser.add_argument("--requeue-failed", action="store_true", help="requeue parked events instead of replaying")
+    args = parser.parse_args()
+
+    # consumers only, no request-time background threads
+    os.environ["OUTBOX_ENABLED"] = "false"
+    for flag in ("JOB_REPLICA_ENABLED", "SUGGEST_ENABLED", "EXPIRY_SWEEP_ENABLED"):
+        os.environ.setdefault(flag, "false")
+
+    from app import create_app
+    from app.utils.outbox import outbox
+
+    create_app()
+
+    if args.requeue_failed:
+        print(f"Requeued {outbox.requeue_failed(args.topic)} parked event(s)")
+        return
+
+    replayed, failed = outbox.replay(
+        topic=args.topic,
+        since_id=args.since_id,
+        until_id=args.until_id,
+        since=args.since,
+    )
+    print(f"Replayed {replayed} event(s), {failed} failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,16 @@
 from app import create_app
 
-app = create_app()
 
-@app.route('/')
 def home_page():
     return 'Backend is running successfully! 🚀  Check the following links: /api/v1/auth/health , /api/v1/jobs/health , /api/v1/user-jobs/health'
 
+
+# The resume pipeline's spawned processes re-import this module as
+# __mp_main__; they only parse text and must not build an app (and start its
+# outbox, sweeper and loader threads) of their own.
+if __name__ != "__mp_main__":
+    app = create_app()
+    app.add_url_rule('/', view_func=home_page)
+
 if __name__ == "__main__":
     app.run(debug=True)
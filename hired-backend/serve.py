@@ -0,0 +1,114 @@
+"""
+Production entry point.
+
+    python serve.py                 # gunicorn, workers/threads sized for this box
+    kill -HUP <master pid>          # graceful reload (new workers, no dropped requests)
+
+Sizing (override any of them with env vars):
+    WEB_WORKERS      default: CPU count (threads cover the I/O wait)
+    WEB_THREADS      default: derived from WEB_IO_RATIO, the fraction of a request
+                     spent waiting on Supabase. A worker thread is busy on CPU only
+                     (1 - ratio) of the time, so 1 / (1 - ratio) threads keep one
+                     core saturated.
+    WEB_IO_RATIO     default 0.9, a placeholder, not a measurement. Measure it:
+                     run with PROFILING_ENABLED=true under real traffic and read
+                     "profiling.io_ratio" from /api/v1/internal/metrics (summed
+                     Supabase wait time over total request time, see
+                     app/utils/profiling.py). Client-paced time such as resume
+                     upload bodies counts as CPU there, so the measured value
+                     errs low, i.e. towards fewer threads.
+    WEB_KEEPALIVE    seconds an idle keep-alive connection is held (default 5)
+"""
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+MAX_THREADS = 64
+
+
+def _cpu_count():
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return multiprocessing.cpu_count()
+
+
+def tuned_workers():
+    return int(os.getenv("WEB_WORKERS", _cpu_count()))
+
+
+def tuned_threads():
+    if os.getenv("WEB_THREADS"):
+        return int(os.getenv("WEB_THREADS"))
+
+    io_ratio = min(max(float(os.getenv("WEB_IO_RATIO", 0.9)), 0.0), 0.99)
+    return max(1, min(MAX_THREADS, round(1 / (1 - io_ratio))))
+
+
+def post_worker_init(worker):
+    """
+    Per-worker warm-up, run after the worker has loaded the app and before it
+    accepts traffic: open the Supabase connection pool so the first real
+    request doesn't pay for DNS + TLS.
+    """
+    from app.supabase_client import supabase
+    from app.utils.resilience import execute
+
+    try:
+        execute("warmup.jobs", supabase.table("jobs").select("id").limit(1), idempotent=True)
+    except Exception as e:
+        print(f"Worker warm-up failed: {e}")
+
+
+class HirifyServer(BaseApplication):
+    def __init__(self, options=None):
+        self.options = options or {}
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        # Imported here, not at module level: the app is built inside each
+        # worker after fork so its background threads (replica sync, ...) run
+        # in the worker and not in the master.
+        from run import app
+        return app
+
+
+def serve():
+    workers = tuned_workers()
+    if workers > 1 and os.getenv("INVALIDATION_BACKEND", "memory") == "memory":
+        print(
+            f"Starting {workers} workers with INVALIDATION_BACKEND=memory: writes are not "
+            "propagated between workers, so per-worker caches stay off. Set "
+            "INVALIDATION_BACKEND=redis to enable them."
+        )
+
+    # the app reads these to size its per-worker pools and limits
+    os.environ["WEB_WORKERS"] = str(workers)
+    threads = tuned_threads()
+    os.environ["WEB_THREADS"] = str(threads)
+
+    options = {
+        "bind": f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', 5000)}",
+        "workers": workers,
+        "threads": threads,
+        "worker_class": "gthread",
+        "keepalive": int(os.getenv("WEB_KEEPALIVE", 5)),
+        "timeout": int(os.getenv("WEB_TIMEOUT", 30)),
+        "graceful_timeout": int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30)),
+        # recycle workers now and then so slow leaks can't accumulate
+        "max_requests": int(os.getenv("WEB_MAX_REQUESTS", 10000)),
+        "max_requests_jitter": int(os.getenv("WEB_MAX_REQUESTS_JITTER", 1000)),
+        "post_worker_init": post_worker_init,
+        "accesslog": "-",
+    }
+    HirifyServer(options).run()
+
+
+if __name__ == "__main__":
+    serve()
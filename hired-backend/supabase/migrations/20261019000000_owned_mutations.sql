@@ -0,0 +1,34 @@
+-- Recruiter status update for an application in one round trip.
+-- Resolves application -> job -> recruiter inside the database and reports
+-- whether the application was missing or belongs to another recruiter.
+
+create or replace function update_application_status(
+    p_application_id applications.id%type,
+    p_recruiter_id   jobs.recruiter_id%type,
+    p_status         applications.status%type
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_row applications%rowtype;
+begin
+    update applications a
+       set status = p_status
+      from jobs j
+     where a.id = p_application_id
+       and j.id = a.job_id
+       and j.recruiter_id = p_recruiter_id
+    returning a.* into v_row;
+
+    if found then
+        return jsonb_build_object('outcome', 'ok', 'application', to_jsonb(v_row));
+    end if;
+
+    if exists (select 1 from applications where id = p_application_id) then
+        return jsonb_build_object('outcome', 'forbidden', 'application', null);
+    end if;
+
+    return jsonb_build_object('outcome', 'not_found', 'application', null);
+end;
+$$;
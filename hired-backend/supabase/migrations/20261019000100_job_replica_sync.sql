@@ -0,0 +1,46 @@
+-- Change tracking for the local jobs replica (app/utils/job_replica.py).
+-- updated_at is the incremental sync watermark; job_tombstones records
+-- deletes so replicas can drop rows they already hold.
+
+alter table jobs add column if not exists updated_at timestamptz not null default now();
+
+create index if not exists jobs_updated_at_id_idx on jobs (updated_at, id);
+
+create or replace function jobs_touch_updated_at()
+returns trigger
+language plpgsql
+as $$
+begin
+    new.updated_at := now();
+    return new;
+end;
+$$;
+
+drop trigger if exists jobs_touch_updated_at on jobs;
+create trigger jobs_touch_updated_at
+    before update on jobs
+    for each row execute function jobs_touch_updated_at();
+
+create table if not exists job_tombstones (
+    job_id     text primary key,
+    deleted_at timestamptz not null default now()
+);
+
+create index if not exists job_tombstones_deleted_at_idx on job_tombstones (deleted_at);
+
+create or replace function jobs_record_tombstone()
+returns trigger
+language plpgsql
+as $$
+begin
+    insert into job_tombstones (job_id, deleted_at)
+    values (old.id::text, now())
+    on conflict (job_id) do update set deleted_at = excluded.deleted_at;
+    return old;
+end;
+$$;
+
+drop trigger if exists jobs_record_tombstone on jobs;
+create trigger jobs_record_tombstone
+    after delete on jobs
+    for each row execute function jobs_record_tombstone();
@@ -0,0 +1,19 @@
+-- Extracted resume text, written by the background pipeline in
+-- app/utils/resume_index.py. One row per application; recruiter_id is
+-- denormalised from jobs so search is a single filtered index scan.
+-- Key columns are uuid like the rest of the schema; adjust if jobs.id /
+-- applications.id use a different type in your project.
+
+create table if not exists resume_texts (
+    application_id uuid primary key references applications (id) on delete cascade,
+    job_id         uuid not null,
+    candidate_id   uuid,
+    recruiter_id   uuid not null,
+    resume_url     text not null,
+    content        text not null default '',
+    content_tsv    tsvector generated always as (to_tsvector('english', content)) stored,
+    indexed_at     timestamptz not null default now()
+);
+
+create index if not exists resume_texts_tsv_idx on resume_texts using gin (content_tsv);
+create index if not exists resume_texts_recruiter_idx on resume_texts (recruiter_id, indexed_at desc);
@@ -0,0 +1,13 @@
+-- Job lifecycle status. The expiry sweeper (app/utils/expiry.py) moves jobs
+-- past application_deadline from 'open' to 'expired'; public listings only
+-- read open jobs, through the partial indexes below.
+
+alter table jobs add column if not exists status text not null default 'open';
+
+-- public listing: where status = 'open' order by created_at desc
+create index if not exists jobs_open_created_at_idx
+    on jobs (created_at desc) where status = 'open';
+
+-- sweeper: open jobs whose deadline has passed
+create index if not exists jobs_open_deadline_idx
+    on jobs (application_deadline) where status = 'open';
@@ -0,0 +1,109 @@
+-- Transactional outbox for mutation side effects (app/utils/outbox.py).
+-- Triggers append an event in the same transaction as the row change, so an
+-- event exists if and only if the write committed. Workers claim batches
+-- with a lease and mark them delivered; a crashed worker's lease simply
+-- expires and the batch is claimed again (at-least-once).
+
+create table if not exists outbox_events (
+    id           bigserial primary key,
+    topic        text        not null,
+    key          text        not null,
+    op           text        not null,
+    payload      jsonb       not null default '{}'::jsonb,
+    created_at   timestamptz not null default now(),
+    available_at timestamptz not null default now(),
+    locked_until timestamptz,
+    attempts     integer     not null default 0,
+    last_error   text,
+    delivered_at timestamptz,
+    failed_at    timestamptz
+);
+
+-- pending events only; delivered history is read by id range (replay)
+create index if not exists outbox_events_pending_idx
+    on outbox_events (available_at, id)
+    where delivered_at is null and failed_at is null;
+
+create index if not exists outbox_events_topic_id_idx on outbox_events (topic, id);
+
+-- Trigger arguments: topic, then the columns copied into the payload.
+-- "changed" lists which of those columns an update actually modified.
+create or replace function outbox_record()
+returns trigger
+language plpgsql
+as $$
+declare
+    v_row     jsonb;
+    v_old     jsonb;
+    v_payload jsonb := '{}'::jsonb;
+    v_changed text[] := '{}';
+    v_column  text;
+begin
+    if tg_op = 'DELETE' then
+        v_row := to_jsonb(old);
+    else
+        v_row := to_jsonb(new);
+    end if;
+    if tg_op = 'UPDATE' then
+        v_old := to_jsonb(old);
+    end if;
+
+    foreach v_column in array tg_argv[1:] loop
+        v_payload := v_payload || jsonb_build_object(v_column, v_row -> v_column);
+        if tg_op = 'UPDATE' and (v_old -> v_column) is distinct from (v_row -> v_column) then
+            v_changed := v_changed || v_column;
+        end if;
+    end loop;
+
+    if tg_op = 'UPDATE' then
+        if cardinality(v_changed) = 0 then
+            return null;  -- nothing a consumer cares about
+        end if;
+        v_payload := v_payload || jsonb_build_object('changed', to_jsonb(v_changed));
+    end if;
+
+    insert into outbox_events (topic, key, op, payload)
+    values (tg_argv[0], v_row ->> 'id', lower(tg_op), v_payload);
+    return null;
+end;
+$$;
+
+drop trigger if exists applications_outbox on applications;
+create trigger applications_outbox
+    after insert or update or delete on applications
+    for each row execute function outbox_record(
+        'applications', 'id', 'job_id', 'candidate_id', 'resume_url', 'status'
+    );
+
+drop trigger if exists jobs_outbox on jobs;
+create trigger jobs_outbox
+    after insert or update or delete on jobs
+    for each row execute function outbox_record(
+        'jobs', 'id', 'recruiter_id', 'status'
+    );
+
+-- Lease up to p_batch_size due events to the caller. skip locked lets
+-- several workers claim concurrently without waiting on each other.
+create or replace function claim_outbox_events(
+    p_batch_size    integer,
+    p_lease_seconds integer
+)
+returns setof outbox_events
+language sql
+as $$
+    update outbox_events e
+       set locked_until = now() + make_interval(secs => p_lease_seconds),
+           attempts     = e.attempts + 1
+     where e.id in (
+            select id
+              from outbox_events
+             where delivered_at is null
+               and failed_at is null
+               and available_at <= now()
+               and (locked_until is null or locked_until < now())
+             order by id
+             limit p_batch_size
+               for update skip locked
+           )
+    returning e.*;
+$$;
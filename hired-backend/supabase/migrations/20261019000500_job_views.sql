@@ -0,0 +1,38 @@
+-- View counters and trending score per job (app/utils/views.py).
+--
+-- trending_log is a time-anchored, log-space decayed score: a view at time t
+-- adds exp(lambda * (t - epoch)), kept as its log so it never overflows.
+-- Ordering by trending_log is ordering by the decayed score at any moment,
+-- so rows never need rescoring as time passes. Workers compute the log
+-- increments; the database only merges them (log-sum-exp).
+
+create table if not exists job_view_counts (
+    job_id       uuid primary key references jobs (id) on delete cascade,
+    views        bigint           not null default 0,
+    trending_log double precision not null,
+    updated_at   timestamptz      not null default now()
+);
+
+create index if not exists job_view_counts_trending_idx on job_view_counts (trending_log desc);
+create index if not exists job_view_counts_views_idx on job_view_counts (views desc);
+
+-- p_views: {"<job_id>": {"views": <n>, "score": <log increment>}, ...}
+-- One call per flush interval per worker. Views of jobs deleted meanwhile
+-- are dropped by the join instead of failing the batch.
+create or replace function record_job_views(p_views jsonb)
+returns void
+language sql
+as $$
+    insert into job_view_counts as c (job_id, views, trending_log, updated_at)
+    select j.id,
+           (v.value ->> 'views')::bigint,
+           (v.value ->> 'score')::double precision,
+           now()
+      from jsonb_each(p_views) v
+      join jobs j on j.id::text = v.key
+    on conflict (job_id) do update
+       set views        = c.views + excluded.views,
+           trending_log = greatest(c.trending_log, excluded.trending_log)
+                          + ln(1 + exp(-abs(c.trending_log - excluded.trending_log))),
+           updated_at   = now();
+$$;
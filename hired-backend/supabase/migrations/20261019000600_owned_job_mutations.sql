@@ -0,0 +1,75 @@
+-- Recruiter update/delete of a job in one round trip (app/utils/mutations.py).
+-- Like update_application_status, the ownership check and the
+-- missing-vs-forbidden probe both run inside the database, so a miss no
+-- longer costs the API a second request.
+
+-- p_values: {"<column>": <value>, ...}, the fields the route accepted.
+-- Only the named columns are written; unknown columns raise, as they would
+-- through PostgREST.
+create or replace function update_job_owned(
+    p_job_id       jobs.id%type,
+    p_recruiter_id jobs.recruiter_id%type,
+    p_values       jsonb
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_row     jobs%rowtype;
+    v_columns text;
+begin
+    select string_agg(quote_ident(key), ', ')
+      into v_columns
+      from jsonb_object_keys(p_values) key;
+
+    if v_columns is null then
+        select * into v_row from jobs where id = p_job_id and recruiter_id = p_recruiter_id;
+    else
+        execute format(
+            'update jobs set (%s) = (select %s from jsonb_populate_record(null::jobs, $1))
+              where id = $2 and recruiter_id = $3
+              returning *',
+            v_columns, v_columns
+        )
+        into v_row
+        using p_values, p_job_id, p_recruiter_id;
+    end if;
+
+    if v_row.id is not null then
+        return jsonb_build_object('outcome', 'ok', 'job', to_jsonb(v_row));
+    end if;
+
+    if exists (select 1 from jobs where id = p_job_id) then
+        return jsonb_build_object('outcome', 'forbidden', 'job', null);
+    end if;
+
+    return jsonb_build_object('outcome', 'not_found', 'job', null);
+end;
+$$;
+
+create or replace function delete_job_owned(
+    p_job_id       jobs.id%type,
+    p_recruiter_id jobs.recruiter_id%type
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_row jobs%rowtype;
+begin
+    delete from jobs
+     where id = p_job_id
+       and recruiter_id = p_recruiter_id
+    returning * into v_row;
+
+    if found then
+        return jsonb_build_object('outcome', 'ok', 'job', to_jsonb(v_row));
+    end if;
+
+    if exists (select 1 from jobs where id = p_job_id) then
+        return jsonb_build_object('outcome', 'forbidden', 'job', null);
+    end if;
+
+    return jsonb_build_object('outcome', 'not_found', 'job', null);
+end;
+$$;
@@ -0,0 +1,49 @@
+-- Refuse applications and saved jobs for a job that no longer takes them
+-- (app/utils/expiry.py). The API's is_expired() only knows what its own
+-- process has seen, so this is the check that holds; it runs inside the
+-- insert, at no extra round trip.
+--
+-- A job is closed when the sweeper marked it expired, or when its deadline
+-- has passed and the sweeper hasn't got to it yet. A date-only deadline
+-- means "open until the end of that day (UTC)", as in _parse_deadline.
+-- The error code HJ410 is mapped to 410 by the routes.
+
+create or replace function job_is_closed(p_job_id jobs.id%type)
+returns boolean
+language sql
+stable
+as $$
+    select coalesce((
+        select j.status = 'expired'
+            or case
+                   when j.application_deadline is null then false
+                   when length(j.application_deadline::text) = 10
+                       then j.application_deadline::text::date < (now() at time zone 'utc')::date
+                   else j.application_deadline::text::timestamptz < now()
+               end
+          from jobs j
+         where j.id = p_job_id
+    ), false);
+$$;
+
+create or replace function refuse_closed_job()
+returns trigger
+language plpgsql
+as $$
+begin
+    if job_is_closed(new.job_id) then
+        raise exception 'job % is no longer open', new.job_id using errcode = 'HJ410';
+    end if;
+    return new;
+end;
+$$;
+
+drop trigger if exists applications_refuse_closed_job on applications;
+create trigger applications_refuse_closed_job
+    before insert on applications
+    for each row execute function refuse_closed_job();
+
+drop trigger if exists saved_jobs_refuse_closed_job on saved_jobs;
+create trigger saved_jobs_refuse_closed_job
+    before insert on saved_jobs
+    for each row execute function refuse_closed_job();
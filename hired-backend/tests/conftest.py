@@ -0,0 +1,53 @@
+import os
+import sys
+
+# Importing app modules builds the Supabase client and reads config at import
+# time. Nothing here talks to Supabase: tests replace execute()/supabase on the
+# module under test, and the background threads stay off.
+os.environ.setdefault("SUPABASE_URL", "http://supabase.invalid")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test-key")
+for flag in ("JOB_REPLICA_ENABLED", "SUGGEST_ENABLED", "EXPIRY_SWEEP_ENABLED", "OUTBOX_ENABLED",
+             "VIEW_COUNTS_ENABLED", "RESUME_INDEX_ENABLED"):
+    os.environ.setdefault(flag, "false")
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+import pytest  # noqa: E402
+from types import SimpleNamespace  # noqa: E402
+
+
+class Query:
+    """Stands in for a PostgREST builder chain; execute() is stubbed per test."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """
+    Test client for the API routes with token_required answered locally.
+    client.user is the signed-in user; change its role per test. The routes'
+    query builders are stubs, so tests stub execute() on the route module.
+    """
+    import app.middlewares.auth_middleware as auth
+    import app.middlewares.rate_limit_middleware as rate_limit_middleware
+    import app.routes.job_routes as job_routes
+    import app.routes.user_jobs_routes as user_jobs_routes
+    from app import create_app
+    from app.utils import concurrency
+
+    user = {"auth_uid": "user-1", "role": "candidate"}
+    monkeypatch.setattr(auth, "call", lambda op, fn, **kwargs: SimpleNamespace(
+        user=SimpleNamespace(id=user["auth_uid"], email="u@example.com")))
+    monkeypatch.setattr(auth, "execute", lambda op, query, **kwargs: SimpleNamespace(data=dict(user)))
+    monkeypatch.setattr(auth, "supabase", SimpleNamespace(auth=None, table=lambda name: Query()))
+    for module in (job_routes, user_jobs_routes):
+        monkeypatch.setattr(module, "supabase", SimpleNamespace(table=lambda name: Query(), rpc=lambda *args: Query()))
+    monkeypatch.setattr(rate_limit_middleware, "RATE_LIMIT_ENABLED", False)
+    monkeypatch.setattr(concurrency, "CONCURRENCY_LIMIT_ENABLED", False)
+
+    client = create_app().test_client()
+    client.user = user
+    return client
@@ -0,0 +1,64 @@
+from app.utils import concurrency
+from app.utils.concurrency import HIGH, LOW, NORMAL, AIMDLimiter, PriorityGate, class_capacity, initial_limit
+
+
+def test_limits_fit_the_worker_threads():
+    assert class_capacity(10) == {HIGH: 10, NORMAL: 8, LOW: 6}
+    assert [initial_limit(p, 10) for p in (HIGH, NORMAL, LOW)] == [10, 5, 2]
+    # a single-threaded worker still admits every class
+    assert class_capacity(1) == {HIGH: 1, NORMAL: 1, LOW: 1}
+
+
+def test_gate_holds_threads_back_for_higher_classes():
+    gate = PriorityGate(threads=10)
+    assert sum(gate.try_acquire(LOW) for _ in range(10)) == 6
+    assert sum(gate.try_acquire(NORMAL) for _ in range(10)) == 2
+    assert sum(gate.try_acquire(HIGH) for _ in range(10)) == 2
+    assert gate.snapshot()["shed"] == {HIGH: 8, NORMAL: 8, LOW: 4}
+
+    gate.release()
+    assert not gate.try_acquire(LOW)
+    assert gate.try_acquire(HIGH)
+
+
+def test_aimd_grows_near_the_limit_and_backs_off_once_per_cooldown(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(concurrency.time, "monotonic", lambda: clock[0])
+    limiter = AIMDLimiter("e", initial_limit=4, target_ms=100, max_limit=10)
+
+    for _ in range(4):
+        assert limiter.try_acquire()
+    assert not limiter.try_acquire()
+    limiter.release(10)
+    assert limiter.limit == 4.25
+
+    clock[0] = 5.0
+    limiter.release(500)
+    limiter.release(500)  # within the cooldown
+    assert limiter.limit == 4.25 * 0.8
+
+    clock[0] = 10.0
+    limiter.release(10, overloaded=True)
+    assert round(limiter.limit, 3) == round(4.25 * 0.8 * 0.8, 3)
+
+
+def test_aimd_never_exceeds_max_or_drops_below_min():
+    limiter = AIMDLimiter("e", initial_limit=2, target_ms=100, max_limit=3)
+    for _ in range(50):
+        limiter.try_acquire()
+        limiter.release(1)
+    assert limiter.limit == 3
+
+    limiter._last_decrease = -concurrency.COOLDOWN
+    for _ in range(50):
+        limiter.try_acquire()
+        limiter._last_decrease = -concurrency.COOLDOWN
+        limiter.release(1, overloaded=True)
+    assert limiter.limit == concurrency.MIN_LIMIT
+
+
+def test_client_paced_limiter_ignores_latency():
+    limiter = AIMDLimiter("upload", initial_limit=2, target_ms=100, latency_bound=False)
+    limiter.try_acquire()
+    limiter.release(60000)
+    assert limiter.limit > 2
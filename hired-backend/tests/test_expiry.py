@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import expiry
+from app.utils.suggest import SuggestIndex
+
+
+class Query:
+    """Records the filters of a PostgREST builder chain."""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+        return method
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    expiry._deadlines.clear()
+    expiry._expired_ids.clear()
+
+
+def today():
+    return datetime.now(timezone.utc).date()
+
+
+def test_date_only_deadline_is_open_until_the_end_of_the_day():
+    expiry.remember({"id": "a", "status": "open", "application_deadline": today().isoformat()})
+    expiry.remember({"id": "b", "status": "open", "application_deadline": (today() - timedelta(days=1)).isoformat()})
+    assert not expiry.is_expired("a")
+    assert expiry.is_expired("b")
+
+
+def test_sweep_applies_the_same_rule_as_is_expired(monkeypatch):
+    candidates = [
+        {"id": "1", "application_deadline": (today() - timedelta(days=1)).isoformat()},
+        {"id": "2", "application_deadline": today().isoformat()},
+        {"id": "3", "application_deadline": (datetime.now(timezone.utc) - timedelta(minutes=1)).isoformat()},
+    ]
+    marked = []
+
+    def execute(op, query, **kwargs):
+        if op == "expiry.due":
+            return SimpleNamespace(data=candidates)
+        ids = next(args[1] for name, args in query.calls if name == "in_")
+        marked.extend(ids)
+        return SimpleNamespace(data=[{"id": i} for i in ids])
+
+    index = SuggestIndex()
+    for job_id in ("1", "2", "3"):
+        index.add_job({"id": job_id, "title": f"job {job_id}"})
+    monkeypatch.setattr(expiry, "execute", execute)
+    monkeypatch.setattr(expiry, "supabase", SimpleNamespace(table=lambda name: Query([])))
+    monkeypatch.setattr(expiry, "suggest_index", index)
+
+    assert expiry.sweep_once() == 2
+    assert marked == ["1", "3"]
+    assert expiry.is_expired("1") and expiry.is_expired("3")
+    # this worker's typeahead drops them without waiting for a reload
+    index._rebuild_snapshot()
+    assert [s["text"] for s in index.suggest("job")] == ["job 2"]
+
+
+def test_extending_the_deadline_reopens_the_job():
+    future = (today() + timedelta(days=7)).isoformat()
+    past = (today() - timedelta(days=7)).isoformat()
+    assert expiry.reopen_on_extension({"application_deadline": future}) == {"application_deadline": future, "status": "open"}
+    assert expiry.reopen_on_extension({"application_deadline": past}) == {"application_deadline": past}
+    assert expiry.reopen_on_extension({"title": "x"}) == {"title": "x"}
+
+    expiry.remember({"id": "a", "status": "expired"})
+    assert expiry.is_expired("a")
+    expiry.remember({"id": "a", "status": "open", "application_deadline": future})
+    assert not expiry.is_expired("a")
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/api/v1/user-jobs/applications", {"job_id": "job-1", "resume_url": "https://cdn.example.com/r.pdf"}),
+    ("/api/v1/user-jobs/saved-jobs", {"job_id": "job-1"}),
+])
+def test_database_refusal_of_a_closed_job_is_a_410(api, monkeypatch, path, body):
+    from postgrest.exceptions import APIError
+    import app.routes.user_jobs_routes as user_jobs_routes
+
+    def execute(op, query, **kwargs):
+        if op.endswith(".insert"):
+            raise APIError({"code": expiry.JOB_CLOSED_CODE, "message": "job job-1 is no longer open"})
+        return SimpleNamespace(data=[])
+
+    monkeypatch.setattr(user_jobs_routes, "execute", execute)
+    # this worker has never seen the job, so only the database knows
+    assert not expiry.is_expired("job-1")
+    resp = api.post(path, json=body, headers={"Authorization": "Bearer t"})
+    assert resp.status_code == 410
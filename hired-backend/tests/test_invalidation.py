@@ -0,0 +1,73 @@
+import json
+
+from app.utils import invalidation
+from app.utils.invalidation import InMemoryBackend, InvalidationBus, RedisBackend
+
+
+def test_duplicate_and_out_of_order_events_are_dropped():
+    bus = InvalidationBus(InMemoryBackend())
+    seen = []
+    bus.subscribe("jobs", lambda key, event: seen.append(event["version"]))
+
+    event = bus.publish("jobs", "a")
+    bus._deliver(event)
+    bus._deliver(dict(event, version=event["version"] - 1))
+    bus.publish("jobs", "a")
+
+    assert seen == [event["version"], event["version"] + 1]
+    assert bus.metrics()["duplicates"] == 2
+
+
+def test_seen_versions_are_bounded(monkeypatch):
+    monkeypatch.setattr(invalidation, "INVALIDATION_SEEN_MAX", 10)
+    bus = InvalidationBus(InMemoryBackend())
+    for i in range(100):
+        bus.publish("jobs", str(i))
+    assert len(bus._seen._data) == 10
+
+
+class FlakyPubSub:
+    def __init__(self, script):
+        self.script = script
+
+    def subscribe(self, channel):
+        pass
+
+    def listen(self):
+        for item in self.script.pop(0):
+            if isinstance(item, BaseException):
+                raise item
+            yield item
+
+
+def test_redis_listener_reconnects_and_resyncs(monkeypatch):
+    monkeypatch.setattr(invalidation.time, "sleep", lambda seconds: None)
+    event = {"topic": "jobs", "key": "a", "version": 1, "origin": "x", "ts": 0}
+    # SystemExit ends the test; the listener only catches Exception
+    script = [[ConnectionError("reset by peer")], [{"data": json.dumps(event)}, SystemExit()]]
+
+    backend = RedisBackend.__new__(RedisBackend)
+    backend.channel, backend.reconnects = "c", 0
+    backend._subscriber = type("Client", (), {"pubsub": lambda self, **kwargs: FlakyPubSub(script)})()
+
+    delivered, resyncs = [], []
+    try:
+        backend._listen(delivered.append, lambda: resyncs.append(1))
+    except SystemExit:
+        pass
+
+    assert delivered == [event]
+    assert resyncs == [1] and backend.reconnects == 1
+
+
+def test_notify_logs_a_backend_failure_and_still_invalidates_locally():
+    class DownBackend(InMemoryBackend):
+        def next_version(self, topic, key):
+            raise ConnectionError("redis down")
+
+    bus = InvalidationBus(DownBackend())
+    dropped = []
+    bus.subscribe("jobs", lambda key, event: dropped.append(key))
+
+    assert bus.notify("jobs", "job-1") is None
+    assert dropped == ["job-1"]
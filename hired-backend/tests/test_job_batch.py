@@ -0,0 +1,35 @@
+from types import SimpleNamespace
+
+import pytest
+
+JOB_ID = "6f1c2a9e-3b7d-4c1e-9a2f-0d4b5e6f7a8b"
+
+
+@pytest.fixture
+def client(api, monkeypatch):
+    import app.routes.job_routes as job_routes
+
+    queried = []
+
+    def execute(op, query, **kwargs):
+        queried.append(op)
+        return SimpleNamespace(data=[{"id": JOB_ID, "title": "Backend Engineer"}])
+
+    monkeypatch.setattr(job_routes, "execute", execute)
+    api.queried = queried
+    return api
+
+
+def test_malformed_ids_are_reported_missing_without_failing_the_batch(client):
+    resp = client.post("/api/v1/jobs/batch", json={"ids": [JOB_ID.upper(), "not-a-uuid", "1 or 1=1"]})
+    assert resp.status_code == 200
+    assert [job["id"] for job in resp.json["jobs"]] == [JOB_ID]
+    assert resp.json["missing"] == ["not-a-uuid", "1 or 1=1"]
+    assert client.queried == ["jobs.get_many"]
+
+
+def test_only_malformed_ids_skip_the_query(client):
+    resp = client.get("/api/v1/jobs/batch?ids=abc,def")
+    assert resp.status_code == 200
+    assert resp.json == {"jobs": [], "missing": ["abc", "def"]}
+    assert client.queried == []
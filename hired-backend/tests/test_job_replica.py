@@ -0,0 +1,77 @@
+from app.utils import job_replica as replica_module
+from app.utils.job_replica import JobReplica, _parse
+
+
+class FakeTable:
+    """Serves _page() from a list, with PostgREST's keyset semantics."""
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def page(self, op, table, columns, ts_column, id_column, ts, last_id):
+        def after(row):
+            key = (_parse(row[ts_column]), str(row[id_column]))
+            if last_id:
+                return key > (_parse(ts), last_id)
+            return key[0] >= _parse(ts)
+
+        ordered = sorted(self.rows, key=lambda r: (_parse(r[ts_column]), str(r[id_column])))
+        return [r for r in ordered if after(r)][:replica_module.REPLICA_BATCH_SIZE]
+
+
+def job(job_id, updated_at, title="t"):
+    return {"id": job_id, "title": title, "status": "open", "created_at": updated_at, "updated_at": updated_at}
+
+
+def make_replica(monkeypatch, jobs, tombstones=None):
+    replica = JobReplica(path=":memory:")
+    replica._db = replica._connect()
+    replica.enabled = True
+    tables = {"jobs": FakeTable(jobs), "job_tombstones": FakeTable(tombstones if tombstones is not None else [])}
+    monkeypatch.setattr(replica, "_page", lambda op, table, *args: tables[table].page(op, table, *args))
+    return replica
+
+
+def test_keyset_paging_reads_every_row(monkeypatch):
+    monkeypatch.setattr(replica_module, "REPLICA_BATCH_SIZE", 2)
+    same_instant = "2026-10-19T10:00:00+00:00"
+    jobs = [job(f"j{i}", same_instant) for i in range(5)]
+    replica = make_replica(monkeypatch, jobs)
+
+    replica.sync_once()
+    assert set(replica.get_jobs([j["id"] for j in jobs])) == {j["id"] for j in jobs}
+
+
+def test_late_commit_behind_the_watermark_is_picked_up(monkeypatch):
+    jobs = [job("a", "2026-10-19T10:00:10+00:00")]
+    replica = make_replica(monkeypatch, jobs)
+    replica.sync_once()
+
+    # started (now()) before "a" but committed after the first sync
+    jobs.append(job("late", "2026-10-19T10:00:05+00:00"))
+    replica.sync_once()
+    assert replica.get_job("late") is not None
+
+
+def test_overlap_reread_does_not_undo_a_newer_local_write(monkeypatch):
+    jobs = [job("a", "2026-10-19T10:00:00+00:00", title="old")]
+    replica = make_replica(monkeypatch, jobs)
+    replica.apply(job("a", "2026-10-19T10:00:30+00:00", title="new"))
+
+    replica.sync_once()
+    assert replica.get_job("a")["title"] == "new"
+
+
+def test_late_tombstone_is_applied(monkeypatch):
+    jobs = [job("a", "2026-10-19T10:00:00+00:00"), job("b", "2026-10-19T10:00:00+00:00")]
+    tombstones = []
+    replica = make_replica(monkeypatch, jobs, tombstones)
+    replica.sync_once()
+
+    jobs.clear()
+    tombstones.append({"job_id": "a", "deleted_at": "2026-10-19T10:01:00+00:00"})
+    replica.sync_once()
+    # committed after the sync above, stamped before it
+    tombstones.append({"job_id": "b", "deleted_at": "2026-10-19T10:00:50+00:00"})
+    replica.sync_once()
+    assert replica.get_job("a") is None and replica.get_job("b") is None
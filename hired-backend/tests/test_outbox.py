@@ -0,0 +1,150 @@
+import threading
+from concurrent.futures import Future
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import outbox as outbox_module
+from app.utils import resume_index
+from app.utils.outbox import Outbox
+
+
+class Query:
+    """Records the calls of a PostgREST builder chain."""
+
+    def __init__(self, calls):
+        self.calls = calls
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            self.calls.append((name, args))
+            return self
+        return method
+
+
+class FakeSupabase:
+    def __init__(self, events):
+        self.events = events
+        self.writes = []
+
+    def rpc(self, name, params):
+        return ("claim", params)
+
+    def table(self, name):
+        calls = []
+        self.writes.append(calls)
+        return Query(calls)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    def make(events):
+        fake = FakeSupabase(events)
+        ops = []
+
+        def execute(op, query, **kwargs):
+            ops.append(op)
+            if op == "outbox.claim":
+                return SimpleNamespace(data=fake.events)
+            return SimpleNamespace(data=[])
+
+        monkeypatch.setattr(outbox_module, "supabase", fake)
+        monkeypatch.setattr(outbox_module, "execute", execute)
+        fake.ops = ops
+        return fake
+
+    return make
+
+
+def event(event_id, topic="applications", attempts=1):
+    return {"id": event_id, "topic": topic, "op": "insert", "attempts": attempts,
+            "created_at": "2026-10-19T00:00:00+00:00", "payload": {}}
+
+
+def acked_ids(fake):
+    for calls in fake.writes:
+        values = dict(calls)
+        if "update" in values and values["update"][0].get("delivered_at"):
+            return values["in_"][1]
+    return []
+
+
+def test_events_are_delivered_in_id_order_and_acked_together(db):
+    fake = db([event(3), event(1), event(2)])
+    box = Outbox(workers=0)
+    seen = []
+    box.register("applications", lambda e: seen.append(e["id"]))
+
+    assert box.drain_once() == 3
+    assert seen == [1, 2, 3]
+    assert sorted(acked_ids(fake)) == [1, 2, 3]
+    assert fake.ops == ["outbox.claim", "outbox.ack"]
+
+
+def test_failed_event_is_released_with_backoff_then_parked(db, monkeypatch):
+    monkeypatch.setattr(outbox_module, "OUTBOX_MAX_ATTEMPTS", 3)
+    fake = db([event(1, attempts=1), event(2, attempts=3)])
+    box = Outbox(workers=0)
+
+    def consumer(e):
+        raise RuntimeError("boom")
+
+    box.register("applications", consumer)
+    box.drain_once()
+
+    released = [dict(calls)["update"][0] for calls in fake.writes]
+    assert "available_at" in released[0] and "failed_at" not in released[0]
+    assert "failed_at" in released[1]
+    assert acked_ids(fake) == []
+    assert box.stats()["retried"] == 1 and box.stats()["parked"] == 1
+
+
+def test_lease_is_renewed_while_a_future_is_pending(db, monkeypatch):
+    monkeypatch.setattr(outbox_module, "OUTBOX_LEASE_SECONDS", 0.3)
+    fake = db([event(1), event(2)])
+    box = Outbox(workers=0)
+
+    def consumer(e):
+        future = Future()
+        if e["id"] == 1:
+            future.set_result(True)
+        else:
+            threading.Timer(0.35, future.set_result, args=(True,)).start()
+        return future
+
+    box.register("applications", consumer)
+    box.drain_once()
+
+    assert fake.ops.count("outbox.renew") >= 2
+    renewed = [dict(calls)["in_"][1] for calls in fake.writes if "is_" in dict(calls)]
+    # only the event still in flight is renewed
+    assert all(ids == [2] for ids in renewed)
+    assert sorted(acked_ids(fake)) == [1, 2]
+
+
+def test_failed_future_releases_its_event(db):
+    fake = db([event(1)])
+    box = Outbox(workers=0)
+
+    def consumer(e):
+        future = Future()
+        future.set_exception(RuntimeError("parse failed"))
+        return future
+
+    box.register("applications", consumer)
+    box.drain_once()
+    assert acked_ids(fake) == []
+    assert box.stats()["retried"] == 1
+
+
+def test_full_index_queue_pushes_back_on_the_outbox(monkeypatch):
+    monkeypatch.setattr(resume_index, "RESUME_INDEX_ENABLED", True)
+    monkeypatch.setattr(resume_index.storage_backend, "owns", lambda url: True)
+    pipeline = resume_index.ResumePipeline(processes=1, threads=0, queue_size=1)
+    monkeypatch.setattr(pipeline, "start", lambda: None)
+
+    application = {"id": "a1", "job_id": "j1", "candidate_id": "c1", "resume_url": "file:///r.pdf"}
+    assert isinstance(pipeline.submit(application), Future)
+    with pytest.raises(resume_index.IndexQueueFull):
+        pipeline.submit(application)
+    assert pipeline.submit({"id": "a2", "resume_url": None}) is None
@@ -0,0 +1,74 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import rate_limit
+from app.utils.rate_limit import MemoryBucketStore, RateLimiter, client_ip
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_bucket_allows_a_burst_then_refills_at_the_rate(clock):
+    store = MemoryBucketStore()
+    assert [store.take("k", 3, 30)[0] for _ in range(4)] == [True, True, True, False]
+
+    allowed, retry_after = store.take("k", 3, 30)
+    assert not allowed and retry_after == pytest.approx(10.0)
+
+    clock[0] += 10
+    assert store.take("k", 3, 30)[0]
+    assert not store.take("k", 3, 30)[0]
+
+
+def test_bucket_never_holds_more_than_capacity(clock):
+    store = MemoryBucketStore()
+    store.take("k", 2, 10)
+    clock[0] += 3600
+    assert [store.take("k", 2, 10)[0] for _ in range(3)] == [True, True, False]
+
+
+def test_least_recently_used_keys_are_evicted(clock):
+    store = MemoryBucketStore(max_keys=2)
+    for key in ("a", "b", "a", "c"):
+        store.take(key, 1, 60)
+    assert store.size() == 2
+    assert not store.take("a", 1, 60)[0]
+    # "b" was evicted, so it starts with a full bucket again
+    assert store.take("b", 1, 60)[0]
+
+
+def test_limiter_falls_back_to_memory_when_the_store_fails(monkeypatch):
+    class Broken:
+        def take(self, *args):
+            raise ConnectionError("redis down")
+
+    limiter = RateLimiter()
+    limiter.use(Broken())
+    monkeypatch.setitem(rate_limit.BUDGETS, "test", {"ip": (1, 60)})
+    assert limiter.check("test", "ip", "1.2.3.4")[0]
+    assert not limiter.check("test", "ip", "1.2.3.4")[0]
+
+
+def request(forwarded, remote="10.0.0.1"):
+    headers = {"X-Forwarded-For": forwarded} if forwarded is not None else {}
+    return SimpleNamespace(headers=headers, remote_addr=remote)
+
+
+def test_client_ip_ignores_forwarded_for_without_trusted_proxies():
+    assert client_ip(request("6.6.6.6"), trusted_proxies=0) == "10.0.0.1"
+
+
+def test_client_ip_takes_the_entry_the_trusted_proxies_added():
+    # the client sent "6.6.6.6" itself; our proxy appended the real peer
+    assert client_ip(request("6.6.6.6, 203.0.113.7"), trusted_proxies=1) == "203.0.113.7"
+    assert client_ip(request("6.6.6.6, 203.0.113.7, 10.1.1.1"), trusted_proxies=2) == "203.0.113.7"
+
+
+def test_client_ip_distrusts_a_chain_shorter_than_the_proxies():
+    assert client_ip(request("203.0.113.7"), trusted_proxies=2) == "10.0.0.1"
+    assert client_ip(request(None), trusted_proxies=1) == "10.0.0.1"
@@ -0,0 +1,125 @@
+import httpx
+import pytest
+from postgrest.exceptions import APIError
+
+from app.utils import resilience
+from app.utils.resilience import (
+    CircuitBreaker, UpstreamOutcomeUnknown, UpstreamUnavailable, call, unavailable_response,
+)
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(resilience, "breakers", {
+        name: CircuitBreaker(name, failure_threshold=2, reset_timeout=60) for name in ("postgrest", "auth", "storage")
+    })
+    monkeypatch.setattr(resilience, "RETRY_BASE_DELAY", 0)
+
+
+@pytest.fixture
+def app_context():
+    from flask import Flask
+    with Flask(__name__).app_context():
+        yield
+
+
+def failing(error):
+    def fn():
+        raise error
+    return fn
+
+
+def test_breaker_opens_after_threshold_and_half_opens_after_reset(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(resilience.time, "monotonic", lambda: clock[0])
+    breaker = CircuitBreaker("t", failure_threshold=2, reset_timeout=30)
+
+    breaker.record_failure()
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    clock[0] += 30
+    assert breaker.allow() and breaker.state == CircuitBreaker.HALF_OPEN
+    # the probe fails: straight back to open
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN and not breaker.allow()
+
+    clock[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+
+
+def test_client_errors_do_not_count_against_the_breaker():
+    for _ in range(3):
+        with pytest.raises(APIError):
+            call("jobs.get", failing(APIError({"code": "PGRST116", "message": "no rows"})), idempotent=True)
+    assert resilience.breakers["postgrest"].state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.parametrize("code", ["22007", "23505", "23503", "42703"])
+def test_numeric_sqlstates_of_bad_requests_are_client_errors(code):
+    for _ in range(3):
+        with pytest.raises(APIError):
+            call("jobs.update", failing(APIError({"code": code, "message": "rejected"})))
+    assert resilience.breakers["postgrest"].state == CircuitBreaker.CLOSED
+    assert call("jobs.get", lambda: "ok", idempotent=True) == "ok"
+
+
+def test_non_json_gateway_error_counts_as_a_failure():
+    error = APIError({"code": 503, "message": "Service Unavailable"})
+    with pytest.raises(UpstreamUnavailable):
+        call("jobs.get", failing(error), idempotent=True)
+    assert resilience.breakers["postgrest"].state == CircuitBreaker.OPEN
+
+
+def test_server_errors_count_as_failures():
+    with pytest.raises(UpstreamUnavailable):
+        call("jobs.get", failing(APIError({"code": "PGRST001", "message": "db down"})), idempotent=True)
+    assert resilience.breakers["postgrest"].state == CircuitBreaker.OPEN
+
+
+def test_open_breaker_serves_stale_response(monkeypatch):
+    monkeypatch.setattr(resilience, "stale_cache", resilience.StaleCache())
+    assert call("jobs.get", lambda: "fresh", idempotent=True, cache_key="k") == "fresh"
+    resilience.breakers["postgrest"].state = CircuitBreaker.OPEN
+    resilience.breakers["postgrest"].opened_at = resilience.time.monotonic()
+    assert call("jobs.get", failing(AssertionError("not called")), idempotent=True, cache_key="k") == "fresh"
+
+
+def test_write_that_may_have_been_sent_has_unknown_outcome(app_context):
+    with pytest.raises(UpstreamOutcomeUnknown) as exc:
+        call("jobs.update", failing(httpx.ReadTimeout("slow")))
+    body, status = unavailable_response(exc.value)
+    assert status == 504 and "Retry-After" not in body.headers
+
+
+def test_write_that_was_never_sent_is_plain_unavailable(app_context):
+    with pytest.raises(UpstreamUnavailable) as exc:
+        call("jobs.update", failing(httpx.ConnectError("refused")))
+    assert not isinstance(exc.value, UpstreamOutcomeUnknown)
+    body, status = unavailable_response(exc.value)
+    assert status == 503 and body.headers["Retry-After"]
+
+
+def test_saturated_pool_fails_fast_without_tripping_the_breaker(monkeypatch):
+    monkeypatch.setattr(resilience, "_inflight", resilience.threading.BoundedSemaphore(1))
+    resilience._inflight.acquire()
+    with pytest.raises(resilience.CallPoolSaturated):
+        call("jobs.get", lambda: "never", idempotent=True)
+    assert resilience.breakers["postgrest"].failures == 0
+
+
+def test_saturated_probe_hands_the_half_open_slot_back(monkeypatch):
+    breaker = resilience.breakers["postgrest"]
+    breaker.state, breaker.opened_at = CircuitBreaker.OPEN, resilience.time.monotonic() - 120
+    monkeypatch.setattr(resilience, "_inflight", resilience.threading.BoundedSemaphore(1))
+    resilience._inflight.acquire()
+    with pytest.raises(resilience.CallPoolSaturated):
+        call("jobs.get", lambda: "never", idempotent=True)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    resilience._inflight.release()
+    assert call("jobs.get", lambda: "ok", idempotent=True) == "ok"
+    assert breaker.state == CircuitBreaker.CLOSED
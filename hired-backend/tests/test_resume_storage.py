@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+from app.utils import resume_index
+from app.utils.resume_storage import LocalStorageBackend
+
+
+@pytest.fixture
+def backend(tmp_path):
+    root = tmp_path / "resumes"
+    (root / "cand-1").mkdir(parents=True)
+    (root / "cand-1" / "cv.pdf").write_bytes(b"%PDF resume")
+    (tmp_path / "secret").write_text("not a resume")
+    return LocalStorageBackend(root=str(root), base_url=f"file://{root}")
+
+
+def test_owns_urls_it_issued(backend):
+    assert backend.owns(backend.url("cand-1/cv.pdf"))
+    assert not backend.owns("https://example.com/cv.pdf")
+
+
+@pytest.mark.parametrize("key", ["../secret", "%2e%2e/secret", "cand-1/%2E%2E/%2e%2e/secret", "%2e%2e%2fsecret"])
+def test_owns_rejects_traversal(backend, key):
+    assert not backend.owns(f"{backend.base_url}/{key}")
+
+
+def test_fetch_refuses_encoded_traversal(backend, monkeypatch):
+    monkeypatch.setattr(resume_index, "storage_backend", backend)
+    assert resume_index._fetch(backend.url("cand-1/cv.pdf")) == b"%PDF resume"
+    with pytest.raises(ValueError):
+        resume_index._fetch(f"{backend.base_url}/%2e%2e/secret")
+
+
+def test_spawned_processes_do_not_build_the_app(monkeypatch):
+    import runpy
+    import app as app_package
+
+    def create_app():
+        raise AssertionError("create_app() ran in a spawned process")
+
+    monkeypatch.setattr(app_package, "create_app", create_app)
+    run_py = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "run.py")
+    module = runpy.run_path(run_py, run_name="__mp_main__")
+    assert "app" not in module
@@ -0,0 +1,26 @@
+import pytest
+from pydantic import ValidationError
+
+from app.utils.schemas import CreateJobRequest
+
+JOB = {
+    "title": "Backend Engineer", "company_name": "Hirify", "location": "Remote",
+    "job_type": "full-time", "salary_range": "20-30 LPA", "experience_level": "mid",
+}
+
+
+def test_skills_string_is_split_and_trimmed():
+    body = CreateJobRequest.model_validate({**JOB, "skills_required": " python, flask ,,Python "})
+    assert body.skills_required == ["python", "flask"]
+    assert body.model_dump()["skills_required"] == ["python", "flask"]
+
+
+def test_skills_list_is_stripped_and_deduplicated():
+    body = CreateJobRequest.model_validate({**JOB, "skills_required": [" Go ", "go", "SQL"]})
+    assert body.skills_required == ["Go", "SQL"]
+
+
+@pytest.mark.parametrize("skills", [[], " , ,", ""])
+def test_empty_skills_are_rejected(skills):
+    with pytest.raises(ValidationError):
+        CreateJobRequest.model_validate({**JOB, "skills_required": skills})
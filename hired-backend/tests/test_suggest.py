@@ -0,0 +1,119 @@
+import random
+
+from app.utils.suggest import SuggestIndex
+
+
+def build(jobs):
+    index = SuggestIndex()
+    for job in jobs:
+        index.add_job(job)
+    index._rebuild_snapshot()
+    return index
+
+
+def test_heavy_term_beyond_many_light_ones_ranks_first():
+    jobs = [{"id": f"aa-{i}", "title": f"aa {i:04d}"} for i in range(600)]
+    jobs += [{"id": f"az-{i}", "title": "Azure Architect"} for i in range(50)]
+    index = build(jobs)
+
+    top = index.suggest("a", kinds=("title",), limit=3)
+    assert top[0] == {"text": "Azure Architect", "type": "title", "weight": 50}
+
+
+def test_matches_a_full_sort_of_the_prefix_range():
+    rng = random.Random(3)
+    words = ["py", "pyt", "python", "pytorch", "pandas", "php", "perl", "go", "golang", "rust"]
+    jobs = []
+    for i in range(400):
+        jobs.append({"id": str(i), "title": f"{rng.choice(words)} {rng.randint(0, 40)}",
+                     "skills_required": rng.sample(words, 3)})
+    index = build(jobs)
+
+    for prefix in ("p", "py", "go", "python 1", "zz"):
+        counts = {}
+        for kind, display in [t for job in index._jobs.values() for t in job]:
+            if display.lower().startswith(prefix):
+                counts[(display, kind)] = counts.get((display, kind), 0) + 1
+        expected = sorted(counts.items(), key=lambda item: (-item[1], len(item[0][0]), item[0][0], item[0][1]))[:8]
+        got = index.suggest(prefix, limit=8)
+        assert [(s["text"], s["type"], s["weight"]) for s in got] == [(d, k, w) for (d, k), w in expected]
+
+
+def test_lookups_read_the_snapshot_until_it_is_rebuilt():
+    index = build([{"id": "1", "title": "Python Developer"}])
+    index.add_job({"id": "2", "title": "Python Developer"})
+    assert index.suggest("py")[0]["weight"] == 1
+    assert index._changed.is_set()
+
+    index._rebuild_snapshot()
+    assert index.suggest("py")[0]["weight"] == 2
+
+
+def test_updates_and_deletes_retract_terms():
+    index = build([{"id": "1", "title": "Go Developer", "skills_required": ["go"]}])
+    index.add_job({"id": "1", "title": "Rust Developer", "skills_required": ["rust"], "status": "open"})
+    index.remove_job("missing")
+    index._rebuild_snapshot()
+    assert index.suggest("go") == []
+    assert [s["text"] for s in index.suggest("r")] == ["rust", "Rust Developer"]
+
+    index.add_job({"id": "1", "title": "Rust Developer", "status": "expired"})
+    index._rebuild_snapshot()
+    assert index.suggest("r") == []
+
+
+def test_load_keeps_writes_made_while_it_ran(monkeypatch):
+    from types import SimpleNamespace
+    from app.utils import suggest
+
+    index = SuggestIndex()
+
+    def execute(op, query, **kwargs):
+        # a route creates a job while the page is in flight
+        index.add_job({"id": "new", "title": "Kotlin Developer"})
+        return SimpleNamespace(data=[{"id": "old", "title": "Java Developer"}])
+
+    class Query:
+        def __getattr__(self, name):
+            return lambda *args, **kwargs: self
+
+    monkeypatch.setattr(suggest, "execute", execute)
+    monkeypatch.setattr(suggest, "supabase", SimpleNamespace(table=lambda name: Query()))
+    index.load()
+
+    assert index.ready
+    assert [s["text"] for s in index.suggest("k")] == ["Kotlin Developer"]
+    assert [s["text"] for s in index.suggest("j")] == ["Java Developer"]
+
+
+def test_bus_events_are_re_read_in_batches_off_the_listener(monkeypatch):
+    from types import SimpleNamespace
+    from app.utils import suggest
+
+    index = build([{"id": "1", "title": "python dev"}, {"id": "2", "title": "rust dev"}])
+    monkeypatch.setattr(suggest, "suggest_index", index)
+    reads = []
+
+    class Query:
+        def __getattr__(self, name):
+            def method(*args, **kwargs):
+                if name == "in_":
+                    reads.append(args[1])
+                return self
+            return method
+
+    def execute(op, query, **kwargs):
+        return SimpleNamespace(data=[{"id": "1", "title": "python lead", "status": "open"}])
+
+    monkeypatch.setattr(suggest, "execute", execute)
+    monkeypatch.setattr(suggest, "supabase", SimpleNamespace(table=lambda name: Query()))
+
+    for job_id in ("1", "2"):
+        suggest._on_job_changed(job_id, {"origin": "another-worker"})
+    assert reads == []  # the listener only queued them
+
+    index._refresh_stale()
+    index._rebuild_snapshot()
+    assert reads == [["1", "2"]]
+    assert [s["text"] for s in index.suggest("python")] == ["python lead"]
+    assert index.suggest("rust") == []
@@ -0,0 +1,45 @@
+from app.utils import versions
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+
+    def get(self, name):
+        return self.data.get(name)
+
+    def set(self, name, value, nx=False, ex=None):
+        if nx and name in self.data:
+            return None
+        self.data[name] = value
+        return True
+
+    def delete(self, name):
+        self.data.pop(name, None)
+
+
+def redis_stamps(client):
+    stamps = versions.RedisStamps.__new__(versions.RedisStamps)
+    stamps.prefix = "test:stamp"
+    stamps._client = client
+    return stamps
+
+
+def test_stamps_are_off_by_default_with_the_memory_backend():
+    assert versions.INVALIDATION_BACKEND == "memory"
+    assert versions.VERSION_STAMPS_ENABLED is False
+
+
+def test_workers_share_redis_stamps(monkeypatch):
+    client = FakeRedis()
+    worker_a, worker_b = redis_stamps(client), redis_stamps(client)
+    key = (versions.SAVED_JOBS, "user-1")
+
+    token = worker_a.get(key)
+    assert worker_b.get(key) == token
+
+    # a bump on one worker is seen by the other without any bus event
+    monkeypatch.setattr(versions, "_stamps", worker_a)
+    versions.bump(versions.SAVED_JOBS, "user-1")
+    assert worker_b.get(key) != token
+    assert worker_a.get(key) == worker_b.get(key)
@@ -0,0 +1,88 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import views
+from app.utils.views import TopK, ViewCounter
+
+OPEN_JOB = "6f1c2a9e-3b7d-4c1e-9a2f-0d4b5e6f7a8b"
+EXPIRED_JOB = "0a1b2c3d-4e5f-4a6b-8c7d-9e0f1a2b3c4d"
+
+
+def test_top_k_keeps_the_highest_scores_as_they_grow():
+    top = TopK(2)
+    for key, score in (("a", 1.0), ("b", 2.0), ("c", 0.5)):
+        top.offer(key, score)
+    assert top.ranked() == ["b", "a"]
+
+    top.offer("c", 3.0)  # not a member and now beats the minimum
+    assert top.ranked() == ["c", "b"]
+    top.offer("b", 4.0)
+    assert top.ranked() == ["b", "c"]
+    assert len(top) == 2
+
+
+def test_top_k_drops_outdated_heap_entries():
+    top = TopK(3)
+    for i in range(100):
+        top.offer("a", float(i))
+    assert len(top._heap) <= 4 * top.k + 1
+    assert top.score("a") == 99.0
+
+
+def test_scores_outside_the_top_k_are_bounded(monkeypatch):
+    monkeypatch.setattr(views, "VIEW_PENDING_MAX", 5)
+    counter = ViewCounter(top_k=2)
+    for i in range(20):
+        counter.record(f"job-{i}")
+        counter._pending.clear()  # as if flushed, but never reloaded
+    assert counter.stats()["scored_jobs"] == 5
+
+
+@pytest.fixture
+def client(api, monkeypatch):
+    import app.routes.job_routes as job_routes
+
+    jobs = {
+        OPEN_JOB: {"id": OPEN_JOB, "status": "open"},
+        # the sweep marked it, but its deadline is not in the expiry cache
+        EXPIRED_JOB: {"id": EXPIRED_JOB, "status": "expired"},
+    }
+    queries = []
+
+    def execute(op, query, **kwargs):
+        queries.append(op)
+        if op == "jobs.most_viewed":
+            return SimpleNamespace(data=[{"job_id": EXPIRED_JOB}, {"job_id": OPEN_JOB}], count=2)
+        return SimpleNamespace(data=list(jobs.values()))
+
+    counter = ViewCounter(top_k=10)
+    for job_id in (EXPIRED_JOB, EXPIRED_JOB, OPEN_JOB):
+        counter.record(job_id)
+    monkeypatch.setattr(job_routes, "execute", execute)
+    monkeypatch.setattr(job_routes, "view_counter", counter)
+    api.queries = queries
+    return api
+
+
+def test_trending_hides_jobs_marked_expired(client):
+    resp = client.get("/api/v1/jobs/?sort=trending")
+    assert resp.status_code == 200
+    assert [job["id"] for job in resp.json["jobs"]] == [OPEN_JOB]
+    assert resp.json["ranked_limit"] == views.TRENDING_TOP_K
+
+    resp = client.get("/api/v1/jobs/?sort=trending&include_expired=true")
+    assert [job["id"] for job in resp.json["jobs"]] == [EXPIRED_JOB, OPEN_JOB]
+
+
+def test_most_viewed_pages_from_the_view_counts(client):
+    resp = client.get("/api/v1/jobs/?sort=most_viewed&include_expired=true")
+    assert resp.status_code == 200
+    assert resp.json["sort"] == "most_viewed"
+    assert resp.json["total"] == 2
+    assert [job["id"] for job in resp.json["jobs"]] == [EXPIRED_JOB, OPEN_JOB]
+    assert client.queries[0] == "jobs.most_viewed"
+
+
+def test_sorted_lists_reject_a_search_query(client):
+    assert client.get("/api/v1/jobs/?sort=most_viewed&q=python").status_code == 400